@@ -0,0 +1,165 @@
+"""
+HTTP API of the scheduler.
+
+    POST   /solve              queue a solve of the server's problem or
+                               the one in the body, 202 with the job
+    GET    /jobs/{id}          state, best objective, bound and gap
+    GET    /jobs/{id}/schedule best schedule so far (409 before the first)
+    GET    /jobs/{id}/events   server-sent events: each improving schedule
+                               as a diff, then the final job state
+    DELETE /jobs/{id}          cancel; the best schedule so far is kept
+
+Run with:
+    uvicorn app.api.routes:app
+"""
+import dataclasses
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.precheck import InfeasibleProblemError
+from app.core.registry import select_groups
+from app.core.solution import matrix_changes
+from app.core.solver_config import get_solver_config
+from app.models.shift_models import JobInfo, JobSchedule, ShiftMatrix, SolutionDiff, SolveRequest
+from app.services.jobs import MAX_TIME_LIMIT, Job, JobManager
+
+router = APIRouter()
+
+
+def _jobs(request: Request) -> JobManager:
+    return request.app.state.jobs
+
+
+def _job(request: Request, job_id) -> Job:
+    job = _jobs(request).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"no job {job_id}")
+    return job
+
+
+def job_info(job: Job) -> JobInfo:
+    return JobInfo(
+        id=job.id,
+        state=job.state,
+        solver_status=job.solver_status,
+        objective=job.objective,
+        best_bound=job.best_bound,
+        gap=job.gap,
+        solutions=job.solutions,
+        elapsed=job.elapsed,
+        error=job.error,
+    )
+
+
+# A plain def: FastAPI runs it in its thread pool, so converting and
+# pre-checking a large problem does not hold up the event loop
+@router.post("/solve", status_code=202, response_model=JobInfo)
+def solve(body: SolveRequest, request: Request):
+    try:
+        config = get_solver_config(body.preset)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    overrides = body.model_dump(exclude={"preset", "problem"}, exclude_none=True)
+    try:
+        problem = None
+        if body.problem is not None:
+            problem = body.problem.to_problem()
+            select_groups(problem.constraint_groups)
+        job = _jobs(request).submit(dataclasses.replace(config, **overrides), problem)
+    except InfeasibleProblemError as exc:
+        raise HTTPException(status_code=422, detail=exc.reasons)
+    except ValueError as exc:  # unknown constraint groups
+        raise HTTPException(status_code=422, detail=str(exc))
+    return job_info(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str, request: Request):
+    return job_info(_job(request, job_id))
+
+
+@router.get("/jobs/{job_id}/schedule", response_model=JobSchedule)
+async def get_schedule(job_id: str, request: Request):
+    job = _job(request, job_id)
+    matrix = job.matrix
+    if matrix is None:
+        raise HTTPException(status_code=409, detail=f"job {job_id} has no schedule yet ({job.state})")
+    return JobSchedule(
+        id=job.id,
+        state=job.state,
+        solver_status=job.solver_status,
+        objective=job.objective,
+        best_bound=job.best_bound,
+        gap=job.gap,
+        matrix=ShiftMatrix.from_matrix(matrix, SHIFT_TYPES),
+    )
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _solution_events(job: Job):
+    previous = None
+    async for event, skipped in job.updates():
+        if previous is None:
+            content = {"matrix": ShiftMatrix.from_matrix(event.matrix, event.shift_types)}
+        else:
+            content = {"changes": matrix_changes(previous, event.matrix, event.shift_types)}
+        diff = SolutionDiff(
+            index=event.index,
+            skipped=skipped,
+            objective=event.objective,
+            best_bound=event.best_bound,
+            gap=event.gap,
+            elapsed=event.elapsed,
+            **content,
+        )
+        previous = event.matrix
+        yield _sse("solution", diff.model_dump_json(exclude_none=True))
+    yield _sse("end", job_info(job).model_dump_json())
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Stream the job's improving schedules as server-sent events. The first
+    `solution` event holds the whole schedule, each later one the cells
+    changed since the previous event; a client too slow to keep up gets
+    the latest solution only. An `end` event with the job state closes
+    the stream.
+    """
+    job = _job(request, job_id)
+    return StreamingResponse(_solution_events(job), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@router.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str, request: Request):
+    job = _jobs(request).cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"no job {job_id}")
+    return job_info(job)
+
+
+def create_app(max_workers=2, problem=None, max_time_limit=MAX_TIME_LIMIT) -> FastAPI:
+    """
+    The API with its own JobManager: at most `max_workers` concurrent
+    searches of at most `max_time_limit` seconds each, solving `problem`
+    (default: app.core.problem.default_problem).
+    """
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        app.state.jobs.shutdown()
+
+    app = FastAPI(title="Hospital shift scheduler", lifespan=lifespan)
+    app.state.jobs = JobManager(max_workers, problem, max_time_limit=max_time_limit)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,143 @@
+"""
+Command line entry point.
+
+    python -m app solve    [--preset NAME] [--time-limit S] [--output schedule.json] [--excel roster.xlsx] [--stats counts.csv]
+    python -m app report   SCHEDULE_JSON ROSTER_XLSX [--start-date 1404-04-01] [--rtl] [--styled]
+    python -m app validate
+    python -m app stats    SCHEDULE_JSON [--start-date 1404-04-01] [--csv counts.csv]
+
+Only argparse is imported up front. Each command imports what it needs
+(ortools for solve, openpyxl for report, pandas for stats), so --help
+and validate start in a fraction of the time a solve does; the tests
+check HEAVY_MODULES stay out and benchmarks/bench_startup.py times it.
+"""
+import argparse
+import sys
+
+# Modules that must not be imported before a command asks for them
+HEAVY_MODULES = ("ortools", "pandas", "openpyxl", "matplotlib", "seaborn")
+
+DEFAULT_START_DATE = "1404-04-01"
+
+
+def _load_schedule(path, start_date):
+    import json
+
+    from app.core.constraints import SHIFT_TYPES
+    from app.core.problem import default_problem
+    from app.core.solution import Schedule
+
+    with open(path, encoding="utf-8") as f:
+        return Schedule.from_json(json.load(f), SHIFT_TYPES, problem=default_problem(), start_date=start_date)
+
+
+def solve(args):
+    import dataclasses
+
+    from app.core.precheck import InfeasibleProblemError
+    from app.core.problem import default_problem
+    from app.core.solver_config import get_solver_config
+    from app.core.telemetry import RunHistory
+    from app.services.pipeline import format_timings, run_pipeline
+
+    try:
+        config = get_solver_config(args.preset)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    if args.time_limit is not None:
+        config = dataclasses.replace(config, time_limit=args.time_limit)
+
+    outputs = {"json": args.output}
+    if args.excel:
+        outputs["roster"] = args.excel
+    if args.stats:
+        outputs["stats"] = args.stats
+    try:
+        run = run_pipeline(default_problem(), config, outputs, args.start_date,
+                           history=RunHistory(args.history) if args.history else None)
+    except InfeasibleProblemError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    result = run.result
+    print(f"{result.status}: objective {result.objective}, bound {result.best_bound}, gap {result.gap}")
+    if not result.found:
+        return 1
+    print(f"Schedule saved to {args.output}")
+    print(format_timings(run.timings))
+    return 0
+
+
+def report(args):
+    from app.services import report as writers
+
+    write = writers.create_hospital_style_schedule if args.styled else writers.write_hospital_style_schedule
+    write(_load_schedule(args.schedule, args.start_date), args.output, is_rtl=args.rtl)
+    return 0
+
+
+def validate(args):
+    from app.core.precheck import find_infeasibilities
+    from app.core.problem import default_problem
+
+    problem = default_problem()
+    reasons = find_infeasibilities(problem)
+    for reason in reasons:
+        print(reason)
+    if not reasons:
+        print(f"{problem.name}: no infeasibility found by the pre-solve checks")
+    return 1 if reasons else 0
+
+
+def stats(args):
+    from app.services.schedule_info import shift_count_table
+
+    table = shift_count_table(_load_schedule(args.schedule, args.start_date))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+        print(f"Shift counts saved to {args.csv}")
+    else:
+        print(table.to_string(index=False))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m app", description="Hospital shift scheduler.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("solve", help="solve the default problem and save the schedule")
+    cmd.add_argument("--preset", default=None, help="solver preset (fast_draft, balanced, prove_optimal)")
+    cmd.add_argument("--time-limit", type=float, default=None, help="seconds, overrides the preset's")
+    cmd.add_argument("--output", default="schedule.json", help="schedule JSON to write")
+    cmd.add_argument("--excel", default=None, help="also write the hospital-style roster here")
+    cmd.add_argument("--stats", default=None, help="also write the head counts per day and shift here (CSV)")
+    cmd.add_argument("--start-date", default=DEFAULT_START_DATE, help="Jalali date of day 1")
+    cmd.add_argument("--history", default=None, help="run history (JSON lines) to append the run to")
+    cmd.set_defaults(run=solve)
+
+    cmd = commands.add_parser("report", help="write the hospital-style Excel roster of a schedule")
+    cmd.add_argument("schedule", help="schedule JSON")
+    cmd.add_argument("output", help="Excel file to write")
+    cmd.add_argument("--start-date", default=DEFAULT_START_DATE, help="Jalali date of day 1")
+    cmd.add_argument("--rtl", action="store_true", help="right-to-left sheet")
+    cmd.add_argument("--styled", action="store_true", help="use the pandas writer instead of the streaming one")
+    cmd.set_defaults(run=report)
+
+    cmd = commands.add_parser("validate", help="run the pre-solve feasibility checks")
+    cmd.set_defaults(run=validate)
+
+    cmd = commands.add_parser("stats", help="head counts per day and shift of a schedule")
+    cmd.add_argument("schedule", help="schedule JSON")
+    cmd.add_argument("--start-date", default=DEFAULT_START_DATE, help="Jalali date of day 1")
+    cmd.add_argument("--csv", default=None, help="write the table here instead of printing it")
+    cmd.set_defaults(run=stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
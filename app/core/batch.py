@@ -0,0 +1,143 @@
+import dataclasses
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.precheck import InfeasibleProblemError, check_feasibility
+from app.core.problem import ScheduleProblem
+from app.core.scheduler import build_model, solve_model
+from app.core.solution import ScheduleResult
+from app.core.solver_config import SolverConfig, get_solver_config
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of one job of a batch solve.
+
+    A job that fails its pre-solve checks has an INFEASIBLE result and the
+    reasons in `error`; a job that raised has no result, status "ERROR" and
+    the exception in `error`.
+    """
+    index: int                         # position of the problem in the submitted list
+    name: str                          # problem.name
+    build_time: float                  # seconds spent building the model
+    num_workers: int                   # CP-SAT search threads the job was given
+    result: Optional[ScheduleResult]
+    error: Optional[str] = None
+
+    @property
+    def status(self):
+        return self.result.status if self.result is not None else "ERROR"
+
+    @property
+    def objective(self):
+        return self.result.objective if self.result is not None else None
+
+    @property
+    def matrix(self):
+        return self.result.matrix if self.result is not None else None
+
+    @property
+    def solve_time(self):
+        return self.result.wall_time if self.result is not None else 0.0
+
+    @property
+    def wall_time(self):
+        return self.build_time + self.solve_time
+
+
+def plan_workers(num_jobs, max_processes=None, cpu_count=None):
+    """
+    Split the machine between processes and CP-SAT threads.
+
+    Returns (processes, threads_per_job) such that
+    processes * threads_per_job <= cpu_count (at least one of each).
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    processes = min(num_jobs, max_processes or cpu_count, cpu_count)
+    processes = max(1, processes)
+    threads_per_job = max(1, cpu_count // processes)
+    return processes, threads_per_job
+
+
+def solve_job(index, problem: ScheduleProblem, config: SolverConfig = None, precheck=True):
+    """
+    Build and solve one problem. Runs inside a pool worker.
+
+    precheck: run the pre-solve checks of app.core.precheck first; a
+    failure gives an INFEASIBLE result without building the model.
+    """
+    config = get_solver_config(config)
+
+    if precheck:
+        try:
+            check_feasibility(problem)
+        except InfeasibleProblemError as exc:
+            return BatchResult(
+                index=index,
+                name=problem.name,
+                build_time=0.0,
+                num_workers=config.num_workers,
+                result=ScheduleResult("INFEASIBLE", None, None, 0.0, None, SHIFT_TYPES),
+                error=str(exc),
+            )
+
+    start = time.perf_counter()
+    model, shifts = build_model(problem)
+    build_time = time.perf_counter() - start
+
+    return BatchResult(
+        index=index,
+        name=problem.name,
+        build_time=build_time,
+        num_workers=config.num_workers,
+        result=solve_model(model, shifts, config),
+    )
+
+
+def iter_batch(problems: Sequence[ScheduleProblem], max_processes=None, config=None,
+               precheck=True) -> Iterator[BatchResult]:
+    """
+    Solve independent problems in a process pool, yielding each BatchResult
+    as soon as its job finishes (completion order, see BatchResult.index).
+    A job that raises yields an "ERROR" result instead of stopping the
+    batch.
+
+    config: SolverConfig or preset name applied to every job. Its
+    num_workers is overridden so that processes x CP-SAT threads does not
+    exceed the machine's core count.
+    """
+    if not problems:
+        return
+    processes, threads_per_job = plan_workers(len(problems), max_processes)
+    config = dataclasses.replace(get_solver_config(config), num_workers=threads_per_job)
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {
+            pool.submit(solve_job, index, problem, config, precheck): index
+            for index, problem in enumerate(problems)
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:
+                index = futures[future]
+                yield BatchResult(
+                    index=index,
+                    name=problems[index].name,
+                    build_time=0.0,
+                    num_workers=threads_per_job,
+                    result=None,
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+
+
+def solve_batch(problems: Sequence[ScheduleProblem], max_processes=None, config=None,
+                precheck=True) -> List[BatchResult]:
+    """Solve all problems (see iter_batch) and return results in input order."""
+    results = list(iter_batch(problems, max_processes, config, precheck))
+    return sorted(results, key=lambda r: r.index)
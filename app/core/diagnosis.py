@@ -0,0 +1,138 @@
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional, Union
+
+from ortools.sat.python import cp_model
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import ScheduleProblem
+from app.core.registry import CONSTRAINT_REGISTRY, select_groups
+from app.core.solver_config import SolverConfig, get_solver_config
+from app.core.variables import ShiftVars
+
+# Total budget of explain_infeasibility: half for the first solve, the rest
+# shared by the minimization solves
+DIAGNOSIS_CONFIG = SolverConfig(time_limit=30)
+
+
+@dataclass(frozen=True)
+class ConflictingRule:
+    """One guarded part of the model that takes part in an infeasibility."""
+    group: str             # constraint group name, see registry.CONSTRAINT_REGISTRY
+    day: Optional[int]     # 0-based day, None for rules spanning more days
+    description: str       # what the group enforces
+
+    def __str__(self):
+        where = f"day {self.day + 1}" if self.day is not None else "across days"
+        return f"{self.description} ({self.group}, {where})"
+
+
+def _constraint_day(ct, shifts):
+    """
+    Day a constraint is about: the day of its shift variables, the first of
+    two consecutive days (the rest rules), None otherwise.
+    """
+    literals = list(ct.enforcement_literal)
+    for field in ("linear", "bool_or", "bool_and", "at_most_one", "exactly_one"):
+        if getattr(ct, f"has_{field}")():
+            part = getattr(ct, field)
+            literals += list(part.vars if field == "linear" else part.literals)
+
+    days = set()
+    for literal in literals:
+        flat = (literal if literal >= 0 else -literal - 1) - shifts.first_index
+        if 0 <= flat < len(shifts):
+            days.add(flat % shifts.person_stride // shifts.day_stride)
+    if len(days) == 1 or (len(days) == 2 and max(days) - min(days) == 1):
+        return min(days)
+    return None
+
+
+def _core(model, assumptions, config: SolverConfig, time_limit):
+    """Solve under `assumptions`; the sufficient subset if infeasible, else None."""
+    solver = cp_model.CpSolver()
+    replace(config, time_limit=time_limit).apply(solver)
+    model.ClearAssumptions()
+    model.AddAssumptions(assumptions)
+    if solver.Solve(model) != cp_model.INFEASIBLE:
+        return None
+    return set(solver.SufficientAssumptionsForInfeasibility())
+
+
+def explain_infeasibility(
+    problem: ScheduleProblem,
+    by_day=True,
+    minimize=True,
+    config: Union[SolverConfig, str] = DIAGNOSIS_CONFIG,
+) -> Optional[List[ConflictingRule]]:
+    """
+    Find which constraint groups conflict when `problem` is infeasible.
+
+    Every constraint group the problem enables (and with by_day, each
+    (group, day) part of it) is guarded by an enforcement literal that is
+    passed as an assumption, so one solve returns a set of parts that are
+    infeasible together.
+
+    minimize: drop parts one at a time while the rest stays infeasible.
+        This costs up to one extra solve per part of the first core.
+    config: its time_limit is the budget of the whole call. The first solve
+        gets half of it; each minimization solve gets an equal share of
+        what is left. A part whose removal is not decided in its share is
+        kept, so the result may then be larger than minimal.
+
+    Guarded constraints escape CP-SAT presolve, so conflicts between
+    monthly totals can take much longer to prove than in a plain solve;
+    run app.core.precheck first, it catches the common counting conflicts.
+
+    Returns the conflicting parts, or None if the problem was not proven
+    infeasible (feasible, or the time limit ran out).
+    """
+    model = cp_model.CpModel()
+    # Unreduced, linear model: every pin is a constraint of its own group
+    shifts = ShiftVars(model, problem.num_staff, problem.num_days, len(SHIFT_TYPES))
+
+    owners = []
+    for name in select_groups(problem.constraint_groups):
+        add_group = CONSTRAINT_REGISTRY[name]
+        start = len(model.Proto().constraints)
+        add_group(model, shifts, problem, "linear")
+        owners += [add_group] * (len(model.Proto().constraints) - start)
+
+    guards = {}
+    proto = model.Proto()
+    for ct, add_group in zip(proto.constraints, owners):
+        key = (add_group, _constraint_day(ct, shifts) if by_day else None)
+        if key not in guards:
+            day = "" if key[1] is None else f"_d{key[1]}"
+            guards[key] = model.NewBoolVar(f"guard_{add_group.__name__}{day}")
+        ct.enforcement_literal.append(guards[key].Index())
+    rules = {
+        literal.Index(): ConflictingRule(
+            add_group.__name__, day, (add_group.__doc__ or add_group.__name__).strip().split("\n")[0],
+        )
+        for (add_group, day), literal in guards.items()
+    }
+
+    config = get_solver_config(config)
+    budget = config.time_limit
+    start = time.perf_counter()
+    core = _core(model, list(guards.values()), config, budget / 2 if budget is not None else None)
+    if core is None:
+        return None
+
+    if minimize:
+        pending = sorted(core)
+        while pending:
+            index = pending.pop(0)
+            if index not in core:
+                continue
+            share = None
+            if budget is not None:
+                share = (budget - (time.perf_counter() - start)) / (len(pending) + 1)
+                if share <= 0.01:
+                    break
+            smaller = _core(model, [model.GetBoolVarFromProtoIndex(i) for i in core - {index}], config, share)
+            if smaller is not None:
+                core = smaller
+
+    return sorted((rules[i] for i in core), key=lambda r: (r.day is None, r.day or 0, r.group))
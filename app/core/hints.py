@@ -0,0 +1,66 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import ScheduleProblem
+from app.core.solution import as_shift_matrix
+from app.core.variables import is_constant
+
+# Cell of a hint matrix without a hint (new staff member, unmapped day)
+NO_HINT = -2
+
+
+def staff_map_by_name(prior_staff: Sequence, staff: Sequence) -> Dict[int, int]:
+    """
+    Match the new roster to the prior one by name.
+
+    Returns {new id: prior id} for every name found in both rosters.
+    """
+    prior_ids = {member.name: member.id for member in prior_staff}
+    return {member.id: prior_ids[member.name] for member in staff if member.name in prior_ids}
+
+
+def map_prior_schedule(prior, problem: ScheduleProblem, day_offset=0, staff_map: Optional[Dict[int, int]] = None):
+    """
+    Map a prior schedule onto the horizon and roster of `problem`.
+
+    prior: the prior ScheduleResult, its shift matrix, or the per-day
+        schedule JSON (the content of schedule.json)
+    day_offset: new day d takes the prior schedule of day d + day_offset.
+        Days past the end of the prior horizon wrap around, so a 30-day month
+        can seed a 31-day one. Use e.g. the prior month length % 7 to line up
+        weekdays instead of day numbers.
+    staff_map: {new id: prior id}; default keeps ids that exist in both
+        rosters. New staff without a prior id get no hint.
+
+    Returns a staff x day int8 hint matrix holding shift codes, OFF, or
+    NO_HINT.
+    """
+    prior = as_shift_matrix(prior, SHIFT_TYPES)
+    prior_staff, prior_days = prior.shape
+    if staff_map is None:
+        staff_map = {p: p for p in range(min(problem.num_staff, prior_staff))}
+
+    hint = np.full((problem.num_staff, problem.num_days), NO_HINT, dtype=np.int8)
+    if prior_days == 0:
+        return hint
+
+    day_index = (np.arange(problem.num_days) + day_offset) % prior_days
+    for p, prior_p in staff_map.items():
+        if p < problem.num_staff and 0 <= prior_p < prior_staff:
+            hint[p] = prior[prior_p, day_index]
+    return hint
+
+
+def add_schedule_hints(model, shifts, hint):
+    """
+    Add one AddHint per decision variable of every hinted (person, day)
+    cell: 1 for the hinted shift, 0 for the others (all 0 for OFF).
+    Constant cells of a reduced model are skipped.
+    """
+    for p, d in zip(*np.nonzero(hint != NO_HINT)):
+        code = hint[p, d]
+        for s, var in enumerate(shifts.person_day(p, d)):
+            if not is_constant(var):
+                model.AddHint(var, 1 if s == code else 0)
@@ -0,0 +1,171 @@
+from dataclasses import replace
+from typing import List
+
+import numpy as np
+
+from app.core.constraints import SHIFT_INDICES, SHIFT_TYPES
+from app.core.problem import Coverage, ScheduleProblem
+from app.core.reduction import fixed_cells
+
+# Shifts that count toward coverage and need a man and a woman every day
+_WORK = [SHIFT_INDICES[s] for s in ("D", "E", "N", "DE")]
+_REST_AFTER = [SHIFT_INDICES["N"], SHIFT_INDICES["DE"]]
+
+
+class InfeasibleProblemError(ValueError):
+    """Raised by check_feasibility; `reasons` lists every failed check."""
+
+    def __init__(self, problem: ScheduleProblem, reasons: List[str]):
+        self.reasons = reasons
+        super().__init__(f"{problem.name or 'problem'} cannot be scheduled: " + "; ".join(reasons))
+
+
+def _who(problem, p):
+    return f"{problem.staff[p].name} (id {p})"
+
+
+def _min_people(coverage: Coverage):
+    """
+    Fewest people working D, E, N or DE on a day with this coverage.
+
+    D + DE == day, E + DE == evening and the gender rule puts at least two
+    people on each of D, E and DE, so DE <= min(day, evening) - 2 and
+    D + E + DE + N >= max(day, evening) + 2 + night.
+    """
+    return max(coverage.day, coverage.evening) + 2 + coverage.night
+
+
+def _coverage_reasons(label, coverage: Coverage):
+    reasons = []
+    # A man and a woman on each of D, E, DE and N
+    for name, count, minimum in (("day", coverage.day, 4), ("evening", coverage.evening, 4),
+                                 ("night", coverage.night, 2)):
+        if count < minimum:
+            reasons.append(f"{label} {name} coverage {count} is below {minimum}, the least that puts "
+                           f"a man and a woman on each of its shifts")
+    for i, (name, count) in enumerate((("day", coverage.day), ("evening", coverage.evening),
+                                       ("night", coverage.night))):
+        if coverage.min_professionals[i] + coverage.min_helpers[i] > count:
+            reasons.append(f"{label} {name} needs {coverage.min_professionals[i]} professionals and "
+                           f"{coverage.min_helpers[i]} helpers but only {count} people")
+    return reasons
+
+
+def _can_staff_each_shift(eligible):
+    """
+    True if each shift can get its own person: bipartite matching of shifts
+    to people, eligible[i] listing the people who can work shift i.
+    """
+    owner = {}
+
+    def assign(i, seen):
+        for p in eligible[i]:
+            if p not in seen:
+                seen.add(p)
+                if p not in owner or assign(owner[p], seen):
+                    owner[p] = i
+                    return True
+        return False
+
+    return all(assign(i, set()) for i in range(len(eligible)))
+
+
+def find_infeasibilities(problem: ScheduleProblem) -> List[str]:
+    """
+    Necessary conditions for a schedule to exist, checked on the problem
+    definition alone in a few milliseconds. Returns one message per failed
+    check (days are 1-based); an empty list does not prove feasibility.
+    """
+    reasons = []
+    fixed = fixed_cells(problem)
+    can = fixed != 0                          # staff x day x shift
+    can_work = can[:, :, _WORK].any(axis=2)   # staff x day
+    can_rest_after = can[:, :, _REST_AFTER].any(axis=2)
+    professionals = problem.professionals + problem.reliefs
+
+    # Role pins against unavailability
+    pinned = fixed_cells(replace(problem, unavailable={}))
+    for p, days in sorted(problem.unavailable.items()):
+        for d in sorted(days):
+            for s in np.flatnonzero(pinned[p, d] == 1):
+                reasons.append(f"{_who(problem, p)} must work {SHIFT_TYPES[s]} on day {d + 1} "
+                               f"but is unavailable")
+
+    used = {problem.coverage(d) for d in range(problem.num_days)}
+    for label, coverage in (("normal-day", problem.normal_coverage), ("holiday", problem.holiday_coverage)):
+        if coverage in used:
+            reasons.extend(_coverage_reasons(label, coverage))
+
+    need = np.array([_min_people(problem.coverage(d)) for d in range(problem.num_days)])
+    for d in range(problem.num_days):
+        coverage = problem.coverage(d)
+        available = int(can_work[:, d].sum())
+        if available < need[d]:
+            reasons.append(f"day {d + 1} needs at least {need[d]} people on D/E/N/DE but only "
+                           f"{available} can work")
+
+        # N and DE workers of the previous day rest today
+        if d > 0:
+            resting = problem.coverage(d - 1).night + 2
+            pool = int((can_work[:, d] | can_rest_after[:, d - 1]).sum())
+            if pool < need[d] + resting:
+                reasons.append(f"days {d} and {d + 1} need at least {need[d] + resting} different people "
+                               f"(night and DE workers of day {d} rest on day {d + 1}) but only {pool} can work")
+
+        # DE counts for both D and E
+        p_min, h_min = coverage.min_professionals, coverage.min_helpers
+        for label, ids, minimum in (
+            ("professionals", professionals, max(p_min[0], p_min[1]) + p_min[2]),
+            ("helpers", problem.helpers, max(h_min[0], h_min[1]) + h_min[2]),
+        ):
+            available = int(can_work[ids, d].sum())
+            if available < minimum:
+                reasons.append(f"day {d + 1} needs at least {minimum} {label} but only {available} can work")
+
+        for label, ids in (("man", problem.males), ("woman", problem.females)):
+            eligible = [[p for p in ids if can[p, d, s]] for s in _WORK]
+            if not _can_staff_each_shift(eligible):
+                reasons.append(f"day {d + 1} cannot put a different {label} on each of D, E, N and DE")
+
+    # Monthly quotas of add_my_custom_shift_constraints
+    for name, total, cap in (("leave", problem.leave_total, problem.max_leave_per_person),
+                             ("training", problem.training_total, problem.max_training_per_person)):
+        s = SHIFT_INDICES["M" if name == "leave" else "A"]
+        capacity = int(np.minimum(can[:, :, s].sum(axis=1), cap).sum())
+        if total > capacity:
+            reasons.append(f"{total} {name} shifts are required but at most {capacity} can be given "
+                           f"({cap} per person on their available days)")
+
+    # Capacity: every person is held to max_monthly_workload and reliefs
+    # share relief_max_shifts
+    days_open = can.any(axis=2).sum(axis=1)
+    reliefs = list(problem.reliefs)
+
+    def capacity(per_person, relief_total):
+        per_person = np.minimum(per_person, problem.max_monthly_workload)
+        return int(np.delete(per_person, reliefs).sum()) + min(int(per_person[reliefs].sum()), relief_total)
+
+    # Person-days: at most one shift a day
+    demand = int(need.sum()) + problem.leave_total + problem.training_total
+    available = capacity(days_open, problem.relief_max_shifts)
+    if demand > available:
+        reasons.append(f"the month needs at least {demand} shifts (coverage, leave and training) but "
+                       f"the staff can work at most {available}")
+
+    # Workload: N and DE count double, so coverage alone needs
+    # day + evening + 2 * night units a day (DE counts for both D and E)
+    demand = sum(problem.coverage(d).day + problem.coverage(d).evening + 2 * problem.coverage(d).night
+                 for d in range(problem.num_days)) + problem.leave_total + problem.training_total
+    available = capacity(2 * days_open, 2 * problem.relief_max_shifts)
+    if demand > available:
+        reasons.append(f"the month needs {demand} workload units (N and DE count double) but the staff, "
+                       f"each capped at {problem.max_monthly_workload}, can give at most {available}")
+
+    return reasons
+
+
+def check_feasibility(problem: ScheduleProblem):
+    """Raise InfeasibleProblemError if find_infeasibilities reports anything."""
+    reasons = find_infeasibilities(problem)
+    if reasons:
+        raise InfeasibleProblemError(problem, reasons)
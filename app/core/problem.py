@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Optional, Tuple
+
+from app.models.staff_data import StaffMember, Role, staff_list
+
+
+@dataclass(frozen=True)
+class Coverage:
+    """
+    Staffing of one kind of day (normal or holiday).
+
+    day / evening / night: exact head count on D, E and N. A DE shift counts
+    towards both D and E.
+    min_professionals / min_helpers: minimum head count per (D, E, N).
+    """
+    day: int
+    evening: int
+    night: int
+    min_professionals: Tuple[int, int, int] = (0, 0, 0)
+    min_helpers: Tuple[int, int, int] = (0, 0, 0)
+
+
+@dataclass(frozen=True)
+class ScheduleProblem:
+    """
+    Everything that defines one scheduling problem (one ward, one month).
+
+    Problems are immutable, hashable and self-contained, so several of them
+    can be built and solved in the same process. The index sets the constraint
+    groups need (by role, gender, supervisor type, holiday mask) are
+    computed once here instead of inside the per-day loops.
+
+    staff: the roster; staff[i].id must be i
+    num_days: horizon length
+    holidays: 0-based holiday day indices
+    unavailable: person id -> days on which that person takes no shift at
+        all; stored as a read-only mapping
+    constraint_groups: names of the constraint groups to add (see
+        app.core.registry.select_groups), None for the default groups
+    """
+    staff: Tuple[StaffMember, ...]
+    num_days: int
+    holidays: FrozenSet[int]
+    normal_coverage: Coverage
+    holiday_coverage: Coverage
+    leave_total: int
+    training_total: int
+    max_leave_per_person: int = 2
+    max_training_per_person: int = 3
+    max_monthly_workload: int = 26
+    relief_max_shifts: int = 25
+    monthly_leave_total: int = 78  # upper bound, legacy add_leave_constraints only
+    unavailable: Mapping[int, FrozenSet[int]] = field(default_factory=dict)
+    constraint_groups: Optional[Tuple[str, ...]] = None
+    name: str = ""
+
+    # Precomputed index sets
+    num_staff: int = field(init=False, repr=False, compare=False)
+    professionals: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    helpers: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    reliefs: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    females: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    males: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    supervisors: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    supervisor_ids: Mapping[str, int] = field(init=False, repr=False, compare=False)
+    holiday_mask: Tuple[bool, ...] = field(init=False, repr=False, compare=False)
+    normal_days: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    holiday_days: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        staff = tuple(self.staff)
+        for i, member in enumerate(staff):
+            if member.id != i:
+                raise ValueError(f"staff[{i}] has id {member.id}; ids must match roster positions")
+        holidays = frozenset(self.holidays)
+        if any(d < 0 or d >= self.num_days for d in holidays):
+            raise ValueError(f"holidays {sorted(holidays)} fall outside the {self.num_days}-day horizon")
+        unavailable = MappingProxyType({p: frozenset(days) for p, days in self.unavailable.items()})
+        for person, days in unavailable.items():
+            if not 0 <= person < len(staff):
+                raise ValueError(f"unavailable person {person} is not on the roster")
+            if any(d < 0 or d >= self.num_days for d in days):
+                raise ValueError(f"unavailable days {sorted(days)} of person {person} fall outside "
+                                 f"the {self.num_days}-day horizon")
+
+        # frozen dataclass: normalise and fill derived fields through object.__setattr__
+        values = {
+            "staff": staff,
+            "holidays": holidays,
+            "unavailable": unavailable,
+            "constraint_groups": None if self.constraint_groups is None else tuple(self.constraint_groups),
+            "num_staff": len(staff),
+            "professionals": tuple(s.id for s in staff if s.role == Role.PROFESSIONAL),
+            "helpers": tuple(s.id for s in staff if s.role == Role.HELPER),
+            "reliefs": tuple(s.id for s in staff if s.role == Role.RELIEF),
+            "females": tuple(s.id for s in staff if s.gender == "F"),
+            "males": tuple(s.id for s in staff if s.gender == "M"),
+            "supervisors": tuple(s.id for s in staff if s.is_supervisor),
+            "supervisor_ids": MappingProxyType({
+                s.supervisor_type: s.id for s in reversed(staff) if s.supervisor_type is not None
+            }),
+            "holiday_mask": tuple(d in holidays for d in range(self.num_days)),
+            "normal_days": tuple(d for d in range(self.num_days) if d not in holidays),
+            "holiday_days": tuple(sorted(holidays)),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __hash__(self):
+        # mappings are not hashable; hash their items instead
+        return hash(tuple(
+            frozenset(value.items()) if isinstance(value, Mapping) else value
+            for value in (getattr(self, f.name) for f in fields(self) if f.compare)
+        ))
+
+    def __reduce__(self):
+        # mapping proxies do not pickle (batch workers get problems by pickle);
+        # rebuild from the init fields
+        return type(self), tuple(
+            dict(value) if isinstance(value, Mapping) else value
+            for value in (getattr(self, f.name) for f in fields(self) if f.init)
+        )
+
+    def is_holiday(self, d):
+        return self.holiday_mask[d]
+
+    def coverage(self, d):
+        """Coverage that applies on day d."""
+        return self.holiday_coverage if self.holiday_mask[d] else self.normal_coverage
+
+    def supervisor(self, supervisor_type) -> Optional[int]:
+        """Id of the (first by seniority) supervisor of that type, None if absent."""
+        return self.supervisor_ids.get(supervisor_type)
+
+
+# Tir 1404
+NUM_DAYS = 31
+# TODO: apply the real holidays
+HOLIDAYS = [6-1, 13-1, 14-1, 15-1, 20-1, 27-1] # days start from 0 not 1 in the python code i wrote
+MONTHLY_LEAVE_TOTAL = 78 # int(TOTAL_STAFF * 2.5)
+MIN_LEAVE_ASSIGNED = 39 # MONTHLY_LEAVE_TOTAL // 2
+MONTHLY_TRAINING_TOTAL = 8 # round(TOTAL_STAFF * 3 / 12)
+# N and DE count double: Tir needs 886 workload units (coverage 839, leave
+# and training 47) but 31 people at 26 give at most 806, so the pre-solve
+# checks report Tir 1404 as infeasible
+MAX_MONTHLY_WORKLOAD = 26
+TOTAL_RELIEF_MAX_SHIFTS = 25
+
+NORMAL_DAY_COVERAGE = Coverage(day=9, evening=8, night=6, min_professionals=(5, 4, 3), min_helpers=(4, 4, 3))
+HOLIDAY_COVERAGE = Coverage(day=6, evening=5, night=4, min_professionals=(3, 3, 2), min_helpers=(3, 2, 2))
+
+
+def default_problem():
+    """The Tir 1404 problem for the roster in app.models.staff_data."""
+    return ScheduleProblem(
+        staff=tuple(staff_list),
+        num_days=NUM_DAYS,
+        holidays=frozenset(HOLIDAYS),
+        normal_coverage=NORMAL_DAY_COVERAGE,
+        holiday_coverage=HOLIDAY_COVERAGE,
+        leave_total=MIN_LEAVE_ASSIGNED,
+        training_total=MONTHLY_TRAINING_TOTAL,
+        max_monthly_workload=MAX_MONTHLY_WORKLOAD,
+        relief_max_shifts=TOTAL_RELIEF_MAX_SHIFTS,
+        monthly_leave_total=MONTHLY_LEAVE_TOTAL,
+        # That one person with 16,20 leave
+        unavailable={5: frozenset(range(15, 20))},
+        name="Tir 1404",
+    )
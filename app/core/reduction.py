@@ -0,0 +1,75 @@
+import numpy as np
+
+from app.core.constraints import RELIEF_SHIFTS, SHIFT_INDICES, SHIFT_TYPES
+from app.core.problem import ScheduleProblem
+
+# Cell of a fixed-cell array whose value is left to the solver
+FREE = -1
+
+
+def _cells(people, days, shifts):
+    """np.ix_ that also accepts empty index lists."""
+    return np.ix_(*(np.asarray(index, dtype=np.intp) for index in (people, days, shifts)))
+
+
+def _pin_fixed_day_shift(fixed, problem, person, shift):
+    """Mirror of constraints._add_fixed_day_shift."""
+    normal = problem.normal_days
+    fixed[person, normal, :] = 0
+    fixed[person, normal, shift] = 1
+    others = [s for s in range(len(SHIFT_TYPES)) if s != shift]
+    fixed[_cells([person], problem.holiday_days, others)] = 0
+
+
+def _pin_alternate_night_shift(fixed, problem, person, parity):
+    """Mirror of constraints._add_alternate_night_shift."""
+    night = SHIFT_INDICES["N"]
+    for d in problem.normal_days:
+        fixed[person, d, :] = 0
+        if d % 2 == parity:
+            fixed[person, d, night] = 1
+    others = [s for s in range(len(SHIFT_TYPES)) if s != night]
+    fixed[_cells([person], problem.holiday_days, others)] = 0
+
+
+def fixed_cells(problem: ScheduleProblem):
+    """
+    Work out, from the problem alone, which (person, day, shift) cells the
+    role constraints pin to a constant:
+      - head nurse D on normal days, off on holidays
+      - shift and evening supervisors on their shift on normal days, only
+        that shift on holidays
+      - night supervisors N on their days, off on the other normal days,
+        only N on holidays
+      - relief staff never on M or A
+      - unavailable people off
+
+    Returns a staff x day x shift int8 array of 0, 1 or FREE. The
+    constraint groups still state every pin (see variables.fix), so a pin
+    that contradicts another one makes the model infeasible as before.
+    """
+    fixed = np.full((problem.num_staff, problem.num_days, len(SHIFT_TYPES)), FREE, dtype=np.int8)
+
+    head_nurse = problem.supervisor("HEAD_NURSE")
+    if head_nurse is not None:
+        fixed[head_nurse, problem.normal_days, :] = 0
+        fixed[head_nurse, problem.normal_days, SHIFT_INDICES["D"]] = 1
+        fixed[head_nurse, problem.holiday_days, :] = 0
+
+    for role, shift in (("SHIFT_SUPERVISOR", "D"), ("EVENING_SUPERVISOR", "E")):
+        person = problem.supervisor(role)
+        if person is not None:
+            _pin_fixed_day_shift(fixed, problem, person, SHIFT_INDICES[shift])
+
+    for role, parity in (("EVEN_NIGHT_SUPERVISOR", 0), ("ODD_NIGHT_SUPERVISOR", 1)):
+        person = problem.supervisor(role)
+        if person is not None:
+            _pin_alternate_night_shift(fixed, problem, person, parity)
+
+    barred = [s for s, name in enumerate(SHIFT_TYPES) if name not in RELIEF_SHIFTS]
+    fixed[_cells(problem.reliefs, range(problem.num_days), barred)] = 0
+
+    for p, days in problem.unavailable.items():
+        fixed[p, sorted(days), :] = 0
+
+    return fixed
@@ -0,0 +1,118 @@
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Constraint groups by name, in registration (= definition) order. Each is
+# called as add_group(model, shifts, problem, encoding).
+CONSTRAINT_REGISTRY: Dict[str, Callable] = {}
+
+# Names of the groups added when the problem does not choose its own
+DEFAULT_GROUPS: List[str] = []
+
+
+def constraint_group(enabled=True):
+    """
+    Register the decorated add_* function under its name; enabled: whether
+    it is one of the DEFAULT_GROUPS.
+    """
+    def register(add_group):
+        CONSTRAINT_REGISTRY[add_group.__name__] = add_group
+        if enabled:
+            DEFAULT_GROUPS.append(add_group.__name__)
+        return add_group
+    return register
+
+
+def select_groups(groups: Optional[Iterable[str]] = None, enable=(), disable=()) -> Tuple[str, ...]:
+    """
+    Names of the groups to add, in registration order: `groups` (default
+    DEFAULT_GROUPS) plus `enable` minus `disable`.
+
+    Raises ValueError on a name that is not registered.
+    """
+    chosen = set(DEFAULT_GROUPS if groups is None else groups) | set(enable)
+    unknown = (chosen | set(disable)) - CONSTRAINT_REGISTRY.keys()
+    if unknown:
+        raise ValueError(f"Unknown constraint groups {sorted(unknown)}; choose from {list(CONSTRAINT_REGISTRY)}")
+    chosen -= set(disable)
+    return tuple(name for name in CONSTRAINT_REGISTRY if name in chosen)
+
+
+@dataclass
+class GroupProfile:
+    """What one constraint group cost while the model was built."""
+    name: str
+    build_time: float      # seconds
+    peak_memory: int       # Python heap bytes at the peak while the group ran (tracemalloc)
+    rss_growth: Optional[int]  # resident memory growth in bytes, None where /proc is missing
+    variables: int         # variables the group added
+    constraints: int       # constraints the group added
+
+
+def _resident_bytes():
+    """Resident set size of this process (Linux), None elsewhere."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def run_groups(model, shifts, problem, encoding, groups: Iterable[str], profile: Optional[list] = None):
+    """
+    Add the named groups. With a `profile` list, append a GroupProfile for
+    each group; memory is traced with tracemalloc, which slows the build
+    down, so only profiled builds pay for it. CP-SAT keeps expressions and
+    the model in C++, out of tracemalloc's sight, so rss_growth is the
+    better measure of what a group costs the model.
+    """
+    if profile is None:
+        for name in groups:
+            CONSTRAINT_REGISTRY[name](model, shifts, problem, encoding)
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    proto = model.Proto()
+    try:
+        for name in groups:
+            num_vars, num_constraints = len(proto.variables), len(proto.constraints)
+            rss_before = _resident_bytes()
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+
+            CONSTRAINT_REGISTRY[name](model, shifts, problem, encoding)
+
+            build_time = time.perf_counter() - start
+            profile.append(GroupProfile(
+                name=name,
+                build_time=build_time,
+                peak_memory=tracemalloc.get_traced_memory()[1] - memory_before,
+                rss_growth=None if rss_before is None else _resident_bytes() - rss_before,
+                variables=len(proto.variables) - num_vars,
+                constraints=len(proto.constraints) - num_constraints,
+            ))
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def format_profile(profile: List[GroupProfile]) -> str:
+    """The profile as a text table, heaviest build time first, with a total row."""
+    def kib(num_bytes):
+        return "-" if num_bytes is None else f"{num_bytes / 1024:.0f}"
+
+    lines = [f"{'group':<36} {'build s':>8} {'peak KiB':>9} {'RSS KiB':>8} {'vars':>7} {'constraints':>12}"]
+    for row in sorted(profile, key=lambda row: row.build_time, reverse=True):
+        lines.append(f"{row.name:<36} {row.build_time:8.3f} {kib(row.peak_memory):>9} "
+                     f"{kib(row.rss_growth):>8} {row.variables:7} {row.constraints:12}")
+    rss = [row.rss_growth for row in profile]
+    lines.append(f"{'total':<36} {sum(row.build_time for row in profile):8.3f} "
+                 f"{kib(max((row.peak_memory for row in profile), default=0)):>9} "
+                 f"{kib(None if None in rss else sum(rss)):>8} "
+                 f"{sum(row.variables for row in profile):7} {sum(row.constraints for row in profile):12}")
+    return "\n".join(lines)
@@ -0,0 +1,200 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from app.core.constraints import SHIFT_INDICES, SHIFT_TYPES, apply_all_constraints
+from app.core.hints import add_schedule_hints
+from app.core.problem import ScheduleProblem
+from app.core.reduction import fixed_cells
+from app.core.scheduler import solve_model
+from app.core.solution import OFF, ScheduleResult, as_shift_matrix
+from app.core.solver_config import SolverConfig
+from app.core.variables import ShiftVars
+
+# A repair neighborhood is small; this is a safety net, not a target
+REPAIR_CONFIG = SolverConfig(time_limit=10)
+
+# Shifts that can stand in for each other when covering an absence:
+# DE counts for both D and E coverage
+_RELATED_SHIFTS = {
+    "D": {"D", "DE"},
+    "E": {"E", "DE"},
+    "DE": {"D", "E", "DE"},
+    "N": {"N"},
+    "M": {"M"},
+    "A": {"A"},
+}
+
+
+@dataclass
+class ShiftChange:
+    """One (person, day) cell changed by a repair. None means off."""
+    person: int
+    day: int
+    before: Optional[str]
+    after: Optional[str]
+
+
+@dataclass
+class RepairResult:
+    """
+    Outcome of repair_schedule.
+
+    problem: the problem with the new unavailabilities merged in (pass it to
+        the next repair)
+    window: the day radius of the neighborhood that was solved
+    all_shifts: False if only the affected shift types were opened
+    free_cells: number of (person, day) cells the solver could change
+    attempts: neighborhoods tried, the last one being this result's
+    """
+    problem: ScheduleProblem
+    result: ScheduleResult
+    changes: List[ShiftChange]
+    window: int
+    all_shifts: bool
+    free_cells: int
+    attempts: int
+
+    @property
+    def status(self):
+        return self.result.status
+
+    @property
+    def matrix(self):
+        return self.result.matrix
+
+    @property
+    def schedule(self):
+        return self.result.schedule
+
+
+def merge_unavailable(problem: ScheduleProblem, unavailable: Dict[int, Iterable[int]]) -> ScheduleProblem:
+    """Copy of `problem` with `unavailable` ({person: days}) added."""
+    merged = dict(problem.unavailable)
+    for p, days in unavailable.items():
+        merged[p] = frozenset(merged.get(p, ())) | frozenset(days)
+    return replace(problem, unavailable=merged)
+
+
+def affected_shifts(published, unavailable: Dict[int, Iterable[int]]):
+    """Shift types vacated by the new absences, plus the ones that can cover them."""
+    names = set()
+    for p, days in unavailable.items():
+        for d in days:
+            code = published[p, d]
+            if code != OFF:
+                names |= _RELATED_SHIFTS[SHIFT_TYPES[code]]
+    return {SHIFT_INDICES[name] for name in names}
+
+
+def free_cell_mask(published, unavailable: Dict[int, Iterable[int]], window: int, shift_codes=None):
+    """
+    Staff x day mask of the cells a repair may change: on days within
+    `window` of a new absence, the absent people, everyone off, and
+    everyone working one of `shift_codes` (None: every shift).
+    """
+    num_staff, num_days = published.shape
+    days = np.zeros(num_days, dtype=bool)
+    for day_set in unavailable.values():
+        for d in day_set:
+            days[max(0, d - window):d + window + 1] = True
+
+    if shift_codes is None:
+        people = np.ones(published.shape, dtype=bool)
+    else:
+        people = (published == OFF) | np.isin(published, list(shift_codes))
+        for p, day_set in unavailable.items():
+            people[p, list(day_set)] = True
+    return people & days
+
+
+def _repair_model(problem: ScheduleProblem, published, free):
+    """All constraint groups, cells outside `free` held as constants, minimum changes."""
+    # Cells outside the neighborhood become constants holding the published
+    # shift, so only the neighborhood gets variables. The constraint groups
+    # still state their own pins, so a published cell that breaks one keeps
+    # the model infeasible.
+    fixed = fixed_cells(problem)
+    fixed[~free] = published[~free, None] == np.arange(len(SHIFT_TYPES))
+
+    model = cp_model.CpModel()
+    shifts = ShiftVars(model, problem.num_staff, problem.num_days, len(SHIFT_TYPES), fixed=fixed)
+    apply_all_constraints(model, shifts, problem)
+
+    changed = []
+    for p, d in zip(*np.nonzero(free)):
+        code = published[p, d]
+        cell = shifts.person_day(p, d)
+        if code == OFF:
+            changed.append(sum(cell))
+        else:
+            changed.append(1 - cell[code])
+    model.Minimize(sum(changed))
+
+    add_schedule_hints(model, shifts, published)
+    return model, shifts
+
+
+def repair_schedule(
+    published,
+    problem: ScheduleProblem,
+    unavailable: Dict[int, Iterable[int]],
+    window: int = 1,
+    config: Union[SolverConfig, str] = REPAIR_CONFIG,
+) -> RepairResult:
+    """
+    Repair a published schedule after last-minute absences, changing as
+    few assignments as possible.
+
+    published: ScheduleResult, shift matrix or schedule JSON of `problem`
+    unavailable: new absences, {person: days}
+    window: only days within this many days of an absence are re-solved;
+        there only the absent people, people off and people on the vacated
+        shift types may change.
+
+    If that neighborhood is infeasible, all shift types are opened, then
+    the window is doubled until it covers the month. The repaired schedule
+    satisfies every constraint group of the full model.
+
+    Raises ValueError for an absence of someone not on the roster or on a
+    day outside the horizon.
+    """
+    problem = merge_unavailable(problem, unavailable)
+    published = as_shift_matrix(published, SHIFT_TYPES, problem.num_staff)
+
+    neighborhoods = [(window, affected_shifts(published, unavailable))]
+    while True:
+        neighborhoods.append((window, None))
+        if window >= problem.num_days:
+            break
+        window = min(problem.num_days, 2 * window + 1)
+
+    for attempt, (window, shift_codes) in enumerate(neighborhoods, start=1):
+        free = free_cell_mask(published, unavailable, window, shift_codes)
+        model, shifts = _repair_model(problem, published, free)
+        result = solve_model(model, shifts, config)
+        if result.status != "INFEASIBLE":
+            break
+
+    changes = []
+    if result.found:
+        for p, d in zip(*np.nonzero(result.matrix != published)):
+            before, after = published[p, d], result.matrix[p, d]
+            changes.append(ShiftChange(
+                person=int(p),
+                day=int(d),
+                before=SHIFT_TYPES[before] if before != OFF else None,
+                after=SHIFT_TYPES[after] if after != OFF else None,
+            ))
+
+    return RepairResult(
+        problem=problem,
+        result=result,
+        changes=changes,
+        window=window,
+        all_shifts=shift_codes is None,
+        free_cells=int(free.sum()),
+        attempts=attempt,
+    )
@@ -1,30 +1,65 @@
-#TODO: remove in the final stages
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-##############################################################################
+from typing import Union
 
 from ortools.sat.python import cp_model
-from app.services.report import schedule_json_to_excel, create_hospital_style_schedule
-from app.core.constraints import apply_all_constraints, add_basic_constraints
-from app.core.constraints import *
-
-SHIFT_TYPES = ["M", "A", "D", "E", "N", "DE"]
-
-def generate_schedule():
+from app.core.constraints import apply_all_constraints, add_basic_constraints, DEFAULT_ENCODING, SHIFT_TYPES
+from app.core.precheck import check_feasibility
+from app.core.problem import ScheduleProblem, default_problem
+from app.core.hints import NO_HINT, add_schedule_hints
+from app.core.reduction import fixed_cells
+from app.core.variables import ShiftVars
+from app.core.solution import OFF, ScheduleResult, shift_matrix
+from app.core.solver_config import SolverConfig, get_solver_config
+from app.core.symmetry import DEFAULT_SYMMETRY, add_symmetry_breaking
+from app.core.telemetry import RunHistory, capture_log, solve_stats
+
+
+def build_model(problem: ScheduleProblem, hint=None, reduce=True, encoding=DEFAULT_ENCODING, symmetry=DEFAULT_SYMMETRY,
+                profile=None):
+    """
+    Build the CP-SAT model of `problem`: variables, all constraint groups
+    and the fairness objective.
+
+    hint: optional staff x day hint matrix (see app.core.hints) used to
+    warm-start the search.
+    reduce: only create variables for cells the role constraints leave
+    free (see app.core.reduction.fixed_cells).
+    encoding: constraint encoding, see app.core.constraints.ENCODINGS.
+    symmetry: how interchangeable staff are ordered (see
+    app.core.symmetry), None to turn it off. Not applied with a hint, which
+    a prior schedule would usually violate.
+    profile: optional list that receives a GroupProfile per constraint
+    group (see app.core.registry.format_profile).
+
+    Returns (model, shifts).
+    """
     model = cp_model.CpModel()
 
     # Create shift variables: shifts[p, d, s] = 1 if person p works shift s on day d
-    shifts = {}
-    for p in range(TOTAL_STAFF):
-        for d in range(NUM_DAYS):
-            for s in range(len(SHIFT_TYPES)):
-                shifts[p, d, s] = model.NewBoolVar(f"sh_p{p}_d{d}_s{s}")
+    fixed = fixed_cells(problem) if reduce else None
+    shifts = ShiftVars(model, problem.num_staff, problem.num_days, len(SHIFT_TYPES), fixed=fixed)
 
     # Apply all constraints
-    apply_all_constraints(model, shifts)
-    # add_basic_constraints(model, shifts)
+    apply_all_constraints(model, shifts, problem, encoding, profile)
+    # add_basic_constraints(model, shifts, problem)
+
+    if symmetry is not None and hint is None:
+        add_symmetry_breaking(model, shifts, problem, symmetry, fixed)
+
+    add_fairness_objective(model, shifts, problem, hint)
+
+    # Warm start
+    if hint is not None:
+        add_schedule_hints(model, shifts, hint)
+
+    return model, shifts
+
 
+def add_fairness_objective(model, shifts, problem: ScheduleProblem, hint=None):
+    """
+    Minimize the total deviation of each person's shift count from the
+    even share. With a hint, the objective variables of fully hinted people
+    are hinted too.
+    """
     # Objective: spread shifts evenly (optional)
     # model.Minimize(
     #     sum(
@@ -36,21 +71,27 @@ def generate_schedule():
     # )
 
     # Compute target number of shifts per staff member
-    target_shifts_per_staff = int(NUM_DAYS * len(SHIFT_TYPES) / TOTAL_STAFF)
+    target_shifts_per_staff = int(problem.num_days * len(SHIFT_TYPES) / problem.num_staff)
 
     # minimize DE shifts
     # total_de_shifts = sum(shifts[p, d, SHIFT_INDICES["DE"]] for p in range(TOTAL_STAFF) for d in range(NUM_DAYS))
 
     # List to hold deviation variables
     deviation_vars = []
-    for p in range(TOTAL_STAFF):
+    for p in range(problem.num_staff):
         # Total shifts for person p
-        total_shifts = model.NewIntVar(0, NUM_DAYS * len(SHIFT_TYPES), f"total_shifts_p{p}")
-        model.Add(total_shifts == sum(shifts[p, d, s] for d in range(NUM_DAYS) for s in range(len(SHIFT_TYPES))))
+        total_shifts = model.NewIntVar(0, problem.num_days * len(SHIFT_TYPES), f"total_shifts_p{p}")
+        model.Add(total_shifts == sum(shifts.person(p)))
         
         # Deviation variable for this person
-        deviation = model.NewIntVar(0, NUM_DAYS * len(SHIFT_TYPES), f"deviation_p{p}")
+        deviation = model.NewIntVar(0, problem.num_days * len(SHIFT_TYPES), f"deviation_p{p}")
         model.AddAbsEquality(deviation, total_shifts - target_shifts_per_staff)
+
+        # A hint is only used as a full solution if it is complete
+        if hint is not None and (hint[p] != NO_HINT).all():
+            worked = int((hint[p] != OFF).sum())
+            model.AddHint(total_shifts, worked)
+            model.AddHint(deviation, abs(worked - target_shifts_per_staff))
         
         deviation_vars.append(deviation)
 
@@ -59,45 +100,103 @@ def generate_schedule():
     # model.Minimize(sum(deviation_vars) + 5 * total_de_shifts)
 
 
+class SolutionCounter(cp_model.CpSolverSolutionCallback):
+    """Solution callback counting the improving solutions; subclasses call super().on_solution_callback()."""
 
-    solver = cp_model.CpSolver()
+    def __init__(self):
+        super().__init__()
+        self.num_solutions = 0
 
-    # Enable log for the solver
-    # solver.parameters.log_search_progress = True 
-    # solver.parameters.max_time_in_seconds = 60.0  # limit to 60 seconds if you wish
-    # solver.parameters.num_search_workers = 6  # limit number of threads (see below)
+    def on_solution_callback(self):
+        self.num_solutions += 1
 
-    status = solver.Solve(model)
 
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        print("No feasible solution found.")
-        return None
+def solve_model(model, shifts, config: SolverConfig = None, solution_callback=None,
+                solver: cp_model.CpSolver = None, search_log=False) -> ScheduleResult:
+    """
+    Solve a model built by build_model and extract the result, with the
+    solver telemetry in result.stats (see app.core.telemetry).
+
+    solution_callback: default a SolutionCounter; stats.num_solutions is
+    only known for callbacks derived from it.
+    solver: the CpSolver to use, e.g. one another thread may stop with
+    stop_search(); default a new one.
+    search_log: capture the search log for the fingerprint and presolve
+    figures of result.stats. This turns on CP-SAT's search logging.
+    """
+    if solver is None:
+        solver = cp_model.CpSolver()
+    if solution_callback is None:
+        solution_callback = SolutionCounter()
+    get_solver_config(config).apply(solver)
+    log_lines = capture_log(solver) if search_log else None
 
-    # Extract schedule
-    schedule = []
-    for d in range(NUM_DAYS):
-        day_sched = {st: [] for st in SHIFT_TYPES}
-        for s_index, st in enumerate(SHIFT_TYPES):
-            for p in range(TOTAL_STAFF):
-                if solver.Value(shifts[p, d, s_index]):
-                    day_sched[st].append(p)
-        schedule.append(day_sched)
+    status = solver.Solve(model, solution_callback)
 
-    return schedule
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    if not found:
+        print("No feasible solution found.")
+
+    return ScheduleResult(
+        status=solver.StatusName(status),
+        objective=solver.ObjectiveValue() if found else None,
+        best_bound=solver.BestObjectiveBound() if found else None,
+        wall_time=solver.WallTime(),
+        # Extract the whole assignment in one pass
+        matrix=shift_matrix(solver.ResponseProto().solution, shifts) if found else None,
+        shift_types=SHIFT_TYPES,
+        stats=solve_stats(solver, model, found, getattr(solution_callback, "num_solutions", None), log_lines),
+    )
+
+
+def generate_schedule(problem: ScheduleProblem = None, config: Union[SolverConfig, str] = None, hint=None,
+                      precheck=True, history: RunHistory = None) -> ScheduleResult:
+    """
+    Build and solve the model of `problem` (default: the Tir 1404 problem,
+    see app.core.problem.default_problem).
+
+    config: a SolverConfig or a preset name ("fast_draft", "balanced",
+    "prove_optimal"); default searches until OPTIMAL.
+    hint: warm start from a prior schedule, mapped onto this problem with
+    app.core.hints.map_prior_schedule.
+    precheck: first run the pre-solve checks of app.core.precheck, which
+    raise InfeasibleProblemError with the reasons instead of letting CP-SAT
+    find out.
+    history: RunHistory that the run is appended to, with the search log
+    figures (see solve_model).
+
+    Returns a ScheduleResult with status, objective, best bound and gap;
+    result.schedule is the per-day schedule JSON (None if infeasible).
+    """
+    if problem is None:
+        problem = default_problem()
+    if precheck:
+        check_feasibility(problem)
+
+    model, shifts = build_model(problem, hint)
+    result = solve_model(model, shifts, config, search_log=history is not None)
+    if history is not None:
+        history.record(problem, result, get_solver_config(config))
+    return result
 
 if __name__ == "__main__":
     import json
 
-    sched = generate_schedule()
+    from app.services.report import schedule_json_to_excel, create_hospital_style_schedule
+
+    problem = default_problem()
+    result = generate_schedule(problem, history=RunHistory())
+    print(f"{result.status}: objective {result.objective}, bound {result.best_bound}, gap {result.gap}")
+    schedule = result.to_schedule(problem, start_date="1404-04-01")
     
-    # print(json.dumps(sched, indent=2, ensure_ascii=False))
-    if sched is not None:
+    # print(json.dumps(schedule.to_json(), indent=2, ensure_ascii=False))
+    if schedule is not None:
         # Save JSON for reference (optional)
         with open("schedule.json", "w", encoding="utf-8") as f:
-            json.dump(sched, f, ensure_ascii=False, indent=2)
+            json.dump(schedule.to_json(), f, ensure_ascii=False, indent=2)
 
         # Convert to Excel
-        schedule_json_to_excel(sched, "schedule1.xlsx")
+        schedule_json_to_excel(schedule, "schedule1.xlsx")
 
         # create_hospital_style_schedule(
         #         sched,
@@ -106,11 +205,10 @@ if __name__ == "__main__":
         #         start_date="2025-07-01"  # adjust this to your month start date
         #     )
 
+        # The Schedule carries the start date, holidays and staff list
         create_hospital_style_schedule(
-            sched,  # your schedule JSON
+            schedule,
             "hospital_schedule_hijri1.xlsx",
             staff_names=None,  # or {0: "Ali", 1: "Sara"}
-            start_date="1404-04-01", 
-            staff_list= staff_list,
             is_rtl = True,
         )
@@ -0,0 +1,263 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+import jdatetime
+import numpy as np
+
+from app.core.telemetry import SolveStats
+
+# Code stored in the shift matrix for a day without any shift
+OFF = -1
+
+
+def shift_matrix(solution, shifts):
+    """
+    Pull the whole assignment out of a CP-SAT solution in one pass.
+
+    solution: the flat value array of the model, e.g.
+        solver.ResponseProto().solution
+    shifts: the ShiftVars the model was built with
+
+    Returns a staff x day int8 matrix holding the shift index worked on
+    each day (position in SHIFT_TYPES), or OFF.
+    """
+    end = shifts.first_index + shifts.num_vars
+    values = shifts.fixed.copy()
+    values[shifts.free] = np.fromiter(solution, dtype=np.int8, count=end)[shifts.first_index:]
+    values = values.reshape(shifts.num_staff, shifts.num_days, shifts.num_shifts)
+
+    matrix = values.argmax(axis=2).astype(np.int8)
+    matrix[values.max(axis=2) == 0] = OFF
+    return matrix
+
+
+def matrix_to_schedule_json(matrix, shift_types):
+    """
+    Derive the per-day schedule JSON from a shift matrix:
+      [
+        {"M": [0,2], "A": [1], "D": [...], ...},  # Day 0
+        ...
+      ]
+    """
+    schedule = []
+    for day_codes in np.asarray(matrix).T:
+        day_sched = {}
+        for s_index, st in enumerate(shift_types):
+            day_sched[st] = np.flatnonzero(day_codes == s_index).tolist()
+        schedule.append(day_sched)
+    return schedule
+
+
+def matrix_changes(previous, matrix, shift_types):
+    """
+    Cells of `matrix` that differ from `previous`, as [person, day, shift
+    type] triples; the shift type is None for a day off.
+    """
+    matrix = np.asarray(matrix)
+    people, days = np.nonzero(matrix != previous)
+    return [[p, d, shift_types[c] if c != OFF else None]
+            for p, d, c in zip(people.tolist(), days.tolist(), matrix[people, days].tolist())]
+
+
+@dataclass
+class ScheduleResult:
+    """
+    Outcome of one solve.
+
+    status: CP-SAT status name ("OPTIMAL", "FEASIBLE", "INFEASIBLE", ...)
+    objective / best_bound: None unless a solution was found
+    wall_time: seconds spent in the solver
+    matrix: staff x day shift matrix (see shift_matrix), None without a solution
+    stats: solver telemetry (app.core.telemetry.SolveStats), None if the
+        result did not come from a solve
+    """
+    status: str
+    objective: Optional[float]
+    best_bound: Optional[float]
+    wall_time: float
+    matrix: Optional[np.ndarray]
+    shift_types: List[str]
+    stats: Optional[SolveStats] = None
+
+    @property
+    def found(self):
+        """True if a schedule is available (OPTIMAL or FEASIBLE)."""
+        return self.matrix is not None
+
+    @property
+    def gap(self):
+        """Relative gap |objective - bound| / max(1, |objective|), as CP-SAT computes it."""
+        if self.objective is None or self.best_bound is None:
+            return None
+        return abs(self.objective - self.best_bound) / max(1.0, abs(self.objective))
+
+    @property
+    def schedule(self):
+        """The per-day schedule JSON, derived from the matrix on request."""
+        if self.matrix is None:
+            return None
+        return matrix_to_schedule_json(self.matrix, self.shift_types)
+
+    def to_schedule(self, problem=None, start_date=None) -> Optional["Schedule"]:
+        """The result as a Schedule (see Schedule.from_matrix), None without a solution."""
+        if self.matrix is None:
+            return None
+        return Schedule.from_matrix(self.matrix, self.shift_types, problem, start_date)
+
+
+def schedule_json_to_matrix(schedule_json, num_staff, shift_types):
+    """
+    Inverse of matrix_to_schedule_json: build the staff x day shift matrix
+    from the per-day schedule JSON (e.g. a loaded schedule.json). Staff ids
+    >= num_staff are ignored.
+    """
+    matrix = np.full((num_staff, len(schedule_json)), OFF, dtype=np.int8)
+    codes = {st: s_index for s_index, st in enumerate(shift_types)}
+    for d, day_sched in enumerate(schedule_json):
+        for st, staff_ids in day_sched.items():
+            ids = np.asarray(staff_ids, dtype=np.int64)
+            matrix[ids[ids < num_staff], d] = codes[st]
+    return matrix
+
+
+def as_shift_matrix(schedule, shift_types, num_staff=None):
+    """
+    Accept a ScheduleResult, a Schedule, a shift matrix or the per-day schedule JSON and
+    return the shift matrix. For JSON, num_staff defaults to the highest
+    staff id found + 1.
+    """
+    if isinstance(schedule, ScheduleResult):
+        return schedule.matrix
+    if isinstance(schedule, Schedule):
+        return schedule.codes
+    if isinstance(schedule, np.ndarray):
+        return schedule
+    if num_staff is None:
+        num_staff = max((max(ids) for day in schedule for ids in day.values() if ids), default=-1) + 1
+    return schedule_json_to_matrix(schedule, num_staff, shift_types)
+
+
+def _jalali(start_date):
+    if start_date is None or isinstance(start_date, jdatetime.date):
+        return start_date
+    y, m, d = map(int, start_date.split("-"))
+    return jdatetime.date(y, m, d)
+
+
+@dataclass(frozen=True, eq=False)
+class Schedule:
+    """
+    A roster: the staff x day shift matrix (int8 shift index or OFF) with
+    its shift codes and calendar.
+
+    codes: read-only (may be memory-mapped); person() and day() are views
+        of it and shift() a view of a one-hot array built on first use,
+        never copies
+    holidays: 0-based holiday day indices
+    staff: roster the rows belong to (StaffMember), if known
+    start_date: Jalali date of day 0 (jdatetime.date or "YYYY-MM-DD"), if known
+    """
+    codes: np.ndarray
+    shift_types: Tuple[str, ...]
+    holidays: FrozenSet[int] = frozenset()
+    staff: Optional[Tuple] = None
+    start_date: Optional[jdatetime.date] = None
+
+    def __post_init__(self):
+        codes = np.asarray(self.codes, dtype=np.int8)
+        if codes.ndim != 2:
+            raise ValueError(f"codes must be a staff x day matrix, got shape {codes.shape}")
+        if self.staff is not None and len(self.staff) != codes.shape[0]:
+            raise ValueError(f"{len(self.staff)} staff for {codes.shape[0]} rows")
+        # a read-only view, so the caller's array keeps its own flags
+        codes = codes.view()
+        codes.flags.writeable = False
+        object.__setattr__(self, "codes", codes)
+        object.__setattr__(self, "shift_types", tuple(self.shift_types))
+        object.__setattr__(self, "holidays", frozenset(self.holidays))
+        object.__setattr__(self, "staff", None if self.staff is None else tuple(self.staff))
+        object.__setattr__(self, "start_date", _jalali(self.start_date))
+
+    @cached_property
+    def _one_hot(self):
+        """Staff x day x shift booleans, the base of the counters; built on first use."""
+        return self.codes[:, :, None] == np.arange(len(self.shift_types))
+
+    @classmethod
+    def from_matrix(cls, matrix, shift_types, problem=None, start_date=None) -> "Schedule":
+        """Wrap a shift matrix; holidays and staff come from `problem` if given."""
+        if problem is None:
+            return cls(matrix, shift_types, start_date=start_date)
+        return cls(matrix, shift_types, problem.holidays, problem.staff, start_date)
+
+    @classmethod
+    def from_json(cls, schedule_json, shift_types, num_staff=None, problem=None, start_date=None) -> "Schedule":
+        """Build from the per-day schedule JSON (see as_shift_matrix for num_staff)."""
+        if num_staff is None and problem is not None:
+            num_staff = problem.num_staff
+        matrix = as_shift_matrix(schedule_json, shift_types, num_staff)
+        return cls.from_matrix(matrix, shift_types, problem, start_date)
+
+    def to_json(self):
+        """The per-day schedule JSON (see matrix_to_schedule_json)."""
+        return matrix_to_schedule_json(self.codes, self.shift_types)
+
+    @property
+    def num_staff(self):
+        return self.codes.shape[0]
+
+    @property
+    def num_days(self):
+        return self.codes.shape[1]
+
+    def code(self, shift):
+        """Shift index of a shift name (an index is returned as is)."""
+        return self.shift_types.index(shift) if isinstance(shift, str) else shift
+
+    def person(self, p):
+        """Shift codes of person p, one per day (a view)."""
+        return self.codes[p]
+
+    def day(self, d):
+        """Shift codes of every person on day d (a view)."""
+        return self.codes[:, d]
+
+    def shift(self, shift):
+        """Staff x day mask of the cells on `shift` (a name or index)."""
+        return self._one_hot[:, :, self.code(shift)]
+
+    def on_shift(self, d, shift) -> np.ndarray:
+        """Ids of the people on `shift` on day d."""
+        return np.flatnonzero(self._one_hot[:, d, self.code(shift)])
+
+    def labels(self, off=""):
+        """Staff x day array of shift names, `off` for days off."""
+        return np.asarray(list(self.shift_types) + [off], dtype=object)[self.codes]
+
+    def shift_counts(self) -> np.ndarray:
+        """Staff x shift counts: how often each person works each shift."""
+        return self._one_hot.sum(axis=1)
+
+    def day_counts(self, people: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Day x shift head counts, over everyone or only `people` (ids or a staff mask)."""
+        one_hot = self._one_hot if people is None else self._one_hot[np.asarray(people)]
+        return one_hot.sum(axis=0)
+
+    def worked_days(self) -> np.ndarray:
+        """Days each person has any shift."""
+        return (self.codes != OFF).sum(axis=1)
+
+    def workload(self, double=("N", "DE")) -> np.ndarray:
+        """Per-person workload with the shifts in `double` counting twice (as in the model)."""
+        counts = self.shift_counts()
+        return counts.sum(axis=1) + sum(counts[:, self.code(s)] for s in double if s in self.shift_types)
+
+    def dates(self) -> Optional[List[jdatetime.date]]:
+        """Jalali date of every day, None without a start_date."""
+        if self.start_date is None:
+            return None
+        return [self.start_date + jdatetime.timedelta(days=d) for d in range(self.num_days)]
+
+    def is_holiday(self, d):
+        return d in self.holidays
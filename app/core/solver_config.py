@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+
+@dataclass(frozen=True)
+class SolverConfig:
+    """
+    CP-SAT settings for one solve. None leaves the CP-SAT default.
+
+    time_limit: seconds before the best solution so far is returned
+    num_workers: search threads (CP-SAT default: all cores)
+    relative_gap_limit: stop once |objective - bound| / max(1, |objective|) <= this
+    absolute_gap_limit: stop once |objective - bound| <= this
+    random_seed: seed of the search
+    deterministic: reproducible runs. The sub-solvers are interleaved
+        deterministically and time_limit is applied as a deterministic time
+        budget instead of wall-clock time.
+    log_search_progress: print the CP-SAT search log
+    """
+    time_limit: Optional[float] = None
+    num_workers: Optional[int] = None
+    relative_gap_limit: Optional[float] = None
+    absolute_gap_limit: Optional[float] = None
+    random_seed: Optional[int] = None
+    deterministic: bool = False
+    log_search_progress: bool = False
+
+    def apply(self, solver: "cp_model.CpSolver"):
+        params = solver.parameters
+        if self.time_limit is not None:
+            if self.deterministic:
+                params.max_deterministic_time = self.time_limit
+            else:
+                params.max_time_in_seconds = self.time_limit
+        if self.num_workers is not None:
+            params.num_workers = self.num_workers
+        if self.relative_gap_limit is not None:
+            params.relative_gap_limit = self.relative_gap_limit
+        if self.absolute_gap_limit is not None:
+            params.absolute_gap_limit = self.absolute_gap_limit
+        if self.random_seed is not None:
+            params.random_seed = self.random_seed
+        if self.deterministic:
+            params.interleave_search = True
+        params.log_search_progress = self.log_search_progress
+
+
+PRESETS = {
+    # A usable roster quickly; 5% away from the best possible is fine
+    "fast_draft": SolverConfig(time_limit=10, relative_gap_limit=0.05),
+    # What the planners run day to day
+    "balanced": SolverConfig(time_limit=60, relative_gap_limit=0.01),
+    # No limits: search until OPTIMAL is proven
+    "prove_optimal": SolverConfig(),
+}
+
+
+def get_solver_config(config: Union[SolverConfig, str, None] = None) -> SolverConfig:
+    """Accept a SolverConfig, a preset name or None (prove_optimal)."""
+    if config is None:
+        return PRESETS["prove_optimal"]
+    if isinstance(config, str):
+        try:
+            return PRESETS[config]
+        except KeyError:
+            raise ValueError(f"Unknown solver preset {config!r}; choose one of {sorted(PRESETS)}") from None
+    return config
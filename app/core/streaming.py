@@ -0,0 +1,165 @@
+import asyncio
+import queue
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.precheck import check_feasibility
+from app.core.problem import ScheduleProblem, default_problem
+from app.core.scheduler import SolutionCounter, build_model, solve_model
+from app.core.solution import ScheduleResult, matrix_to_schedule_json, shift_matrix
+from app.core.solver_config import SolverConfig
+
+# Marks the end of the search in the event queue
+_DONE = object()
+
+
+@dataclass
+class SolutionEvent:
+    """One improving schedule found during the search."""
+    index: int           # 0 for the first solution, then 1, 2, ...
+    objective: float
+    best_bound: float
+    elapsed: float       # seconds since the search started
+    matrix: np.ndarray   # staff x day shift matrix
+    shift_types: List[str]
+
+    @property
+    def gap(self):
+        return abs(self.objective - self.best_bound) / max(1.0, abs(self.objective))
+
+    @property
+    def schedule(self):
+        """The per-day schedule JSON, derived from the matrix on request."""
+        return matrix_to_schedule_json(self.matrix, self.shift_types)
+
+
+class _QueueCallback(SolutionCounter):
+    """Pushes every solution CP-SAT reports into a thread-safe queue."""
+
+    def __init__(self, shifts, events: queue.Queue):
+        super().__init__()
+        self._shifts = shifts
+        self._events = events
+
+    def on_solution_callback(self):
+        self._events.put(SolutionEvent(
+            index=self.num_solutions,
+            objective=self.ObjectiveValue(),
+            best_bound=self.BestObjectiveBound(),
+            elapsed=self.WallTime(),
+            matrix=shift_matrix(self.response_proto.solution, self._shifts),
+            shift_types=SHIFT_TYPES,
+        ))
+        super().on_solution_callback()
+
+
+class SolutionStream:
+    """
+    Solve `problem` in a background thread and stream each improving
+    schedule as a SolutionEvent while the search continues.
+
+    Example:
+        stream = SolutionStream(problem, "balanced")
+        for event in stream:
+            schedule_json_to_excel(event.schedule, "draft.xlsx")
+        stream.result  # final ScheduleResult
+
+    or, from a coroutine:
+        async for event in stream:
+            ...
+
+    hint: optional warm start, see app.core.hints.map_prior_schedule.
+    precheck: raise InfeasibleProblemError up front if the pre-solve checks
+    of app.core.precheck fail.
+
+    Leaving the loop early (break, exception, cancellation) stops the
+    search; stop() can also be called from any thread.
+    """
+
+    def __init__(self, problem: ScheduleProblem = None, config: Union[SolverConfig, str] = None, hint=None,
+                 precheck=True):
+        if problem is None:
+            problem = default_problem()
+        if precheck:
+            check_feasibility(problem)
+        self.problem = problem
+        self.config = config
+        self.result: Optional[ScheduleResult] = None
+        self.error: Optional[BaseException] = None
+
+        self._model, self._shifts = build_model(problem, hint)
+        self._events = queue.Queue()
+        self._callback = _QueueCallback(self._shifts, self._events)
+        self._solver = cp_model.CpSolver()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Start the search (iterating starts it automatically)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cp-sat-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Ask CP-SAT to stop, whether or not it has found a solution yet; the
+        stream then ends. Stopped before the search starts, the result is
+        UNKNOWN without solving.
+        """
+        self._stopping = True
+        self._callback.StopSearch()
+        self._solver.stop_search()
+
+    def _run(self):
+        try:
+            if self._stopping:
+                self.result = ScheduleResult("UNKNOWN", None, None, 0.0, None, SHIFT_TYPES)
+            else:
+                self.result = solve_model(self._model, self._shifts, self.config, self._callback, self._solver)
+        except BaseException as e:  # re-raised to the consumer in _finish()
+            self.error = e
+        finally:
+            self._events.put(_DONE)
+
+    def _finish(self, item):
+        if item is _DONE:
+            self._thread.join()
+            if self.error is not None:
+                raise self.error
+            return True
+        return False
+
+    def __iter__(self):
+        self.start()
+        try:
+            while True:
+                item = self._events.get()
+                if self._finish(item):
+                    return
+                yield item
+        finally:
+            if self.result is None and self.error is None:
+                self.stop()
+
+    async def __aiter__(self):
+        self.start()
+        try:
+            while True:
+                item = await asyncio.to_thread(self._events.get)
+                if self._finish(item):
+                    return
+                yield item
+        finally:
+            if self.result is None and self.error is None:
+                self.stop()
+
+
+def iter_solutions(problem: ScheduleProblem = None, config: Union[SolverConfig, str] = None, hint=None):
+    """Shorthand for iterating a SolutionStream."""
+    return iter(SolutionStream(problem, config, hint))
@@ -0,0 +1,77 @@
+from typing import List
+
+from app.core.problem import ScheduleProblem
+from app.core.reduction import fixed_cells
+from app.core.variables import is_constant
+
+# How interchangeable staff are ordered:
+#   counts  shift counts non-increasing within a class
+#   lex     shift-of-day sequences lexicographically non-increasing
+SYMMETRY_BREAKING = ("counts", "lex")
+DEFAULT_SYMMETRY = "counts"
+
+
+def symmetric_classes(problem: ScheduleProblem, fixed=None) -> List[List[int]]:
+    """
+    Group staff the model cannot tell apart: same role and gender (the
+    coverage, gender and relief rules) and same pinned cells (supervisor
+    roles, relief bans, unavailability, see reduction.fixed_cells). Names
+    and seniority do not enter the model.
+
+    Returns the classes with at least two members, ids in increasing order.
+    """
+    if fixed is None:
+        fixed = fixed_cells(problem)
+
+    classes = {}
+    for member in problem.staff:
+        key = (member.role, member.gender, fixed[member.id].tobytes())
+        classes.setdefault(key, []).append(member.id)
+    return [ids for ids in classes.values() if len(ids) > 1]
+
+
+def _day_labels(shifts, p):
+    """Shift-of-day expressions of person p: 0 off, s + 1 for shift s."""
+    return [
+        sum((s + 1) * var for s, var in enumerate(shifts.person_day(p, d)))
+        for d in range(shifts.num_days)
+    ]
+
+
+def _add_lex_greater_equal(model, left, right, name):
+    """left >= right lexicographically, for two sequences of expressions."""
+    # prefix_equal: left[:i] == right[:i]
+    prefix_equal = model.NewConstant(1)
+    for i, (a, b) in enumerate(zip(left, right)):
+        if is_constant(a) and is_constant(b) and a == b:
+            continue
+        model.Add(a >= b).OnlyEnforceIf(prefix_equal)
+
+        same = model.NewBoolVar(f"{name}_same_d{i}")
+        model.Add(a == b).OnlyEnforceIf(same)
+        model.Add(a != b).OnlyEnforceIf(same.Not())
+
+        next_equal = model.NewBoolVar(f"{name}_eq_d{i}")
+        model.AddBoolAnd([prefix_equal, same]).OnlyEnforceIf(next_equal)
+        model.AddBoolOr([prefix_equal.Not(), same.Not(), next_equal])
+        prefix_equal = next_equal
+
+
+def add_symmetry_breaking(model, shifts, problem: ScheduleProblem, method=DEFAULT_SYMMETRY, fixed=None):
+    """
+    Order the members of every symmetric class (see symmetric_classes), so
+    that only one of the equivalent permutations of a schedule is searched.
+
+    method: "counts" or "lex", see SYMMETRY_BREAKING.
+    """
+    if method not in SYMMETRY_BREAKING:
+        raise ValueError(f"Unknown symmetry breaking {method!r}; choose one of {SYMMETRY_BREAKING}")
+
+    for ids in symmetric_classes(problem, fixed):
+        for p, q in zip(ids, ids[1:]):
+            if method == "counts":
+                model.Add(sum(shifts.person(p)) >= sum(shifts.person(q)))
+            else:
+                _add_lex_greater_equal(
+                    model, _day_labels(shifts, p), _day_labels(shifts, q), f"lex_p{p}_p{q}",
+                )
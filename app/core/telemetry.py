@@ -0,0 +1,225 @@
+"""
+Solver telemetry and run history.
+
+Every solve_model call keeps a SolveStats on its ScheduleResult, from the
+solver response and the model. Runs recorded in a RunHistory also capture
+the CP-SAT search log for the model fingerprint and the presolve figures.
+RunHistory appends one JSON line per run, with the problem, the code
+revision and the stats; the report below compares solve times across
+months and revisions.
+
+    python -m app.core.telemetry [history.jsonl] [--problem NAME] [--threshold 1.25]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+DEFAULT_HISTORY = "run_history.jsonl"
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_FINGERPRINT = re.compile(r"model_fingerprint: (0x[0-9a-f]+)")
+_COUNT = re.compile(r"#(Variables|k\w+): ([\d']+)")
+_RULE = re.compile(r"was applied ([\d']+) time")
+
+
+@dataclass
+class SolveStats:
+    """
+    Telemetry of one CP-SAT solve.
+
+    num_solutions: improving solutions found; None if the solution
+        callback does not count them (see scheduler.SolutionCounter)
+    variables / constraints: size of the model as given
+    model_fingerprint: CP-SAT's fingerprint of the model as given; equal
+        fingerprints mean the same model
+    presolve_*: size after presolve and presolve rules applied
+    The last two are read from the search log, so they are None unless
+    the log was captured (see capture_log), or if the log has no presolved
+    model (e.g. presolve decided the problem).
+    response_stats: CpSolver.ResponseStats(), verbatim
+    """
+    wall_time: float
+    user_time: float
+    deterministic_time: float
+    conflicts: int
+    branches: int
+    num_solutions: Optional[int]
+    best_bound: Optional[float]
+    model_fingerprint: Optional[str]
+    variables: int
+    constraints: int
+    presolved_variables: Optional[int]
+    presolved_constraints: Optional[int]
+    presolve_rules_applied: Optional[int]
+    response_stats: str = field(repr=False)
+
+
+def capture_log(solver: "cp_model.CpSolver") -> List[str]:
+    """Collect the search log of `solver` into the returned list (printing it only if asked to)."""
+    lines = []
+    params = solver.parameters
+    params.log_to_stdout = params.log_search_progress
+    params.log_search_progress = True
+    solver.log_callback = lines.append
+    return lines
+
+
+def _number(text):
+    return int(text.replace("'", ""))
+
+
+def _model_sizes(log_lines):
+    """{"Initial": (vars, constraints, fingerprint), "Presolved": ...} from the log."""
+    sizes = {}
+    section = None
+    for line in log_lines:
+        for header in ("Initial", "Presolved"):
+            if line.startswith(f"{header} optimization model") or line.startswith(f"{header} satisfaction model"):
+                fingerprint = _FINGERPRINT.search(line)
+                section = sizes[header] = [0, 0, fingerprint.group(1) if fingerprint else None]
+                break
+        else:
+            match = _COUNT.match(line)
+            if section is not None and match:
+                section[0 if match.group(1) == "Variables" else 1] += _number(match.group(2))
+            elif section is not None and not line.startswith("  "):
+                section = None
+    return sizes
+
+
+def solve_stats(solver: "cp_model.CpSolver", model: "cp_model.CpModel", found: bool,
+                num_solutions: Optional[int] = None, log_lines: Optional[List[str]] = None) -> SolveStats:
+    """
+    SolveStats of the last solve of `model` by `solver`. The log from
+    capture_log, if any, adds the fingerprint and the presolve figures.
+    """
+    response = solver.ResponseProto()
+    proto = model.Proto()
+    fingerprint = presolved_variables = presolved_constraints = rules = None
+    if log_lines is not None:
+        # a log callback may carry several lines
+        log_lines = [line for chunk in log_lines for line in chunk.splitlines()]
+        sizes = _model_sizes(log_lines)
+        fingerprint = sizes.get("Initial", (None, None, None))[2]
+        presolved_variables, presolved_constraints, _ = sizes.get("Presolved", (None, None, None))
+        rules = sum(_number(m.group(1)) for line in log_lines for m in _RULE.finditer(line))
+    return SolveStats(
+        wall_time=response.wall_time,
+        user_time=response.user_time,
+        deterministic_time=response.deterministic_time,
+        conflicts=response.num_conflicts,
+        branches=response.num_branches,
+        num_solutions=num_solutions,
+        best_bound=solver.BestObjectiveBound() if found else None,
+        model_fingerprint=fingerprint,
+        variables=len(proto.variables),
+        constraints=len(proto.constraints),
+        presolved_variables=presolved_variables,
+        presolved_constraints=presolved_constraints,
+        presolve_rules_applied=rules,
+        response_stats=solver.ResponseStats(),
+    )
+
+
+def code_revision() -> Optional[str]:
+    """Short git commit of the working tree, "+" appended if it has changes; None outside git."""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT, capture_output=True,
+                                  text=True, timeout=5, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=_ROOT,
+                               capture_output=True, text=True, timeout=5, check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return revision + ("+" if dirty else "")
+
+
+class RunHistory:
+    """Append-only JSON lines file of solver runs."""
+
+    def __init__(self, path=DEFAULT_HISTORY):
+        self.path = path
+        self._revision = code_revision()
+
+    def record(self, problem, result, config=None, **extra) -> Dict:
+        """Append one run of `problem` (a ScheduleResult with stats) and return the record."""
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "revision": self._revision,
+            "problem": problem.name,
+            "num_staff": problem.num_staff,
+            "num_days": problem.num_days,
+            "config": asdict(config) if config is not None else None,
+            "status": result.status,
+            "objective": result.objective,
+            **(asdict(result.stats) if result.stats is not None else {}),
+            **extra,
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    def load(self, problem: Optional[str] = None) -> List[Dict]:
+        """All records, oldest first, optionally only those of one problem name."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return [r for r in records if problem is None or r["problem"] == problem]
+
+
+def summarize(records: List[Dict], threshold=1.25) -> List[Dict]:
+    """
+    One row per (problem, revision), in order of first run: runs, median
+    wall time and conflicts, best objective, and `regression` set when the
+    median wall time exceeds `threshold` times that of the problem's
+    previous revision.
+    """
+    groups = {}
+    for r in records:
+        groups.setdefault((r["problem"], r["revision"]), []).append(r)
+
+    rows, previous = [], {}
+    for (problem, revision), runs in groups.items():
+        wall_time = statistics.median(r.get("wall_time", 0.0) for r in runs)
+        objectives = [r["objective"] for r in runs if r.get("objective") is not None]
+        before = previous.get(problem)
+        rows.append({
+            "problem": problem,
+            "revision": revision,
+            "runs": len(runs),
+            "wall_time": wall_time,
+            "conflicts": statistics.median(r.get("conflicts", 0) for r in runs),
+            "objective": min(objectives) if objectives else None,
+            "regression": before is not None and wall_time > threshold * before,
+        })
+        previous[problem] = wall_time
+    return rows
+
+
+def format_summary(rows: List[Dict]) -> str:
+    lines = [f"{'problem':<16} {'revision':<10} {'runs':>5} {'median s':>9} {'conflicts':>10} {'best':>8}"]
+    for row in rows:
+        objective = "-" if row["objective"] is None else f"{row['objective']:g}"
+        lines.append(f"{row['problem']:<16} {row['revision'] or '-':<10} {row['runs']:5} {row['wall_time']:9.2f} "
+                     f"{row['conflicts']:10.0f} {objective:>8}" + ("  REGRESSION" if row["regression"] else ""))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve times per problem and code revision.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_HISTORY)
+    parser.add_argument("--problem", help="only runs of this problem name")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="flag a revision whose median solve time exceeds this multiple of the previous one")
+    args = parser.parse_args()
+
+    print(format_summary(summarize(RunHistory(args.path).load(args.problem), args.threshold)))
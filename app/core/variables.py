@@ -0,0 +1,156 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+
+class ShiftVars:
+    """
+    Flat store for the shift decision variables.
+
+    shifts[p, d, s] = 1 if person p works shift s on day d.
+
+    The variables live in a single list laid out person-major
+    (person, day, shift), so every lookup is stride arithmetic instead of a
+    hash of a 3-tuple, and the common slices are plain list slices.
+
+    Example:
+        shifts = ShiftVars(model, num_staff=31, num_days=31, num_shifts=6)
+        shifts[3, 10, 2]          # single variable, same as the old dict
+        shifts.person_day(3, 10)  # all shifts of person 3 on day 10
+        shifts.day_shift(10, 2)   # all people on shift 2 on day 10
+
+    fixed: optional staff x day x shift array of 0, 1 or -1 (see
+    app.core.reduction.fixed_cells). Variables are only created for the -1
+    cells; the others hold the plain int 0 or 1, so sums and linear
+    expressions work unchanged. Use fix() and add() to state constraints on
+    cells that may be constant.
+    """
+
+    def __init__(self, model: "cp_model.CpModel", num_staff, num_days, num_shifts, named=True, fixed=None):
+        self.num_staff = num_staff
+        self.num_days = num_days
+        self.num_shifts = num_shifts
+
+        # Strides of the flat (person, day, shift) layout
+        self.day_stride = num_shifts
+        self.person_stride = num_days * num_shifts
+
+        # Flat value of every cell, -1 where a variable is created
+        size = num_staff * self.person_stride
+        if fixed is None:
+            self.fixed = np.full(size, -1, dtype=np.int8)
+        else:
+            self.fixed = np.asarray(fixed, dtype=np.int8).reshape(size)
+        self.free = self.fixed < 0
+        self.num_vars = int(self.free.sum())
+
+        values = self.fixed.tolist()
+        if named:
+            cells = ((p, d, s) for p in range(num_staff) for d in range(num_days) for s in range(num_shifts))
+            self.vars = [
+                model.NewBoolVar(f"sh_p{p}_d{d}_s{s}") if value < 0 else value
+                for (p, d, s), value in zip(cells, values)
+            ]
+        else:
+            self.vars = [model.NewBoolVar("") if value < 0 else value for value in values]
+
+        # The variables are created back to back, so they occupy one contiguous
+        # block of the model's variable array starting here, in flat order.
+        first = next((v for v in self.vars if not is_constant(v)), None)
+        self.first_index = first.Index() if first is not None else 0
+
+    def __len__(self):
+        return len(self.vars)
+
+    def __iter__(self):
+        return iter(self.vars)
+
+    def index(self, p, d, s):
+        """Position of (p, d, s) in the flat variable list."""
+        return p * self.person_stride + d * self.day_stride + s
+
+    def __getitem__(self, key):
+        p, d, s = key
+        return self.vars[p * self.person_stride + d * self.day_stride + s]
+
+    def person(self, p):
+        """All variables of person p, day-major."""
+        start = p * self.person_stride
+        return self.vars[start:start + self.person_stride]
+
+    def person_day(self, p, d):
+        """All shifts of person p on day d."""
+        start = p * self.person_stride + d * self.day_stride
+        return self.vars[start:start + self.num_shifts]
+
+    def person_shift(self, p, s):
+        """Shift s of person p on every day."""
+        start = p * self.person_stride + s
+        return self.vars[start:start + self.person_stride:self.day_stride]
+
+    def day(self, d):
+        """All shifts of all people on day d."""
+        return [v for p in range(self.num_staff) for v in self.person_day(p, d)]
+
+    def day_shift(self, d, s, people=None):
+        """Everyone (or only `people`) on shift s on day d."""
+        if people is None:
+            return self.vars[d * self.day_stride + s::self.person_stride]
+        base = d * self.day_stride + s
+        return [self.vars[p * self.person_stride + base] for p in people]
+
+    def shift(self, s):
+        """Shift s of every person on every day."""
+        return self.vars[s::self.day_stride]
+
+
+def is_constant(var):
+    """True for a cell the pre-reduction replaced by 0 or 1."""
+    return isinstance(var, int)
+
+
+def fix(model: "cp_model.CpModel", var, value):
+    """
+    State var == value. Nothing is added if var is already that constant;
+    a constant with the other value makes the model infeasible.
+    """
+    if not is_constant(var):
+        model.Add(var == value)
+    elif var != value:
+        model.AddBoolOr([])
+
+
+def add(model: "cp_model.CpModel", ct):
+    """
+    model.Add for expressions that may have reduced to a plain bool because
+    all their cells are constant. Nothing is added for True, and the model
+    is made infeasible for False.
+    """
+    if ct is True:
+        return None
+    if ct is False:
+        return model.AddBoolOr([])
+    return model.Add(ct)
+
+
+def add_at_most_one(model: "cp_model.CpModel", literals):
+    """AddAtMostOne over cells that may be constant."""
+    ones = sum(1 for v in literals if is_constant(v) and v)
+    free = [v for v in literals if not is_constant(v)]
+    if ones > 1:
+        model.AddBoolOr([])
+    elif ones == 1:
+        for v in free:
+            model.Add(v == 0)
+    elif len(free) > 1:
+        model.AddAtMostOne(free)
+
+
+def add_bool_or(model: "cp_model.CpModel", literals):
+    """AddBoolOr (at least one is 1) over cells that may be constant."""
+    if any(is_constant(v) and v for v in literals):
+        return
+    model.AddBoolOr([v for v in literals if not is_constant(v)])
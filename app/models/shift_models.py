@@ -0,0 +1,210 @@
+import base64
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field, model_validator
+
+from app.core.problem import Coverage, ScheduleProblem
+from app.models import staff_data
+from app.models.staff_data import Role
+
+
+class StaffMember(BaseModel):
+    """A staff member in a request body; mirrors app.models.staff_data.StaffMember."""
+    id: int = Field(ge=0)
+    name: str
+    role: Role
+    seniority: int
+    gender: Literal["F", "M"]
+    is_supervisor: bool = False
+    supervisor_type: Optional[str] = None
+    annual_leave_days: int = Field(30, ge=0)
+    training_days_per_year: int = Field(3, ge=0)
+
+    @classmethod
+    def from_staff(cls, member: staff_data.StaffMember) -> "StaffMember":
+        return cls.model_construct(**vars(member))
+
+    def to_staff(self) -> staff_data.StaffMember:
+        return staff_data.StaffMember(**dict(self))
+
+
+class CoverageConfig(BaseModel):
+    """Staffing of one kind of day; see app.core.problem.Coverage."""
+    day: int = Field(ge=0)
+    evening: int = Field(ge=0)
+    night: int = Field(ge=0)
+    min_professionals: Tuple[int, int, int] = (0, 0, 0)  # per D, E, N
+    min_helpers: Tuple[int, int, int] = (0, 0, 0)
+
+
+class ProblemConfig(BaseModel):
+    """
+    A scheduling problem in a request body; see ScheduleProblem for the
+    fields. The checks across fields run once over the whole payload, so
+    a roster of thousands validates in milliseconds.
+    """
+    staff: List[StaffMember]
+    num_days: int = Field(ge=1, le=366)
+    holidays: List[int] = []
+    normal_coverage: CoverageConfig
+    holiday_coverage: CoverageConfig
+    leave_total: int = Field(ge=0)
+    training_total: int = Field(ge=0)
+    max_leave_per_person: int = Field(2, ge=0)
+    max_training_per_person: int = Field(3, ge=0)
+    max_monthly_workload: int = Field(26, ge=0)
+    relief_max_shifts: int = Field(25, ge=0)
+    monthly_leave_total: int = Field(78, ge=0)
+    unavailable: Dict[int, List[int]] = {}  # person id -> days without any shift
+    constraint_groups: Optional[List[str]] = None
+    name: str = ""
+
+    @model_validator(mode="after")
+    def _check_ids_and_days(self):
+        ids = np.fromiter((member.id for member in self.staff), dtype=np.int64, count=len(self.staff))
+        wrong = np.flatnonzero(ids != np.arange(len(ids)))
+        if len(wrong):
+            raise ValueError(f"staff[{wrong[0]}] has id {ids[wrong[0]]}; ids must match roster positions")
+        outside = sorted(d for d in self.holidays if not 0 <= d < self.num_days)
+        if outside:
+            raise ValueError(f"holidays {outside} fall outside the {self.num_days}-day horizon")
+        for person, days in self.unavailable.items():
+            if not 0 <= person < len(self.staff):
+                raise ValueError(f"unavailable person {person} is not on the roster")
+            if any(not 0 <= d < self.num_days for d in days):
+                raise ValueError(f"unavailable days of person {person} fall outside the {self.num_days}-day horizon")
+        return self
+
+    @classmethod
+    def from_problem(cls, problem: ScheduleProblem) -> "ProblemConfig":
+        return cls(
+            staff=[StaffMember.from_staff(member) for member in problem.staff],
+            num_days=problem.num_days,
+            holidays=sorted(problem.holidays),
+            normal_coverage=CoverageConfig(**vars(problem.normal_coverage)),
+            holiday_coverage=CoverageConfig(**vars(problem.holiday_coverage)),
+            leave_total=problem.leave_total,
+            training_total=problem.training_total,
+            max_leave_per_person=problem.max_leave_per_person,
+            max_training_per_person=problem.max_training_per_person,
+            max_monthly_workload=problem.max_monthly_workload,
+            relief_max_shifts=problem.relief_max_shifts,
+            monthly_leave_total=problem.monthly_leave_total,
+            unavailable={p: sorted(days) for p, days in problem.unavailable.items()},
+            constraint_groups=None if problem.constraint_groups is None else list(problem.constraint_groups),
+            name=problem.name,
+        )
+
+    def to_problem(self) -> ScheduleProblem:
+        return ScheduleProblem(
+            staff=tuple(member.to_staff() for member in self.staff),
+            num_days=self.num_days,
+            holidays=frozenset(self.holidays),
+            normal_coverage=Coverage(**dict(self.normal_coverage)),
+            holiday_coverage=Coverage(**dict(self.holiday_coverage)),
+            leave_total=self.leave_total,
+            training_total=self.training_total,
+            max_leave_per_person=self.max_leave_per_person,
+            max_training_per_person=self.max_training_per_person,
+            max_monthly_workload=self.max_monthly_workload,
+            relief_max_shifts=self.relief_max_shifts,
+            monthly_leave_total=self.monthly_leave_total,
+            unavailable={p: frozenset(days) for p, days in self.unavailable.items()},
+            constraint_groups=self.constraint_groups,
+            name=self.name,
+        )
+
+
+class ShiftMatrix(BaseModel):
+    """
+    A staff x day shift matrix (see app.core.solution.shift_matrix) as
+    base64 of its int8 codes, person by person: a shift's position in
+    shift_types, -1 for a day off. A month of 5,000 people takes about
+    200 KB, where the per-day staff id lists take megabytes.
+    """
+    shift_types: List[str]
+    num_staff: int = Field(ge=0)
+    num_days: int = Field(ge=0)
+    codes: str
+
+    @model_validator(mode="after")
+    def _check_codes(self):
+        codes = self.to_matrix()
+        if codes.size and (codes.min() < -1 or codes.max() >= len(self.shift_types)):
+            raise ValueError(f"shift codes must be -1 (off) or below {len(self.shift_types)}")
+        return self
+
+    @classmethod
+    def from_matrix(cls, matrix, shift_types) -> "ShiftMatrix":
+        matrix = np.ascontiguousarray(matrix, dtype=np.int8)
+        num_staff, num_days = matrix.shape
+        # built from a valid matrix: skip validation
+        return cls.model_construct(
+            shift_types=list(shift_types),
+            num_staff=num_staff,
+            num_days=num_days,
+            codes=base64.b64encode(matrix.tobytes()).decode("ascii"),
+        )
+
+    def to_matrix(self) -> np.ndarray:
+        try:
+            codes = np.frombuffer(base64.b64decode(self.codes, validate=True), dtype=np.int8)
+        except ValueError as exc:  # binascii.Error
+            raise ValueError(f"codes are not base64: {exc}") from None
+        if codes.size != self.num_staff * self.num_days:
+            raise ValueError(f"{codes.size} codes for {self.num_staff} staff x {self.num_days} days")
+        return codes.reshape(self.num_staff, self.num_days)
+
+
+class SolveRequest(BaseModel):
+    """
+    Body of POST /solve: solver settings on top of a preset (see
+    app.core.solver_config) and the problem to solve, by default the
+    server's.
+    """
+    preset: str = "balanced"  # fast_draft, balanced or prove_optimal
+    time_limit: Optional[float] = Field(None, gt=0)
+    relative_gap_limit: Optional[float] = Field(None, ge=0)
+    random_seed: Optional[int] = None
+    problem: Optional[ProblemConfig] = None
+
+
+class JobInfo(BaseModel):
+    """A solve job as GET /jobs/{id} reports it."""
+    id: str
+    state: str                    # queued, running, done, cancelled or failed
+    solver_status: Optional[str]  # CP-SAT status once the search has ended
+    objective: Optional[float]    # best objective so far
+    best_bound: Optional[float]
+    gap: Optional[float]
+    solutions: int                # improving solutions found so far
+    elapsed: float                # seconds since the job started running
+    error: Optional[str] = None
+
+
+class JobSchedule(BaseModel):
+    """Best schedule of a job so far; once the search has ended, its result."""
+    id: str
+    state: str
+    solver_status: Optional[str]
+    objective: Optional[float]
+    best_bound: Optional[float]
+    gap: Optional[float]
+    matrix: ShiftMatrix
+
+
+class SolutionDiff(BaseModel):
+    """
+    A `solution` event of GET /jobs/{id}/events. The first one a client
+    receives holds the whole schedule; the later ones only the cells that
+    changed since the previous event it received.
+    """
+    index: int                    # solution number within the search, from 0
+    skipped: int                  # improving solutions not sent since the previous event
+    objective: float
+    best_bound: float
+    gap: float
+    elapsed: float                # seconds since the search started
+    matrix: Optional[ShiftMatrix] = None
+    changes: Optional[List[Tuple[int, int, Optional[str]]]] = None  # [person, day, shift type or null for off]
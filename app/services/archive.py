@@ -0,0 +1,134 @@
+"""
+Binary archive of published schedules, keyed by ward and month.
+
+    archive/
+      <ward>/
+        index.json      calendar and roster of every month of the ward
+        <month>.npy     staff x day int8 shift codes (see Schedule.codes)
+
+A month is one small .npy file that is memory-mapped on load, so reading
+one ward touches only that ward's files and reading one person's history
+touches one row per month. Appending a month writes its array and
+rewrites the ward index, each through a temporary file, so a crash never
+leaves a half-written entry behind.
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.solution import Schedule
+from app.models.staff_data import Role, StaffMember
+
+INDEX_FILE = "index.json"
+
+
+def _check_key(kind, key):
+    if not key or key != os.path.basename(key) or key.startswith("."):
+        raise ValueError(f"{kind} {key!r} cannot be used as a file name")
+    return key
+
+
+def _staff_record(member):
+    return {
+        "name": member.name,
+        "role": member.role.value,
+        "seniority": member.seniority,
+        "gender": member.gender,
+        "is_supervisor": member.is_supervisor,
+        "supervisor_type": member.supervisor_type,
+    }
+
+
+def _staff_member(i, record):
+    return StaffMember(
+        i, record["name"], Role(record["role"]), record["seniority"], record["gender"],
+        record["is_supervisor"], record["supervisor_type"],
+    )
+
+
+class ScheduleArchive:
+    """Append-only store of Schedules under `root`, one directory per ward."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _ward_dir(self, ward):
+        return os.path.join(self.root, _check_key("ward", ward))
+
+    def _index(self, ward) -> Dict[str, dict]:
+        path = os.path.join(self._ward_dir(ward), INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def wards(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(w for w in os.listdir(self.root) if os.path.exists(os.path.join(self.root, w, INDEX_FILE)))
+
+    def months(self, ward) -> List[str]:
+        return sorted(self._index(ward))
+
+    def append(self, ward, month, schedule: Schedule, replace=False):
+        """
+        Store `schedule` as `month` of `ward`. Raises ValueError if the
+        month is already archived, unless replace is set.
+        """
+        month = _check_key("month", month)
+        index = self._index(ward)
+        if month in index and not replace:
+            raise ValueError(f"{ward} {month} is already archived")
+
+        ward_dir = self._ward_dir(ward)
+        os.makedirs(ward_dir, exist_ok=True)
+        tmp = os.path.join(ward_dir, f".{month}.npy")
+        np.save(tmp, np.ascontiguousarray(schedule.codes))
+        os.replace(tmp, os.path.join(ward_dir, f"{month}.npy"))
+
+        index[month] = {
+            "shift_types": list(schedule.shift_types),
+            "holidays": sorted(schedule.holidays),
+            "start_date": None if schedule.start_date is None else schedule.start_date.strftime("%Y-%m-%d"),
+            "staff": None if schedule.staff is None else [_staff_record(m) for m in schedule.staff],
+        }
+        tmp = os.path.join(ward_dir, f".{INDEX_FILE}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(ward_dir, INDEX_FILE))
+
+    def _codes(self, ward, month, mmap=True):
+        path = os.path.join(self._ward_dir(ward), f"{_check_key('month', month)}.npy")
+        return np.load(path, mmap_mode="r" if mmap else None)
+
+    def load(self, ward, month, mmap=True) -> Schedule:
+        """One month of one ward; with mmap, the codes stay on disk until read."""
+        meta = self._index(ward)[month]
+        staff = meta["staff"]
+        return Schedule(
+            self._codes(ward, month, mmap),
+            meta["shift_types"],
+            frozenset(meta["holidays"]),
+            None if staff is None else tuple(_staff_member(i, r) for i, r in enumerate(staff)),
+            meta["start_date"],
+        )
+
+    def load_ward(self, ward, months: Optional[Iterable[str]] = None, mmap=True) -> Dict[str, Schedule]:
+        """{month: Schedule} of one ward, all months or only `months`."""
+        return {month: self.load(ward, month, mmap) for month in (self.months(ward) if months is None else months)}
+
+    def person_history(self, name, wards: Optional[Iterable[str]] = None) -> Dict[Tuple[str, str], np.ndarray]:
+        """
+        {(ward, month): that month's shift codes of the person called `name`},
+        for every archived month whose roster has that name. Only the ward
+        indexes and one memory-mapped row per month are read.
+        """
+        history = {}
+        for ward in (self.wards() if wards is None else wards):
+            for month, meta in sorted(self._index(ward).items()):
+                names = [r["name"] for r in meta["staff"] or ()]
+                if name in names:
+                    history[ward, month] = np.array(self._codes(ward, month)[names.index(name)])
+        return history
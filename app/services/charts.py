@@ -0,0 +1,91 @@
+"""
+Headless rendering of the shift summary charts, for the nightly report
+bundles.
+
+The charts of plot_shift_summary are drawn on Agg canvases without
+pyplot. No GUI backend is needed, and pyplot's figure registry never
+holds a figure, so each one is freed once it is saved. Months render in a
+process pool.
+
+    python -m app.services.charts ARCHIVE OUT [--format png svg] [--plain] [--processes N]
+
+writes OUT/<ward>/<month>/<chart>.<format> for every month of the
+ScheduleArchive at ARCHIVE.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from app.core.batch import plan_workers
+from app.core.solution import Schedule
+from app.services.schedule_info import FIGSIZE, SUMMARY_FIGURES, draw_summary, shift_count_table, summary_frame
+
+
+def render_shift_summary(summary, directory, formats: Sequence[str] = ("png",), styled=True, dpi=100) -> List[str]:
+    """
+    Write every chart of plot_shift_summary to `directory` as
+    <chart>.<format> and return the paths.
+
+    summary: a Schedule with staff, a shift_count_table or the
+    count_shifts_by_day_and_category dict.
+    styled: seaborn styling; off, plain matplotlib bars render faster.
+    """
+    if isinstance(summary, Schedule):
+        summary = shift_count_table(summary)
+    plot_df = summary_frame(summary)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for name, column, title, ylabel in SUMMARY_FIGURES:
+        fig = Figure(figsize=FIGSIZE)
+        FigureCanvasAgg(fig)
+        draw_summary(fig, plot_df, column, title, ylabel, styled)
+        for fmt in formats:
+            path = os.path.join(directory, f"{name}.{fmt}")
+            fig.savefig(path, format=fmt, dpi=dpi)
+            paths.append(path)
+        fig.clear()
+    return paths
+
+
+def render_batch(summaries: Mapping[Tuple[str, str], object], out_dir, formats: Sequence[str] = ("png",),
+                 styled=True, max_processes=None) -> Dict[Tuple[str, str], List[str]]:
+    """
+    Render {(ward, month): summary} (see render_shift_summary) into
+    out_dir/<ward>/<month>/ in a process pool; returns
+    {(ward, month): paths}.
+    """
+    if not summaries:
+        return {}
+    processes, _ = plan_workers(len(summaries), max_processes)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {
+            pool.submit(render_shift_summary, summary, os.path.join(out_dir, ward, month), formats, styled): (ward, month)
+            for (ward, month), summary in summaries.items()
+        }
+        return {futures[future]: future.result() for future in as_completed(futures)}
+
+
+if __name__ == "__main__":
+    from app.services.archive import ScheduleArchive
+
+    parser = argparse.ArgumentParser(description="Render the shift summary charts of every archived month.")
+    parser.add_argument("archive", help="ScheduleArchive root")
+    parser.add_argument("out", help="output directory")
+    parser.add_argument("--format", nargs="+", default=["png"], choices=["png", "svg", "pdf"])
+    parser.add_argument("--plain", action="store_true", help="skip seaborn styling (faster)")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    archive = ScheduleArchive(args.archive)
+    summaries = {
+        (ward, month): schedule
+        for ward in archive.wards()
+        for month, schedule in archive.load_ward(ward, mmap=False).items()
+    }
+    rendered = render_batch(summaries, args.out, args.format, not args.plain, args.processes)
+    print(f"{sum(len(paths) for paths in rendered.values())} charts of {len(rendered)} months written to {args.out}")
@@ -0,0 +1,215 @@
+"""
+Background solve jobs behind the HTTP API (app.api.routes).
+
+A bounded thread pool runs at most max_workers searches at once and
+queues the rest. CP-SAT releases the GIL while it searches, so the
+event loop of the API stays responsive. Each job streams its improving
+solutions (app.core.streaming.SolutionStream), so its status shows the
+best objective and gap while the search runs, and Job.updates lets a
+coroutine follow them. Cancelling stops the search and keeps the best
+schedule found so far.
+"""
+import asyncio
+import contextlib
+import dataclasses
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.batch import plan_workers
+from app.core.precheck import check_feasibility
+from app.core.problem import ScheduleProblem, default_problem
+from app.core.solution import ScheduleResult
+from app.core.solver_config import SolverConfig
+from app.core.streaming import SolutionEvent, SolutionStream
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = "queued", "running", "done", "cancelled", "failed"
+
+# Seconds a job may search at most, whatever its config asks for, so that
+# the queue behind it always moves
+MAX_TIME_LIMIT = 600.0
+
+
+@dataclass
+class Job:
+    """One submitted solve; the pool thread running it updates it in place."""
+    id: str
+    problem: ScheduleProblem
+    config: SolverConfig
+    state: str = QUEUED
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    best: Optional[SolutionEvent] = None  # latest improving solution
+    solutions: int = 0
+    result: Optional[ScheduleResult] = None
+    error: Optional[str] = None
+    cancelled: bool = False
+    _stream: Optional[SolutionStream] = field(default=None, repr=False)
+    _watchers: list = field(default_factory=list, repr=False)  # (event loop, asyncio.Event) per watcher
+
+    @property
+    def solver_status(self):
+        return self.result.status if self.result is not None else None
+
+    @property
+    def objective(self):
+        if self.result is not None and self.result.found:
+            return self.result.objective
+        return self.best.objective if self.best is not None else None
+
+    @property
+    def best_bound(self):
+        if self.result is not None and self.result.found:
+            return self.result.best_bound
+        return self.best.best_bound if self.best is not None else None
+
+    @property
+    def gap(self):
+        if self.result is not None and self.result.found:
+            return self.result.gap
+        return self.best.gap if self.best is not None else None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        """Staff x day shift matrix of the best schedule so far, None before the first."""
+        if self.result is not None and self.result.matrix is not None:
+            return self.result.matrix
+        return self.best.matrix if self.best is not None else None
+
+    async def updates(self):
+        """
+        Follow the search from a coroutine: yields (event, skipped) each
+        time a better solution than the last one yielded has been found,
+        then ends when the job finishes.
+
+        Only the latest solution is kept for each watcher, so a watcher
+        slower than the search skips the intermediate ones; `skipped`
+        counts them.
+        """
+        wake = asyncio.Event()
+        watcher = (asyncio.get_running_loop(), wake)
+        self._watchers.append(watcher)
+        try:
+            sent = -1
+            while True:
+                finished = self.finished is not None  # read before best: a finished job's best is final
+                best = self.best
+                if best is not None and best.index > sent:
+                    yield best, best.index - sent - 1
+                    sent = best.index
+                elif finished:
+                    return
+                else:
+                    await wake.wait()
+                    wake.clear()
+        finally:
+            self._watchers.remove(watcher)
+
+    def _notify(self):
+        for loop, wake in list(self._watchers):
+            with contextlib.suppress(RuntimeError):  # the watcher's loop has closed
+                loop.call_soon_threadsafe(wake.set)
+
+
+class JobManager:
+    """
+    Runs solve jobs in a pool of max_workers threads.
+
+    The machine's cores are split between the concurrent searches (see
+    app.core.batch.plan_workers), and each search stops after at most
+    max_time_limit seconds. Only the newest `keep` finished jobs are
+    remembered.
+    """
+
+    def __init__(self, max_workers=2, problem: ScheduleProblem = None, keep=1000, max_time_limit=MAX_TIME_LIMIT):
+        self.max_workers = max_workers
+        self.problem = problem if problem is not None else default_problem()
+        self.keep = keep
+        self.max_time_limit = max_time_limit
+        _, self.threads_per_job = plan_workers(max_workers, max_workers)
+        self._jobs: Dict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solve-job")
+
+    def submit(self, config: SolverConfig, problem: ScheduleProblem = None) -> Job:
+        """
+        Queue a solve of `problem` (default: the manager's problem). A
+        config without a time limit, or a longer one, gets max_time_limit.
+
+        Raises InfeasibleProblemError right away if the pre-solve checks
+        fail.
+        """
+        problem = problem if problem is not None else self.problem
+        check_feasibility(problem)
+        time_limit = self.max_time_limit if config.time_limit is None else min(config.time_limit, self.max_time_limit)
+        config = dataclasses.replace(config, num_workers=self.threads_per_job, time_limit=time_limit)
+        job = Job(uuid.uuid4().hex, problem, config)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old()
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id) -> Optional[Job]:
+        """Stop a job; a queued job never starts. None if there is no such job."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancelled = True
+        if job.state == QUEUED:
+            job.state, job.finished = CANCELLED, time.time()
+            job._notify()
+        elif job._stream is not None:
+            job._stream.stop()
+        return job
+
+    def shutdown(self):
+        """Cancel every job and wait for the pool to wind down."""
+        with self._lock:
+            ids = list(self._jobs)
+        for job_id in ids:
+            self.cancel(job_id)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _forget_old(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job):
+        if job.cancelled:
+            return
+        job.state, job.started = RUNNING, time.time()
+        try:
+            stream = SolutionStream(job.problem, job.config, precheck=False)
+            job._stream = stream
+            if job.cancelled:  # cancelled while the model was built
+                stream.stop()
+            for event in stream:
+                job.best = event
+                job.solutions += 1
+                job._notify()
+            job.result = stream.result
+            job.state = CANCELLED if job.cancelled else DONE
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.state = FAILED
+        finally:
+            job.finished = time.time()
+            job._notify()
@@ -0,0 +1,142 @@
+"""
+Solve and publish in one process.
+
+One solve gives one in-memory Schedule. Every requested output is
+written from that object concurrently, so nothing is reloaded from
+disk:
+
+    json     the per-day schedule JSON (Schedule.to_json)
+    excel    the flat day / shift / staff sheet (schedule_json_to_excel)
+    roster   the hospital-style roster, RTL (write_hospital_style_schedule)
+    stats    head counts per day and shift as CSV (shift_count_table)
+
+The writers run on threads, and the caller may return before they
+finish (wait=False). Each stage's wall time lands in PipelineRun.timings.
+"""
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional
+
+from app.core.problem import ScheduleProblem, default_problem
+from app.core.solution import Schedule, ScheduleResult
+
+
+def _write_json(schedule, path):
+    import json
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schedule.to_json(), f, ensure_ascii=False, indent=2)
+
+
+def _write_excel(schedule, path):
+    from app.services.report import schedule_json_to_excel
+
+    schedule_json_to_excel(schedule, path)
+
+
+def _write_roster(schedule, path):
+    from app.services.report import write_hospital_style_schedule
+
+    write_hospital_style_schedule(schedule, path, is_rtl=True)
+
+
+def _write_stats(schedule, path):
+    from app.services.schedule_info import shift_count_table
+
+    shift_count_table(schedule).to_csv(path, index=False)
+
+
+WRITERS = {
+    "json": _write_json,
+    "excel": _write_excel,
+    "roster": _write_roster,
+    "stats": _write_stats,
+}
+
+
+@dataclass
+class PipelineRun:
+    """
+    Outcome of run_pipeline.
+
+    schedule: the solved Schedule, None if no solution was found
+    timings: seconds per stage ("solve", "schedule", each output and
+        "publish", the wall time until all outputs were written)
+    futures: the output writers, {name: Future of the path}
+    """
+    result: ScheduleResult
+    schedule: Optional[Schedule]
+    timings: Dict[str, float] = field(default_factory=dict)
+    futures: Dict[str, Future] = field(default_factory=dict)
+
+    def wait(self) -> Dict[str, str]:
+        """Block until every output is written and return {name: path}; re-raises a writer's error."""
+        return {name: future.result() for name, future in self.futures.items()}
+
+
+def _timed(name, write, schedule, path, timings):
+    start = time.perf_counter()
+    write(schedule, path)
+    timings[name] = time.perf_counter() - start
+    return path
+
+
+def publish(schedule: Schedule, outputs: Mapping[str, str], timings: Optional[Dict[str, float]] = None,
+            executor=None) -> Dict[str, Future]:
+    """
+    Start writing `schedule` to every {name: path} of `outputs` (names
+    from WRITERS) and return their futures. Without an `executor` the
+    writers get threads of their own, which finish in the background.
+
+    Raises ValueError on an unknown output name.
+    """
+    unknown = set(outputs) - WRITERS.keys()
+    if unknown:
+        raise ValueError(f"Unknown outputs {sorted(unknown)}; choose from {list(WRITERS)}")
+    timings = {} if timings is None else timings
+
+    pool = executor or ThreadPoolExecutor(max_workers=max(1, len(outputs)), thread_name_prefix="publish")
+    futures = {name: pool.submit(_timed, name, WRITERS[name], schedule, path, timings)
+               for name, path in outputs.items()}
+    if executor is None:
+        pool.shutdown(wait=False)  # the submitted writers still run
+    return futures
+
+
+def run_pipeline(problem: ScheduleProblem = None, config=None, outputs: Optional[Mapping[str, str]] = None,
+                 start_date=None, history=None, precheck=True, wait=True) -> PipelineRun:
+    """
+    Solve `problem` (default: default_problem()) with generate_schedule
+    and publish the Schedule to `outputs` ({name: path}, see WRITERS;
+    none keeps it in memory only).
+
+    wait: return after every output is written. With wait=False the run
+    comes back as soon as the schedule is ready; call run.wait().
+    """
+    from app.core.scheduler import generate_schedule
+
+    if problem is None:
+        problem = default_problem()
+    timings = {}
+
+    start = time.perf_counter()
+    result = generate_schedule(problem, config, precheck=precheck, history=history)
+    timings["solve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schedule = result.to_schedule(problem, start_date=start_date)
+    timings["schedule"] = time.perf_counter() - start
+
+    run = PipelineRun(result, schedule, timings)
+    if schedule is not None and outputs:
+        start = time.perf_counter()
+        run.futures = publish(schedule, outputs, timings)
+        if wait:
+            run.wait()
+            timings["publish"] = time.perf_counter() - start
+    return run
+
+
+def format_timings(timings: Mapping[str, float]) -> str:
+    return "\n".join(f"{stage:<10} {seconds:8.3f} s" for stage, seconds in timings.items())
@@ -1,12 +1,11 @@
-import pandas as pd
 import jdatetime
 
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Alignment
 import calendar
+from dataclasses import replace
 from datetime import datetime, timedelta
 
+from app.core.solution import Schedule
+
 SHIFT_TYPES = ["M", "A", "D", "E", "N", "DE"]
 HOLIDAYS = [6, 13, 14, 15, 20, 27]
 
@@ -19,10 +18,61 @@ SHIFT_COLORS = {
     "N": "D9D2E9",  # Light Purple
     "DE": "F4B084"  # Light Orange
 }
+HOLIDAY_COLOR = "C00000"  # powerfull red
+ROW_HEIGHT = 20
+
+def as_schedule(schedule, start_date=None) -> Schedule:
+    """Accept a Schedule or the per-day schedule JSON (see Schedule.from_json)."""
+    if isinstance(schedule, Schedule):
+        return schedule
+    return Schedule.from_json(schedule, SHIFT_TYPES, start_date=start_date)
+
+
+def day_columns(dates):
+    """Column label of each day: "<day of month> (<weekday>)"."""
+    return [f"{date.day} ({date.strftime('%A')})" for date in dates]
+
+
+def roster_days(schedule_json, start_date=None):
+    """
+    (schedule, day column labels, holiday day indices) of a roster. The
+    start date is `start_date`, else the schedule's own, else 1403-04-01.
+    Holidays are the schedule's own, else the HOLIDAYS days of the month.
+    """
+    schedule = as_schedule(schedule_json)
+    if start_date is not None:
+        schedule = replace(schedule, start_date=start_date)
+    elif schedule.start_date is None:
+        schedule = replace(schedule, start_date=jdatetime.date(1403, 4, 1))
+    dates = schedule.dates()
+
+    if schedule.holidays:
+        holiday_days = sorted(schedule.holidays)
+    else:
+        holiday_days = [d for d, date in enumerate(dates) if date.day in HOLIDAYS]
+    return schedule, day_columns(dates), holiday_days
+
+
+def roster_info(schedule, staff_names=None, staff_list=None):
+    """Name, Supervisor Type, Role and Gender of each row of the roster."""
+    if staff_names is None:
+        staff_names = {}
+    if staff_list is None:
+        staff_list = schedule.staff or [None] * schedule.num_staff  # Fallback dummy list
+
+    data = []
+    for i in range(schedule.num_staff):
+        staff_name = staff_names.get(i, f"Staff {i}")
+        role = staff_list[i].role.value if staff_list[i] else "Unknown"
+        gender = staff_list[i].gender if staff_list[i] else "Unknown"
+        sup_type = staff_list[i].supervisor_type if staff_list[i] else "None"
+        data.append({"Name": staff_name, "Supervisor Type": sup_type, "Role": role, "Gender": gender})
+    return data
+
 
 def schedule_json_to_excel(schedule_json, excel_filepath):
     """
-    Converts the schedule JSON into an Excel file.
+    Converts the schedule JSON (or a Schedule) into an Excel file.
     
     schedule_json: List of dictionaries like
       [
@@ -32,6 +82,10 @@ def schedule_json_to_excel(schedule_json, excel_filepath):
       ]
     excel_filepath: path to save the Excel file (e.g. "schedule.xlsx")
     """
+    import pandas as pd
+
+    if isinstance(schedule_json, Schedule):
+        schedule_json = schedule_json.to_json()
 
     # Prepare a list to build DataFrame rows
     rows = []
@@ -384,56 +438,25 @@ def schedule_json_to_excel(schedule_json, excel_filepath):
 
 
 def create_hospital_style_schedule(schedule_json, excel_filepath, staff_names=None, staff_list=None, start_date=None, is_rtl=False):
+    """
+    Staff x day Excel roster, shifts color-coded and holidays marked.
+
+    schedule_json: a Schedule or the per-day schedule JSON. A Schedule
+    brings its own start date, holidays and staff list; the arguments
+    override them.
+    """
     from openpyxl.styles import PatternFill, Alignment
     import pandas as pd
     from openpyxl import load_workbook
 
-    TOTAL_STAFF = max(max(staff_ids) if staff_ids else 0 for day in schedule_json for staff_ids in day.values()) + 1
-
-    if staff_names is None:
-        staff_names = {i: f"Staff {i}" for i in range(TOTAL_STAFF)}
-
-    if staff_list is None:
-        staff_list = [None] * TOTAL_STAFF  # Fallback dummy list
-
-    # Prepare columns — using Persian date if no start_date provided
-    columns = []
-    if start_date is None:
-        base_date = jdatetime.date(1403, 4, 1)
-    elif isinstance(start_date, str):
-        y, m, d = map(int, start_date.split("-"))
-        base_date = jdatetime.date(y, m, d)
-    else:
-        base_date = start_date
-
-    for day_idx in range(len(schedule_json)):
-        current_date = base_date + jdatetime.timedelta(days=day_idx)
-        weekday_name = current_date.strftime("%A")
-        columns.append(f"{current_date.day} ({weekday_name})")
+    schedule, columns, holiday_days = roster_days(schedule_json, start_date)
+    TOTAL_STAFF = schedule.num_staff
+    holiday_columns = {columns[d] for d in holiday_days}
 
     # Prepare initial DataFrame with profession and gender columns
-    data = []
-    for i in range(TOTAL_STAFF):
-        staff_name = staff_names.get(i, f"Staff {i}")
-        role = staff_list[i].role.value if staff_list[i] else "Unknown"
-        gender = staff_list[i].gender if staff_list[i] else "Unknown"
-        sup_type = staff_list[i].supervisor_type if staff_list[i] else "None"
-        row = {"Name": staff_name, "Supervisor Type": sup_type, "Role": role, "Gender": gender}
-        data.append(row)
-
-    df = pd.DataFrame(data)
-    for col in columns:
-        df[col] = ""
-
-    # Fill in shifts
-    for day_idx, day_schedule in enumerate(schedule_json):
-        for shift_type, staff_ids in day_schedule.items():
-            for sid in staff_ids:
-                current_val = df.at[sid, columns[day_idx]]
-                if current_val:
-                    df.at[sid, columns[day_idx]] = current_val + ", " + shift_type
-                else:
-                    df.at[sid, columns[day_idx]] = shift_type
+    df = pd.DataFrame(roster_info(schedule, staff_names, staff_list))
+    # Fill in shifts, one staff x day block
+    df = pd.concat([df, pd.DataFrame(schedule.labels(), columns=columns)], axis=1)
 
     # Save to Excel
     df.to_excel(excel_filepath, index=False)
@@ -449,16 +472,15 @@ def create_hospital_style_schedule(schedule_json, excel_filepath, staff_names=No
     alignment = Alignment(horizontal="center", vertical="center")
     fills = {k: PatternFill(start_color=v, end_color=v, fill_type="solid") for k, v in SHIFT_COLORS.items()}
     # holiday_fill = PatternFill(start_color="F4CCCC", end_color="F4CCCC", fill_type="solid") # light red
-    holiday_fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid") # powerfull red
+    holiday_fill = PatternFill(start_color=HOLIDAY_COLOR, end_color=HOLIDAY_COLOR, fill_type="solid")
 
     num_info_columns = 4  # Name, Role, Gender , supervisor type
 
     # Style header cells (Persian date headers)
     for col_idx in range(num_info_columns + 1, num_info_columns + 1 + len(columns)):
-        day_number = int(columns[col_idx - num_info_columns - 1].split(" ")[0])
         header_cell = ws.cell(row=1, column=col_idx)
         header_cell.alignment = alignment
-        if day_number in HOLIDAYS:
+        if columns[col_idx - num_info_columns - 1] in holiday_columns:
             header_cell.fill = holiday_fill
 
     # Style data cells
@@ -470,7 +492,6 @@ def create_hospital_style_schedule(schedule_json, excel_filepath, staff_names=No
             cell = ws.cell(row=row_idx, column=col_idx)
             cell.alignment = alignment
             cell_value = str(cell.value)
-            day_number = int(columns[col_idx - num_info_columns - 1].split(" ")[0])
 
             if cell_value:
                 first_shift = cell_value.split(",")[0].strip()
@@ -478,7 +499,7 @@ def create_hospital_style_schedule(schedule_json, excel_filepath, staff_names=No
                 if fill:
                     cell.fill = fill
 
-            if day_number in HOLIDAYS and cell.fill.patternType is None:
+            if columns[col_idx - num_info_columns - 1] in holiday_columns and cell.fill.patternType is None:
                 cell.fill = holiday_fill
 
     # Adjust column widths
@@ -491,7 +512,73 @@ def create_hospital_style_schedule(schedule_json, excel_filepath, staff_names=No
         ws.column_dimensions[col_letter].width = max_length + 2
 
     for row_idx in range(1, 2 + TOTAL_STAFF):
-        ws.row_dimensions[row_idx].height = 20
+        ws.row_dimensions[row_idx].height = ROW_HEIGHT
+
+    wb.save(excel_filepath)
+    print(f"Hospital style Excel schedule saved to {excel_filepath}")
+
+
+def write_hospital_style_schedule(schedule_json, excel_filepath, staff_names=None, staff_list=None, start_date=None, is_rtl=False):
+    """
+    The roster of create_hospital_style_schedule, written in one pass.
+
+    Rows stream through a write-only workbook and share a few named
+    styles. Column widths are computed from the labels before the first
+    row. The file is saved once and never reopened, so time and memory
+    stay linear in the roster. Use this one for hospital-wide rosters.
+    """
+    import numpy as np
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    schedule, columns, holiday_days = roster_days(schedule_json, start_date)
+    info = roster_info(schedule, staff_names, staff_list)
+    info_columns = list(info[0]) if info else ["Name", "Supervisor Type", "Role", "Gender"]
+    shift_types = schedule.shift_types
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    if is_rtl:
+        ws.sheet_view.rightToLeft = True
+    ws.sheet_format.defaultRowHeight = ROW_HEIGHT
+    ws.sheet_format.customHeight = True
+
+    def add_style(name, color=None):
+        style = NamedStyle(name=name, alignment=Alignment(horizontal="center", vertical="center"))
+        if color is not None:
+            style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        wb.add_named_style(style)
+        return name
+
+    plain = add_style("roster")
+    holiday = add_style("roster holiday", HOLIDAY_COLOR)
+    # style of each code; OFF (-1) takes the last entry, per day
+    shift_styles = [add_style(f"roster {s}", SHIFT_COLORS.get(s)) for s in shift_types]
+    off_styles = [plain] * schedule.num_days
+    for d in holiday_days:
+        off_styles[d] = holiday
+
+    # widths as the styled writer sizes them: longest non-empty value + 2
+    label_lengths = np.array([len(s) for s in shift_types] + [0])
+    day_widths = np.maximum(label_lengths[schedule.codes].max(axis=0, initial=0),
+                            [len(c) for c in columns])
+    info_widths = [max([len(str(row[c])) for row in info if row[c]] + [len(c)]) for c in info_columns]
+    for col_idx, width in enumerate(info_widths + day_widths.tolist(), start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width + 2
+
+    def cell(value, style):
+        c = WriteOnlyCell(ws, value)
+        c.style = style
+        return c
+
+    ws.append([cell(c, plain) for c in info_columns] +
+              [cell(c, off_styles[d]) for d, c in enumerate(columns)])
+    for row, codes in zip(info, schedule.codes.tolist()):
+        ws.append([cell(row[c], plain) for c in info_columns] +
+                  [cell(None, off_styles[d]) if code < 0 else cell(shift_types[code], shift_styles[code])
+                   for d, code in enumerate(codes)])
 
     wb.save(excel_filepath)
     print(f"Hospital style Excel schedule saved to {excel_filepath}")
@@ -1,113 +1,164 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pprint
 
+from app.core.solution import Schedule
+from app.models.staff_data import Role
+from app.services.report import roster_days
+
+# Head-count columns of the shift statistics
+CATEGORIES = ['Total', 'Female', 'Male', 'Professional', 'Helper']
+
+
+def _category_weights(genders, roles):
+    """Staff x CATEGORIES 0/1 matrix from genders ('F'/'M') and Role values."""
+    genders, roles = np.asarray(genders), np.asarray(roles)
+    return np.column_stack([np.ones(len(genders)), genders == 'F', genders == 'M',
+                            roles == Role.PROFESSIONAL.value, roles == Role.HELPER.value])
+
+
+def _count(codes, weights, num_codes):
+    """
+    Day x code x category head counts of a staff x day code matrix (negative
+    codes are skipped): one bincount per category over the worked cells.
+    """
+    num_days = codes.shape[1]
+    people, days = np.nonzero(codes >= 0)
+    index = days * num_codes + codes[people, days]
+    counts = [np.bincount(index, weights=w[people], minlength=num_days * num_codes) for w in weights.T]
+    return np.stack(counts, axis=-1).reshape(num_days, num_codes, len(counts)).astype(int)
+
+
+def shift_count_table(schedule, shift_types=None):
+    """
+    Head counts of every shift of every day, in total, by gender and by role.
+
+    Parameters:
+        schedule (Schedule or pd.DataFrame): a Schedule with staff, or the
+                                             DataFrame of an Excel roster
+                                             (as written by create_hospital_style_schedule).
+        shift_types (list, optional): Shift codes to count.
+                                      Defaults to ['D', 'E', 'N', 'M', 'DE'].
+
+    Returns:
+        pd.DataFrame: one row per day and shift, day-major: Day, Shift and
+                      the CATEGORIES counts.
+    """
+    if shift_types is None:
+        shift_types = ['D', 'E', 'N', 'M', 'DE']
+
+    if isinstance(schedule, Schedule):
+        if schedule.staff is None:
+            raise ValueError("the Schedule needs staff for per-category counts")
+        schedule, days, _ = roster_days(schedule)
+        codes, all_types = schedule.codes, list(schedule.shift_types)
+        weights = _category_weights([m.gender for m in schedule.staff], [m.role.value for m in schedule.staff])
+    else:
+        # Day columns are labelled "<day> (<weekday>)"
+        days = [col for col in schedule.columns if '(' in col]
+        all_types = list(shift_types)
+        # Labels outside shift_types (empty, NaN, ...) become -1
+        labels = schedule[days].to_numpy().ravel()
+        codes = pd.Index(all_types).get_indexer(labels).reshape(len(schedule), len(days))
+        weights = _category_weights(schedule['Gender'], schedule['Role'])
+
+    counts = _count(codes, weights, len(all_types))[:, [all_types.index(s) for s in shift_types]]
+    table = pd.DataFrame(counts.reshape(-1, len(CATEGORIES)), columns=CATEGORIES)
+    table.insert(0, 'Day', np.repeat(days, len(shift_types)))
+    table.insert(1, 'Shift', np.tile(shift_types, len(days)))
+    return table
+
+
 def count_shifts_by_day_and_category(df, shift_types=None):
     """
     Count number of total, female, male, professional, and helper personnel 
     for each shift in each day.
     
     Parameters:
-        df (pd.DataFrame): DataFrame containing schedule data.
+        df (pd.DataFrame or Schedule): see shift_count_table.
         shift_types (list, optional): List of shift codes to track. 
                                       Defaults to ['D', 'E', 'N', 'M', 'DE'].
     
     Returns:
         dict: Nested dictionary with counts for each day and shift.
     """
-    if shift_types is None:
-        shift_types = ['D', 'E', 'N', 'M', 'DE']
-
-    # Identify schedule columns (days)
-    days = [col for col in df.columns if '(' in col]
-    
-    # Initialize results dictionary
     results = {}
+    for row in shift_count_table(df, shift_types).itertuples(index=False):
+        results.setdefault(row.Day, {})[row.Shift] = {name: getattr(row, name) for name in CATEGORIES}
+    return results
 
-    for day in days:
-        results[day] = {}
-        for shift in shift_types:
-            # Total count
-            total = (df[day] == shift).sum()
-            
-            # Gender counts
-            female = ((df[day] == shift) & (df['Gender'] == 'F')).sum()
-            male = ((df[day] == shift) & (df['Gender'] == 'M')).sum()
-            
-            # Role counts
-            professional = ((df[day] == shift) & (df['Role'] == 'professional')).sum()
-            helper = ((df[day] == shift) & (df['Role'] == 'helper')).sum()
-
-            # Store counts
-            results[day][shift] = {
-                'Total': total,
-                'Female': female,
-                'Male': male,
-                'Professional': professional,
-                'Helper': helper
-            }
 
-    return results
 
+# (file name, column, title, y label) of each shift summary chart
+SUMMARY_FIGURES = [
+    ('total', 'Total', 'Total Personnel per Shift per Day', 'Number of Staff'),
+    ('female', 'Female', 'Female Personnel per Shift per Day', 'Number of Female Staff'),
+    ('male', 'Male', 'Male Personnel per Shift per Day', 'Number of Male Staff'),
+    ('professional', 'Professional', 'Professional Personnel per Shift per Day', 'Number of Professional Staff'),
+    ('helper', 'Helper', 'Helper Personnel per Shift per Day', 'Number of Helper Staff'),
+]
+FIGSIZE = (14, 7)
+
+
+def summary_frame(shift_summary):
+    """shift_count_table layout of a shift summary (the table itself or the nested dict)."""
+    if isinstance(shift_summary, pd.DataFrame):
+        return shift_summary
+    data = []
+    for day, shifts in shift_summary.items():
+        for shift, counts in shifts.items():
+            data.append({'Day': day, 'Shift': shift, **{name: counts[name] for name in CATEGORIES}})
+    return pd.DataFrame(data, columns=['Day', 'Shift'] + CATEGORIES)
+
+
+def draw_summary(fig, plot_df, column, title, ylabel, styled=True):
+    """
+    One chart of `column` per day, a bar per shift, on a new axes of `fig`.
+    styled: seaborn's whitegrid barplot; otherwise plain matplotlib bars,
+    which draw several times faster.
+    """
+    if styled:
+        import seaborn as sns
+
+        with sns.axes_style('whitegrid'):
+            ax = fig.subplots()
+        sns.barplot(data=plot_df, x='Day', y=column, hue='Shift', ax=ax)
+    else:
+        ax = fig.subplots()
+        days, shifts = plot_df['Day'].unique(), plot_df['Shift'].unique()
+        counts = plot_df.pivot(index='Day', columns='Shift', values=column).loc[days, shifts]
+        x, width = np.arange(len(days)), 0.8 / len(shifts)
+        for i, shift in enumerate(shifts):
+            ax.bar(x + (i - (len(shifts) - 1) / 2) * width, counts[shift], width, label=shift)
+        ax.set_xticks(x, days)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend(title='Shift')
+    fig.tight_layout()
+    return ax
 
 
 def plot_shift_summary(shift_summary):
     """
-    Plot total number of personnel in each shift per day as a grouped bar chart.
+    Plot total number of personnel in each shift per day as a grouped bar chart,
+    then the same by gender and by role, each in its own window.
+    For files instead of windows see app.services.charts.
     
     Parameters:
-        shift_summary (dict): Nested dictionary from count_shifts_by_day_and_category().
+        shift_summary (dict or pd.DataFrame): from count_shifts_by_day_and_category()
+                                              or shift_count_table().
     """
-    # Convert nested dict to a DataFrame for plotting
-    data = []
-    for day, shifts in shift_summary.items():
-        for shift, counts in shifts.items():
-            data.append({
-                'Day': day,
-                'Shift': shift,
-                'Total': counts['Total'],
-                'Female': counts['Female'],
-                'Male': counts['Male'],
-                'Professional': counts['Professional'],
-                'Helper': counts['Helper']
-            })
-    
-    plot_df = pd.DataFrame(data)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plot_df = summary_frame(shift_summary)
 
     # Set plot style
     sns.set(style="whitegrid")
 
-    # Plot total personnel per shift per day
-    plt.figure(figsize=(14, 7))
-    sns.barplot(data=plot_df, x='Day', y='Total', hue='Shift')
-    plt.title('Total Personnel per Shift per Day')
-    plt.ylabel('Number of Staff')
-    plt.xticks(rotation=45)
-    plt.legend(title='Shift')
-    plt.tight_layout()
-    plt.show()
-
-    # Optional: stacked count by gender per shift per day
-    for category in ['Female', 'Male']:
-        plt.figure(figsize=(14, 7))
-        sns.barplot(data=plot_df, x='Day', y=category, hue='Shift')
-        plt.title(f'{category} Personnel per Shift per Day')
-        plt.ylabel(f'Number of {category} Staff')
-        plt.xticks(rotation=45)
-        plt.legend(title='Shift')
-        plt.tight_layout()
-        plt.show()
-
-    # Optional: stacked count by role per shift per day
-    for category in ['Professional', 'Helper']:
-        plt.figure(figsize=(14, 7))
-        sns.barplot(data=plot_df, x='Day', y=category, hue='Shift')
-        plt.title(f'{category} Personnel per Shift per Day')
-        plt.ylabel(f'Number of {category} Staff')
-        plt.xticks(rotation=45)
-        plt.legend(title='Shift')
-        plt.tight_layout()
+    for _, column, title, ylabel in SUMMARY_FIGURES:
+        draw_summary(plt.figure(figsize=FIGSIZE), plot_df, column, title, ylabel)
         plt.show()
 
 
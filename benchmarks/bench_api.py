@@ -0,0 +1,98 @@
+"""
+Load test of the HTTP API (app.api.routes) with a local client.
+
+A uvicorn server on a free localhost port solves the one-week problem
+of bench_encoding in a pool of `workers` threads. `clients` threads
+submit `jobs` solves each, all at once. Meanwhile a poller reads
+GET /jobs/{id} every 50 ms to show whether the API stays responsive
+while the pool is saturated.
+
+Run from the repository root:
+    python -m benchmarks.bench_api [clients] [jobs] [workers] [time_limit]
+"""
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+
+from app.api.routes import create_app
+from benchmarks.bench_encoding import make_instances
+
+
+def serve(app):
+    """Start `app` on a free port in a background thread; returns (server, thread, port)."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, server.servers[0].sockets[0].getsockname()[1]
+
+
+def call(port, method, path, body=None):
+    """(seconds, status, json) of one request on a fresh connection."""
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    connection.request(method, path, None if body is None else json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    return time.perf_counter() - start, response.status, payload
+
+
+def latency_row(label, seconds):
+    ms = sorted(s * 1000 for s in seconds)
+    p95 = ms[min(len(ms) - 1, int(0.95 * len(ms)))]
+    return f"{label:>8} {len(ms):6} {statistics.median(ms):8.1f} {p95:8.1f} {ms[-1]:8.1f}"
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    time_limit = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+
+    server, thread, port = serve(create_app(workers, make_instances()[0]))
+    body = {"time_limit": time_limit}
+    polls, done = [], threading.Event()
+
+    def client(_):
+        return [call(port, "POST", "/solve", body) for _ in range(jobs)]
+
+    def poll(job_id):
+        while not done.is_set():
+            polls.append(call(port, "GET", f"/jobs/{job_id}")[0])
+            time.sleep(0.05)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        submits = [r for rs in pool.map(client, range(clients)) for r in rs]
+    submitted = time.perf_counter() - start
+    ids = [payload["id"] for _, status, payload in submits if status == 202]
+    poller = threading.Thread(target=poll, args=(ids[-1],))
+    poller.start()
+
+    states = {}
+    while len(states) < len(ids):
+        for job_id in ids:
+            if job_id not in states:
+                _, _, job = call(port, "GET", f"/jobs/{job_id}")
+                if job["state"] not in ("queued", "running"):
+                    states[job_id] = job["solver_status"]
+        time.sleep(0.2)
+    total = time.perf_counter() - start
+    done.set()
+    poller.join()
+    server.should_exit = True
+    thread.join()
+
+    print(f"{clients} clients x {jobs} jobs, {workers} workers, time limit {time_limit:g} s")
+    print(f"submitted in {submitted:.2f} s, all finished in {total:.1f} s "
+          f"({len(ids) / total:.2f} jobs/s), statuses {dict(sorted((s, list(states.values()).count(s)) for s in set(states.values())))}")
+    print(f"{'request':>8} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    print(latency_row("POST", [seconds for seconds, _, _ in submits]))
+    print(latency_row("GET", polls))
@@ -0,0 +1,107 @@
+"""
+Schedule archive benchmark: app.services.archive.ScheduleArchive against
+the indented schedule.json and the hospital-style Excel files the
+scheduler writes today.
+
+Random Tir-sized schedules (31 staff x 31 days) for wards x months. Excel
+is written and read for the first ward only (it is slow) and scaled to
+all wards; it has no person index, so one person's history costs a full
+load, as with JSON.
+
+Run from the repository root:
+    python -m benchmarks.bench_archive [wards] [months]
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import default_problem
+from app.core.solution import OFF, Schedule
+from app.services.archive import ScheduleArchive
+from app.services.report import create_hospital_style_schedule
+
+
+def make_schedules(wards, months, seed=0):
+    problem = default_problem()
+    rng = np.random.default_rng(seed)
+    return {
+        (f"ward{w:02}", f"14{m // 12 + 3:02}-{m % 12 + 1:02}"): Schedule.from_matrix(
+            rng.integers(OFF, len(SHIFT_TYPES), size=(problem.num_staff, problem.num_days), dtype=np.int8),
+            SHIFT_TYPES, problem, start_date=f"14{m // 12 + 3:02}-{m % 12 + 1:02}-01",
+        )
+        for w in range(wards) for m in range(months)
+    }
+
+
+def disk_size(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    wards = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    months = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    schedules = make_schedules(wards, months)
+    first_ward = [key for key in schedules if key[0] == "ward00"]
+    name = default_problem().staff[7].name
+
+    print(f"{wards} wards x {months} months of 31 x 31 schedules")
+    print(f"{'format':>8} {'write s':>8} {'load all s':>11} {'one ward s':>11} {'one person s':>13} {'MiB':>7}")
+    with tempfile.TemporaryDirectory() as root:
+        archive = ScheduleArchive(os.path.join(root, "archive"))
+        write = timed(lambda: [archive.append(w, m, s) for (w, m), s in schedules.items()])
+        load_all = timed(lambda: [s.codes.sum() for w in archive.wards() for s in archive.load_ward(w).values()])
+        one_ward = timed(lambda: [s.codes.sum() for s in archive.load_ward("ward00").values()])
+        one_person = timed(lambda: archive.person_history(name))
+        print(f"{'archive':>8} {write:8.2f} {load_all:11.3f} {one_ward:11.3f} {one_person:13.3f} "
+              f"{disk_size(archive.root) / 2**20:7.2f}")
+
+        json_root = os.path.join(root, "json")
+        os.makedirs(json_root)
+
+        def json_path(w, m):
+            return os.path.join(json_root, f"{w}_{m}.json")
+
+        def write_json():
+            for (w, m), s in schedules.items():
+                with open(json_path(w, m), "w", encoding="utf-8") as f:
+                    json.dump(s.to_json(), f, ensure_ascii=False, indent=2)
+
+        def load_json(keys):
+            loaded = []
+            for w, m in keys:
+                with open(json_path(w, m), encoding="utf-8") as f:
+                    loaded.append(Schedule.from_json(json.load(f), SHIFT_TYPES, num_staff=31))
+            return loaded
+
+        write = timed(write_json)
+        load_all = timed(lambda: load_json(schedules))
+        one_ward = timed(lambda: load_json(first_ward))
+        # no index: a person's history means reading everything
+        one_person = timed(lambda: [s.person(7) for s in load_json(schedules)])
+        print(f"{'json':>8} {write:8.2f} {load_all:11.3f} {one_ward:11.3f} {one_person:13.3f} "
+              f"{disk_size(json_root) / 2**20:7.2f}")
+
+        excel_root = os.path.join(root, "excel")
+        os.makedirs(excel_root)
+        with contextlib.redirect_stdout(io.StringIO()):
+            write = timed(lambda: [
+                create_hospital_style_schedule(schedules[key], os.path.join(excel_root, f"{key[0]}_{key[1]}.xlsx"))
+                for key in first_ward
+            ])
+        one_ward = timed(lambda: [pd.read_excel(os.path.join(excel_root, f)) for f in os.listdir(excel_root)])
+        print(f"{'excel':>8} {write * wards:8.2f} {one_ward * wards:11.3f} {one_ward:11.3f} "
+              f"{one_ward * wards:13.3f} {disk_size(excel_root) * wards / 2**20:7.2f}   (one ward measured, x{wards})")
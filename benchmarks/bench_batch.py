@@ -0,0 +1,57 @@
+"""
+Throughput benchmark: process-pool batch solve vs solving the same jobs
+serially with all cores given to each job.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch [num_jobs] [time_limit_seconds]
+"""
+import dataclasses
+import os
+import sys
+import time
+
+from app.core.batch import plan_workers, solve_batch, solve_job
+from app.core.problem import default_problem
+from app.core.solver_config import SolverConfig
+
+
+def make_problems(num_jobs):
+    """One week per 'ward', each starting on a different holiday pattern."""
+    base = default_problem()
+    problems = []
+    for i in range(num_jobs):
+        problems.append(dataclasses.replace(
+            base,
+            num_days=7,
+            holidays=frozenset({i % 7}),
+            leave_total=9,
+            training_total=2,
+            unavailable={5: frozenset({(i + 2) % 7})},
+            name=f"ward-{i}",
+        ))
+    return problems
+
+
+if __name__ == "__main__":
+    num_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    problems = make_problems(num_jobs)
+    cpu_count = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    serial_config = SolverConfig(time_limit=time_limit, num_workers=cpu_count)
+    serial = [solve_job(i, problem, serial_config) for i, problem in enumerate(problems)]
+    serial_time = time.perf_counter() - start
+
+    processes, threads = plan_workers(num_jobs)
+    start = time.perf_counter()
+    batch = solve_batch(problems, config=SolverConfig(time_limit=time_limit))
+    batch_time = time.perf_counter() - start
+
+    print(f"{num_jobs} jobs, {cpu_count} cores, time limit {time_limit}s per job")
+    print(f"{'job':>8} {'serial':>10} {'obj':>6} {'batch':>10} {'obj':>6}")
+    for s, b in zip(serial, batch):
+        print(f"{s.name:>8} {s.status:>10} {s.objective or '-':>6} {b.status:>10} {b.objective or '-':>6}")
+    print(f"serial: {serial_time:7.2f}s  {num_jobs / serial_time:6.2f} jobs/s  ({cpu_count} threads per job)")
+    print(f"batch:  {batch_time:7.2f}s  {num_jobs / batch_time:6.2f} jobs/s  "
+          f"({processes} processes x {threads} threads)")
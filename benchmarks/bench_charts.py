@@ -0,0 +1,55 @@
+"""
+Chart rendering benchmark: app.services.charts, seaborn-styled against
+plain bars, one process against a pool, and the resident memory of a
+long serial run (figures must not pile up).
+
+Random Tir-sized months of the default problem, PNG only.
+
+Run from the repository root:
+    python -m benchmarks.bench_charts [months] [processes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import default_problem
+from app.core.registry import _resident_bytes
+from app.core.solution import OFF, Schedule
+from app.services.charts import render_batch, render_shift_summary
+
+if __name__ == "__main__":
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    problem = default_problem()
+    rng = np.random.default_rng(0)
+    summaries = {
+        ("ward", f"1404-{m + 1:02}"): Schedule.from_matrix(
+            rng.integers(OFF, len(SHIFT_TYPES), size=(problem.num_staff, problem.num_days), dtype=np.int8),
+            SHIFT_TYPES, problem, start_date=f"1404-{m + 1:02}-01")
+        for m in range(months)
+    }
+
+    print(f"{months} months x 5 charts, {os.cpu_count()} cores")
+    print(f"{'mode':>8} {'processes':>10} {'seconds':>8} {'s/month':>8} {'RSS growth MiB':>15}")
+    with tempfile.TemporaryDirectory() as root:
+        for styled in (True, False):
+            mode = "seaborn" if styled else "plain"
+            # warm up fonts and caches so RSS growth is what the run keeps
+            render_shift_summary(next(iter(summaries.values())), os.path.join(root, "warmup"), styled=styled)
+            rss_before = _resident_bytes()
+            start = time.perf_counter()
+            for (ward, month), schedule in summaries.items():
+                render_shift_summary(schedule, os.path.join(root, mode, ward, month), styled=styled)
+            elapsed = time.perf_counter() - start
+            growth = "-" if rss_before is None else f"{(_resident_bytes() - rss_before) / 2**20:.1f}"
+            print(f"{mode:>8} {1:>10} {elapsed:8.2f} {elapsed / months:8.2f} {growth:>15}")
+
+            start = time.perf_counter()
+            render_batch(summaries, os.path.join(root, f"{mode}-pool"), styled=styled, max_processes=processes)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:>8} {processes:>10} {elapsed:8.2f} {elapsed / months:8.2f} {'-':>15}")
@@ -0,0 +1,26 @@
+"""
+Constraint build profile: per-group build time, peak memory, variables and
+constraints (app.core.registry.GroupProfile) as the roster grows.
+
+Instances as in bench_encoding (week, fortnight, Tir 1404, Tir 1404 x2).
+Nothing is solved.
+
+Run from the repository root:
+    python -m benchmarks.bench_constraints [encoding]
+"""
+import sys
+
+from app.core.constraints import DEFAULT_ENCODING
+from app.core.registry import format_profile
+from app.core.scheduler import build_model
+from benchmarks.bench_encoding import make_instances
+
+if __name__ == "__main__":
+    encoding = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENCODING
+
+    for problem in make_instances():
+        profile = []
+        build_model(problem, encoding=encoding, profile=profile)
+        print(f"{problem.name} ({problem.num_staff} staff, {problem.num_days} days, {encoding})")
+        print(format_profile(profile))
+        print()
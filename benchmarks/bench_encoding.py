@@ -0,0 +1,96 @@
+"""
+Constraint encoding benchmark: time to OPTIMAL with the linear, native
+(AddAtMostOne / AddBoolOr) and automaton encodings of
+app.core.constraints.ENCODINGS.
+
+Instances, smallest first:
+  week        7 days of the default roster
+  fortnight   14 days of the default roster
+  Tir 1404    the default problem, workload cap raised to 30 (see
+              solvable_tir)
+  Tir 1404 x2 that problem with a second, non-supervisor copy of the
+              roster and doubled coverage, leave and training
+
+Runs that hit the time limit report the objective and bound reached.
+
+Run from the repository root:
+    python -m benchmarks.bench_encoding [time_limit_seconds] [num_workers]
+"""
+import dataclasses
+import sys
+import time
+
+from app.core.constraints import ENCODINGS
+from app.core.problem import Coverage, default_problem
+from app.core.scheduler import build_model, solve_model
+from app.core.solver_config import SolverConfig
+from app.models.staff_data import StaffMember
+
+# The ward's workload cap of 26 leaves Tir 1404 without a schedule (see
+# app.core.problem.MAX_MONTHLY_WORKLOAD); 30 is the least cap with one
+SOLVABLE_WORKLOAD = 30
+
+
+def solvable_tir():
+    """The default problem with the workload cap raised to SOLVABLE_WORKLOAD."""
+    return dataclasses.replace(default_problem(), max_monthly_workload=SOLVABLE_WORKLOAD)
+
+
+def double(coverage: Coverage):
+    return Coverage(
+        day=2 * coverage.day,
+        evening=2 * coverage.evening,
+        night=2 * coverage.night,
+        min_professionals=tuple(2 * n for n in coverage.min_professionals),
+        min_helpers=tuple(2 * n for n in coverage.min_helpers),
+    )
+
+
+def doubled_roster(problem):
+    copies = tuple(
+        StaffMember(m.id + problem.num_staff, f"{m.name} 2", m.role, m.seniority + problem.num_staff, m.gender)
+        for m in problem.staff
+    )
+    return dataclasses.replace(
+        problem,
+        staff=problem.staff + copies,
+        normal_coverage=double(problem.normal_coverage),
+        holiday_coverage=double(problem.holiday_coverage),
+        leave_total=2 * problem.leave_total,
+        training_total=2 * problem.training_total,
+        relief_max_shifts=2 * problem.relief_max_shifts,
+        name=problem.name + " x2",
+    )
+
+
+def make_instances():
+    tir = solvable_tir()
+    week = dataclasses.replace(
+        tir, num_days=7, holidays=frozenset({5}), leave_total=9, training_total=2,
+        unavailable={5: frozenset({2, 3})}, name="week",
+    )
+    fortnight = dataclasses.replace(
+        tir, num_days=14, holidays=frozenset({5, 12, 13}), leave_total=18, training_total=4,
+        unavailable={5: frozenset({9, 10, 11})}, name="fortnight",
+    )
+    return [week, fortnight, tir, doubled_roster(tir)]
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 120.0
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    config = SolverConfig(time_limit=time_limit, num_workers=num_workers, random_seed=0)
+
+    print(f"time limit {time_limit}s, {num_workers} workers")
+    print(f"{'instance':>12} {'encoding':>10} {'vars':>6} {'constraints':>12} {'build s':>8} "
+          f"{'status':>10} {'objective':>10} {'bound':>8} {'solve s':>8}")
+    for problem in make_instances():
+        for encoding in ENCODINGS:
+            start = time.perf_counter()
+            model, shifts = build_model(problem, encoding=encoding)
+            build_time = time.perf_counter() - start
+            proto = model.Proto()
+            result = solve_model(model, shifts, config)
+            print(f"{problem.name:>12} {encoding:>10} {len(proto.variables):6} {len(proto.constraints):12} "
+                  f"{build_time:8.3f} {result.status:>10} {result.objective or '-':>10} "
+                  f"{result.best_bound or '-':>8} {result.wall_time:8.2f}")
@@ -0,0 +1,92 @@
+"""
+Payload and backpressure of the solution event stream (GET /jobs/{id}/events).
+
+On one core the real models find only a handful of improving solutions
+(one or two per fortnight or month solve), so a thread feeds a Job
+synthetic ones instead: `events` solutions of a `staff` x 31 day roster
+at `rate` per second, each moving `flips` cells. Two consumers read the
+server-sent events of app.api.routes for it: a fast one, and a slow one
+that spends `delay` seconds on each event (the uvicorn send waits the
+same way on a client that does not read). The bytes sent are compared
+with sending every solution as the full per-day JSON.
+
+Run from the repository root:
+    python -m benchmarks.bench_events [staff] [events] [rate] [flips] [delay]
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from app.api.routes import _solution_events
+from app.core.constraints import SHIFT_TYPES
+from app.core.solution import OFF
+from app.core.streaming import SolutionEvent
+from app.services.jobs import DONE, RUNNING, Job
+
+NUM_DAYS = 31
+
+
+def feed(job, staff, events, rate, flips, seed=0):
+    """Publish `events` improving solutions to `job`, like JobManager._run does."""
+    rng = np.random.default_rng(seed)
+    matrix = rng.integers(OFF, len(SHIFT_TYPES), size=(staff, NUM_DAYS), dtype=np.int8)
+    job.state, job.started = RUNNING, time.time()
+    for index in range(events):
+        matrix = matrix.copy()
+        cells = rng.integers(0, matrix.size, flips)
+        matrix.flat[cells] = rng.integers(OFF, len(SHIFT_TYPES), flips)
+        job.best = SolutionEvent(index, 1000.0 - index, 0.0, time.time() - job.started, matrix, SHIFT_TYPES)
+        job.solutions += 1
+        job._notify()
+        time.sleep(1 / rate)
+    job.state, job.finished = DONE, time.time()
+    job._notify()
+
+
+async def consume(job, delay):
+    """(solution events, skipped solutions, bytes, seconds from the job's start to the end event)."""
+    events = skipped = size = 0
+    async for message in _solution_events(job):
+        size += len(message.encode())
+        if message.startswith("event: solution"):
+            events += 1
+            skipped += json.loads(message.split("data: ", 1)[1])["skipped"]
+            await asyncio.sleep(delay)
+    return events, skipped, size, time.time() - job.started
+
+
+async def full_size(job):
+    """Bytes of the per-day JSON of every improving solution."""
+    size = 0
+    async for event, _ in job.updates():
+        size += len(json.dumps(event.schedule))
+    return size
+
+
+async def main(staff, events, rate, flips, delay):
+    job = Job("bench", None, None)
+    watchers = asyncio.gather(full_size(job), consume(job, 0.0), consume(job, delay))
+    await asyncio.sleep(0)  # subscribe before the first solution
+    feeder = threading.Thread(target=feed, args=(job, staff, events, rate, flips))
+    feeder.start()
+    full, fast, slow = await watchers
+    feeder.join()
+
+    print(f"{staff} staff x {NUM_DAYS} days, {events} solutions at {rate:g}/s moving {flips} cells each")
+    print(f"full per-day JSON for every solution: {full / 1024:.1f} KiB")
+    print(f"{'consumer':>10} {'events':>7} {'skipped':>8} {'KiB':>8} {'ended s':>8}")
+    for name, (received, skipped, size, ended) in (("fast", fast), (f"slow {delay:g}s", slow)):
+        print(f"{name:>10} {received:7} {skipped:8} {size / 1024:8.1f} {ended:8.1f}")
+
+
+if __name__ == "__main__":
+    staff = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 50.0
+    flips = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    delay = float(sys.argv[5]) if len(sys.argv) > 5 else 0.5
+    asyncio.run(main(staff, events, rate, flips, delay))
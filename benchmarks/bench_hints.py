@@ -0,0 +1,57 @@
+"""
+Warm-start benchmark: time to first feasible schedule, cold vs. hinted.
+
+Two cases, both hinted with a Tir 1404 solution (the default problem,
+workload cap raised to 30, see bench_encoding.solvable_tir):
+  re-solve  the same Tir problem again, e.g. to continue a search that was
+            cut short; the hint is a complete feasible schedule
+  next      Mordad 1404 (same roster, its own holidays), with the prior month
+            shifted so that weekdays line up (day_offset = 31 % 7)
+
+Run from the repository root:
+    python -m benchmarks.bench_hints [time_limit_seconds]
+"""
+import dataclasses
+import sys
+
+from app.core.hints import map_prior_schedule
+from app.core.solver_config import SolverConfig
+from app.core.streaming import SolutionStream
+from benchmarks.bench_encoding import solvable_tir
+
+# Mordad 1404: Fridays 3, 10, 17, 24, 31 and Arbaeen on the 23rd (1-based)
+MORDAD_1404_HOLIDAYS = [3-1, 10-1, 17-1, 23-1, 24-1, 31-1]
+
+
+def run(problem, config, hint=None):
+    stream = SolutionStream(problem, config, hint)
+    first = None
+    for event in stream:
+        if first is None:
+            first = event.elapsed
+    return first, stream.result
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 120.0
+    config = SolverConfig(time_limit=time_limit)
+
+    tir = solvable_tir()
+    mordad = dataclasses.replace(tir, holidays=frozenset(MORDAD_1404_HOLIDAYS), unavailable={}, name="Mordad 1404")
+
+    _, previous = run(tir, config)
+    if not previous.found:
+        sys.exit(f"previous month not solved within {time_limit}s ({previous.status})")
+    cases = [
+        ("re-solve", tir, map_prior_schedule(previous, tir)),
+        ("next", mordad, map_prior_schedule(previous, mordad, day_offset=tir.num_days % 7)),
+    ]
+
+    print(f"time limit {time_limit}s")
+    print(f"{'case':>8} {'start':>6} {'first feasible s':>17} {'status':>10} {'objective':>10} {'bound':>8} {'total s':>8}")
+    for case, problem, hint in cases:
+        for label, h in (("cold", None), ("hinted", hint)):
+            first, result = run(problem, config, h)
+            first = f"{first:.2f}" if first is not None else "-"
+            print(f"{case:>8} {label:>6} {first:>17} {result.status:>10} {result.objective or '-':>10} "
+                  f"{result.best_bound or '-':>8} {result.wall_time:8.2f}")
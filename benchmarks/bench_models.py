@@ -0,0 +1,72 @@
+"""
+Validation and serialization of the API models (app.models.shift_models)
+on large payloads.
+
+The problem is the Tir roster repeated to `staff` people, one in ten
+with days off. The schedule is a random `staff` x 31 day shift matrix,
+sent as a ShiftMatrix (base64 int8) and as the per-day staff id lists
+of schedule.json. Times are the best of `repeat` runs.
+
+Run from the repository root:
+    python -m benchmarks.bench_models [staff] [repeat]
+"""
+import dataclasses
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import default_problem
+from app.core.solution import OFF, matrix_to_schedule_json, schedule_json_to_matrix
+from app.models.shift_models import ProblemConfig, ShiftMatrix
+from app.models.staff_data import StaffMember
+
+
+def large_problem(staff):
+    tir = default_problem()
+    roster = tuple(
+        StaffMember(i, f"{m.name} {i}", m.role, i + 1, m.gender, m.is_supervisor and i < tir.num_staff,
+                    m.supervisor_type if i < tir.num_staff else None)
+        for i, m in ((i, tir.staff[i % tir.num_staff]) for i in range(staff))
+    )
+    unavailable = {p: frozenset(range(p % 25, p % 25 + 5)) for p in range(0, staff, 10)}
+    return dataclasses.replace(tir, staff=roster, unavailable=unavailable, name=f"Tir x{staff}")
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+if __name__ == "__main__":
+    staff = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    config = ProblemConfig.from_problem(large_problem(staff))
+    body = config.model_dump_json()
+    print(f"problem: {staff} staff, {len(body) / 1024:.0f} KiB of JSON")
+    for label, fn in (
+        ("validate JSON", lambda: ProblemConfig.model_validate_json(body)),
+        ("json.loads + validate", lambda: ProblemConfig.model_validate(json.loads(body))),
+        ("to ScheduleProblem", config.to_problem),
+        ("serialize", config.model_dump_json),
+    ):
+        print(f"{label:>24} {best(fn, repeat):8.1f} ms")
+
+    matrix = np.random.default_rng(0).integers(OFF, len(SHIFT_TYPES), size=(staff, 31), dtype=np.int8)
+    encoded = ShiftMatrix.from_matrix(matrix, SHIFT_TYPES).model_dump_json()
+    per_day = json.dumps(matrix_to_schedule_json(matrix, SHIFT_TYPES))
+    print(f"\nschedule: {staff} staff x 31 days")
+    print(f"{'':>24} {'KiB':>8} {'encode ms':>10} {'decode ms':>10}")
+    print(f"{'ShiftMatrix':>24} {len(encoded) / 1024:8.0f} "
+          f"{best(lambda: ShiftMatrix.from_matrix(matrix, SHIFT_TYPES).model_dump_json(), repeat):10.1f} "
+          f"{best(lambda: ShiftMatrix.model_validate_json(encoded).to_matrix(), repeat):10.1f}")
+    print(f"{'per-day id lists':>24} {len(per_day) / 1024:8.0f} "
+          f"{best(lambda: json.dumps(matrix_to_schedule_json(matrix, SHIFT_TYPES)), repeat):10.1f} "
+          f"{best(lambda: schedule_json_to_matrix(json.loads(per_day), staff, SHIFT_TYPES), repeat):10.1f}")
@@ -0,0 +1,71 @@
+"""
+Publishing benchmark: what main.py did after the solve (write
+schedule.json, load it back, write the flat and the styled Excel from
+the JSON) against app.services.pipeline.publish, which writes JSON,
+flat Excel, streaming roster and stats CSV from the in-memory Schedule
+concurrently.
+
+The solve is left out (it is the same in both); random schedules with
+the default problem's staff stand in for its result.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import default_problem
+from app.core.solution import OFF, Schedule
+from app.services.pipeline import publish
+from app.services.report import create_hospital_style_schedule, schedule_json_to_excel
+
+
+def reload_flow(schedule, root):
+    """The former main.py: disk round trip, then both Excel files from the JSON."""
+    path = os.path.join(root, "schedule.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schedule.to_json(), f, ensure_ascii=False, indent=2)
+    with open(path, encoding="utf-8") as f:
+        schedule_data = json.load(f)
+    schedule_json_to_excel(schedule_data, os.path.join(root, "schedule_report.xlsx"))
+    create_hospital_style_schedule(schedule_data, os.path.join(root, "hospital_style_schedule.xlsx"),
+                                   staff_list=schedule.staff, start_date="1404-04-01")
+
+
+def publish_flow(schedule, root):
+    outputs = {"json": "schedule.json", "excel": "schedule_report.xlsx",
+               "roster": "hospital_style_schedule.xlsx", "stats": "shift_counts.csv"}
+    timings = {}
+    for future in publish(schedule, {name: os.path.join(root, path) for name, path in outputs.items()},
+                          timings).values():
+        future.result()
+    return timings
+
+
+if __name__ == "__main__":
+    problem = default_problem()
+    rng = np.random.default_rng(0)
+    print(f"{'staff':>6} {'reload s':>9} {'publish s':>10}  publish stages")
+    for staff in (31, 310):
+        members = tuple(problem.staff[i % problem.num_staff] for i in range(staff))
+        codes = rng.integers(OFF, len(SHIFT_TYPES), size=(staff, problem.num_days), dtype=np.int8)
+        schedule = Schedule(codes, SHIFT_TYPES, problem.holidays, members, "1404-04-01")
+        with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(io.StringIO()):
+            # first calls import pandas and openpyxl; keep that out of both
+            reload_flow(schedule, root)
+            publish_flow(schedule, root)
+            start = time.perf_counter()
+            reload_flow(schedule, root)
+            reload = time.perf_counter() - start
+            start = time.perf_counter()
+            timings = publish_flow(schedule, root)
+            published = time.perf_counter() - start
+        stages = ", ".join(f"{name} {seconds:.2f}" for name, seconds in timings.items())
+        print(f"{staff:>6} {reload:9.2f} {published:10.2f}  {stages}")
@@ -0,0 +1,60 @@
+"""
+Domain pre-reduction benchmark: model size, build time and solve time with
+and without app.core.reduction.fixed_cells.
+
+Solve time is the time to the first feasible schedule and the objective
+reached within the time limit (the full month is never proven optimal).
+
+Run from the repository root:
+    python -m benchmarks.bench_reduction [time_limit_seconds]
+"""
+import sys
+import time
+
+from ortools.sat.python import cp_model
+
+from app.core.scheduler import build_model
+from app.core.solver_config import SolverConfig
+from benchmarks.bench_encoding import solvable_tir
+
+REPEAT = 5
+
+
+class FirstSolution(cp_model.CpSolverSolutionCallback):
+    def __init__(self):
+        super().__init__()
+        self.first = None
+
+    def on_solution_callback(self):
+        if self.first is None:
+            self.first = self.WallTime()
+
+
+def measure(problem, reduce, time_limit):
+    build_times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        model, shifts = build_model(problem, reduce=reduce)
+        build_times.append(time.perf_counter() - start)
+    proto = model.Proto()
+
+    solver = cp_model.CpSolver()
+    SolverConfig(time_limit=time_limit).apply(solver)
+    callback = FirstSolution()
+    status = solver.Solve(model, callback)
+    objective = solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+    return (len(proto.variables), len(proto.constraints), min(build_times),
+            callback.first, solver.StatusName(status), objective)
+
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    problem = solvable_tir()
+
+    print(f"{problem.name}, time limit {time_limit}s")
+    print(f"{'model':>8} {'vars':>6} {'constraints':>12} {'build s':>8} {'first feasible s':>17} "
+          f"{'status':>10} {'objective':>10}")
+    for label, reduce in (("full", False), ("reduced", True)):
+        variables, constraints, build, first, status, objective = measure(problem, reduce, time_limit)
+        first = f"{first:.2f}" if first is not None else "-"
+        print(f"{label:>8} {variables:6} {constraints:12} {build:8.3f} {first:>17} {status:>10} {objective or '-':>10}")
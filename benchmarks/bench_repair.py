@@ -0,0 +1,50 @@
+"""
+Repair benchmark: cover a last-minute absence on day 12 of Tir 1404 by
+repairing the published schedule vs re-solving the whole month.
+
+For each shift type, one non-supervisor working it on day 12 calls in sick.
+
+Run from the repository root:
+    python -m benchmarks.bench_repair [full_solve_time_limit_seconds]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.repair import merge_unavailable, repair_schedule
+from app.core.scheduler import generate_schedule
+from app.core.solver_config import SolverConfig
+from benchmarks.bench_encoding import solvable_tir
+
+DAY = 12 - 1
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    config = SolverConfig(time_limit=time_limit)
+
+    problem = solvable_tir()
+    published = generate_schedule(problem, config)
+    if not published.found:
+        sys.exit(f"month not solved within {time_limit}s ({published.status})")
+    supervisors = set(problem.supervisor_ids.values())
+
+    print(f"{'sick':>10} {'mode':>7} {'status':>10} {'changed':>8} {'window':>7} {'seconds':>8}")
+    for code, name in enumerate(SHIFT_TYPES):
+        people = [p for p in np.flatnonzero(published.matrix[:, DAY] == code) if p not in supervisors]
+        if not people:
+            continue
+        absence = {int(people[0]): {DAY}}
+
+        start = time.perf_counter()
+        repaired = repair_schedule(published, problem, absence)
+        repair_time = time.perf_counter() - start
+        print(f"{f'p{people[0]} {name}':>10} {'repair':>7} {repaired.status:>10} {len(repaired.changes):8} "
+              f"{repaired.window:7} {repair_time:8.2f}")
+
+        start = time.perf_counter()
+        resolved = generate_schedule(merge_unavailable(problem, absence), config)
+        resolve_time = time.perf_counter() - start
+        changed = int((resolved.matrix != published.matrix).sum()) if resolved.found else "-"
+        print(f"{'':>10} {'re-solve':>7} {resolved.status:>10} {changed:>8} {'-':>7} {resolve_time:8.2f}")
@@ -0,0 +1,55 @@
+"""
+Excel roster benchmark: create_hospital_style_schedule (DataFrame, then
+reopen and style every cell) against write_hospital_style_schedule (one
+streaming pass) in app.services.report.
+
+Random schedules: a Tir-sized ward and hospital-wide rosters. Peak memory
+is the Python heap at its peak (tracemalloc), which is where openpyxl
+keeps its cells.
+
+Run from the repository root:
+    python -m benchmarks.bench_report [staff] [days]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.solution import OFF, Schedule
+from app.services.report import create_hospital_style_schedule, write_hospital_style_schedule
+
+
+def measure(write, schedule, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        write(schedule, path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    sizes = [(31, 31), (300, 31), (1000, 90)]
+    if len(sys.argv) > 2:
+        sizes = [(int(sys.argv[1]), int(sys.argv[2]))]
+
+    rng = np.random.default_rng(0)
+    print(f"{'staff x days':>13} {'writer':>9} {'seconds':>8} {'peak MiB':>9} {'file KiB':>9}")
+    with tempfile.TemporaryDirectory() as root:
+        for staff, days in sizes:
+            codes = rng.integers(OFF, len(SHIFT_TYPES), size=(staff, days), dtype=np.int8)
+            schedule = Schedule.from_matrix(codes, SHIFT_TYPES, start_date="1404-04-01")
+            for label, write in (("styled", create_hospital_style_schedule),
+                                 ("streaming", write_hospital_style_schedule)):
+                path = os.path.join(root, f"{label}.xlsx")
+                elapsed, peak = measure(write, schedule, path)
+                print(f"{f'{staff} x {days}':>13} {label:>9} {elapsed:8.2f} {peak / 2**20:9.1f} "
+                      f"{os.path.getsize(path) / 1024:9.0f}")
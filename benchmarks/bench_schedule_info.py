@@ -0,0 +1,75 @@
+"""
+Shift statistics benchmark: the former per-(day, shift) boolean masks
+against app.services.schedule_info.shift_count_table on the roster
+DataFrame and on the Schedule itself.
+
+Random rosters with the default problem's staff, one per ward; every
+ward is counted separately, as the report does, and the times summed.
+A hospital-wide 1000 x 90 roster is counted last.
+
+Run from the repository root:
+    python -m benchmarks.bench_schedule_info [wards]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.problem import default_problem
+from app.core.solution import OFF, Schedule
+from app.services.report import roster_days, roster_info
+from app.services.schedule_info import shift_count_table
+
+COUNTED = ['D', 'E', 'N', 'M', 'DE']
+
+
+def count_with_masks(df, shift_types=COUNTED):
+    """The former count_shifts_by_day_and_category: five masks per day and shift."""
+    results = {}
+    for day in [col for col in df.columns if '(' in col]:
+        results[day] = {}
+        for shift in shift_types:
+            results[day][shift] = {
+                'Total': (df[day] == shift).sum(),
+                'Female': ((df[day] == shift) & (df['Gender'] == 'F')).sum(),
+                'Male': ((df[day] == shift) & (df['Gender'] == 'M')).sum(),
+                'Professional': ((df[day] == shift) & (df['Role'] == 'professional')).sum(),
+                'Helper': ((df[day] == shift) & (df['Role'] == 'helper')).sum(),
+            }
+    return results
+
+
+def roster_frame(schedule):
+    """The DataFrame create_hospital_style_schedule writes, built in memory."""
+    schedule, columns, _ = roster_days(schedule)
+    return pd.concat([pd.DataFrame(roster_info(schedule)), pd.DataFrame(schedule.labels(), columns=columns)], axis=1)
+
+
+def make_schedule(staff, days, rng):
+    problem = default_problem()
+    members = [problem.staff[i % problem.num_staff] for i in range(staff)]
+    codes = rng.integers(OFF, len(SHIFT_TYPES), size=(staff, days), dtype=np.int8)
+    return Schedule(codes, SHIFT_TYPES, frozenset(), tuple(members), "1404-04-01")
+
+
+def timed(count, inputs):
+    start = time.perf_counter()
+    for x in inputs:
+        count(x)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    wards = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = np.random.default_rng(0)
+
+    print(f"{'rosters':>18} {'masks s':>8} {'table(df) s':>12} {'table(Schedule) s':>18} {'speedup':>8}")
+    for label, schedules in ((f"{wards} wards 31x31", [make_schedule(31, 31, rng) for _ in range(wards)]),
+                             ("hospital 1000x90", [make_schedule(1000, 90, rng)])):
+        frames = [roster_frame(s) for s in schedules]
+        masks = timed(count_with_masks, frames)
+        table_df = timed(shift_count_table, frames)
+        table_schedule = timed(shift_count_table, schedules)
+        print(f"{label:>18} {masks:8.3f} {table_df:12.3f} {table_schedule:18.3f} {masks / table_schedule:7.0f}x")
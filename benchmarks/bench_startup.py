@@ -0,0 +1,72 @@
+"""
+Startup benchmark: `python -X importtime` of the CLI and each of its
+commands, in fresh processes.
+
+For each run: wall time of the process, total import time and the
+slowest top-level imports, and whether `import app.cli` stays within
+STARTUP_BUDGET. The tests only check that it imports none of
+app.cli.HEAVY_MODULES, since timings vary from machine to machine.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [runs]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.constraints import SHIFT_TYPES
+from app.core.solution import OFF, Schedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds that `import app.cli` should take
+STARTUP_BUDGET = 0.1
+
+
+def import_times(stderr):
+    """{module: cumulative seconds} of the top-level imports in -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nested imports are indented further
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def run(args, cwd):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, capture_output=True, text=True,
+                          env={**os.environ, "PYTHONPATH": ROOT})
+    return time.perf_counter() - start, import_times(proc.stderr)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    with tempfile.TemporaryDirectory() as cwd:
+        # a random schedule for report and stats
+        codes = np.random.default_rng(0).integers(OFF, len(SHIFT_TYPES), size=(31, 31), dtype=np.int8)
+        with open(os.path.join(cwd, "schedule.json"), "w", encoding="utf-8") as f:
+            json.dump(Schedule.from_matrix(codes, SHIFT_TYPES).to_json(), f)
+        commands = [
+            ("import app.cli", ["-c", "import app.cli"]),
+            ("--help", ["-m", "app", "--help"]),
+            ("validate", ["-m", "app", "validate"]),
+            ("report", ["-m", "app", "report", "schedule.json", "roster.xlsx"]),
+            ("stats", ["-m", "app", "stats", "schedule.json"]),
+            ("solve --help", ["-m", "app", "solve", "--help"]),
+        ]
+        print(f"startup budget of import app.cli: {STARTUP_BUDGET:.2f} s; best of {runs} runs")
+        print(f"{'command':>16} {'process s':>10} {'imports s':>10}  slowest imports")
+        for label, args in commands:
+            wall, times = min((run(args, cwd) for _ in range(runs)), key=lambda r: r[0])
+            slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:4]
+            print(f"{label:>16} {wall:10.2f} {sum(times.values()):10.3f}  "
+                  + ", ".join(f"{name} {seconds:.2f}" for name, seconds in slowest))
+            if label == "import app.cli" and times.get("app.cli", 0.0) > STARTUP_BUDGET:
+                print(f"{'':>16} over the startup budget: app.cli took {times['app.cli']:.3f} s")
@@ -0,0 +1,36 @@
+"""
+Symmetry breaking benchmark: time to OPTIMAL without symmetry breaking and
+with each method of app.core.symmetry.SYMMETRY_BREAKING.
+
+Instances as in bench_encoding (week, fortnight, Tir 1404). Runs that hit
+the time limit report the objective and bound reached.
+
+Run from the repository root:
+    python -m benchmarks.bench_symmetry [time_limit_seconds] [num_workers]
+"""
+import sys
+import time
+
+from app.core.scheduler import build_model, solve_model
+from app.core.solver_config import SolverConfig
+from app.core.symmetry import SYMMETRY_BREAKING, symmetric_classes
+from benchmarks.bench_encoding import make_instances
+
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 180.0
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    config = SolverConfig(time_limit=time_limit, num_workers=num_workers, random_seed=0)
+
+    print(f"time limit {time_limit}s, {num_workers} workers")
+    print(f"{'instance':>12} {'classes':>8} {'symmetry':>9} {'build s':>8} "
+          f"{'status':>10} {'objective':>10} {'bound':>8} {'solve s':>8}")
+    for problem in make_instances()[:3]:
+        classes = symmetric_classes(problem)
+        for symmetry in (None,) + SYMMETRY_BREAKING:
+            start = time.perf_counter()
+            model, shifts = build_model(problem, symmetry=symmetry)
+            build_time = time.perf_counter() - start
+            result = solve_model(model, shifts, config)
+            print(f"{problem.name:>12} {len(classes):8} {symmetry or 'off':>9} {build_time:8.3f} "
+                  f"{result.status:>10} {result.objective or '-':>10} {result.best_bound or '-':>8} "
+                  f"{result.wall_time:8.2f}")
@@ -0,0 +1,86 @@
+"""
+Build-time and memory benchmark: tuple-keyed dict vs ShiftVars.
+
+Run from the repository root:
+    python -m benchmarks.bench_variable_store
+"""
+import time
+import tracemalloc
+
+from ortools.sat.python import cp_model
+
+from app.core.variables import ShiftVars
+
+NUM_SHIFTS = 6
+SIZES = [
+    (31, 31),   # Tir 1404 ward
+    (400, 90),  # whole hospital, one quarter
+]
+
+
+def build_dict(model, num_staff, num_days):
+    shifts = {}
+    for p in range(num_staff):
+        for d in range(num_days):
+            for s in range(NUM_SHIFTS):
+                shifts[p, d, s] = model.NewBoolVar(f"sh_p{p}_d{d}_s{s}")
+    return shifts
+
+
+def build_store(model, num_staff, num_days):
+    return ShiftVars(model, num_staff, num_days, NUM_SHIFTS)
+
+
+def build_store_unnamed(model, num_staff, num_days):
+    return ShiftVars(model, num_staff, num_days, NUM_SHIFTS, named=False)
+
+
+def access_dict(shifts, num_staff, num_days):
+    # Same access pattern as the constraint groups: one-shift-per-day and coverage rows
+    n = 0
+    for p in range(num_staff):
+        for d in range(num_days):
+            n += len([shifts[p, d, s] for s in range(NUM_SHIFTS)])
+    for d in range(num_days):
+        for s in range(NUM_SHIFTS):
+            n += len([shifts[p, d, s] for p in range(num_staff)])
+    return n
+
+
+def access_store(shifts, num_staff, num_days):
+    n = 0
+    for p in range(num_staff):
+        for d in range(num_days):
+            n += len(shifts.person_day(p, d))
+    for d in range(num_days):
+        for s in range(NUM_SHIFTS):
+            n += len(shifts.day_shift(d, s))
+    return n
+
+
+def measure(build, access, num_staff, num_days):
+    model = cp_model.CpModel()
+    tracemalloc.start()
+    start = time.perf_counter()
+    shifts = build(model, num_staff, num_days)
+    build_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    access(shifts, num_staff, num_days)
+    access_time = time.perf_counter() - start
+    return build_time, access_time, peak / 2**20
+
+
+if __name__ == "__main__":
+    print(f"{'size':>14} {'store':>10} {'build s':>9} {'access s':>9} {'peak MiB':>9}")
+    for num_staff, num_days in SIZES:
+        label = f"{num_staff}x{num_days}x{NUM_SHIFTS}"
+        for name, build, access in (
+            ("dict", build_dict, access_dict),
+            ("ShiftVars", build_store, access_store),
+            ("unnamed", build_store_unnamed, access_store),
+        ):
+            build_time, access_time, peak = measure(build, access, num_staff, num_days)
+            print(f"{label:>14} {name:>10} {build_time:9.3f} {access_time:9.3f} {peak:9.1f}")
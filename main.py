@@ -1,29 +1,20 @@
 # main.py
-import json
-import pandas as pd
-import openpyxl
-from openpyxl.styles import PatternFill, Alignment
-from datetime import datetime, timedelta
-
-from app.core.scheduler import generate_schedule
-from app.services.report import  schedule_json_to_excel, create_hospital_style_schedule
-
-
-def load_schedule_json(filepath):
-    """Load schedule JSON file"""
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+from app.core.problem import default_problem
+from app.core.telemetry import RunHistory
+from app.services.pipeline import format_timings, run_pipeline
 
 if __name__ == "__main__":
-    sched = generate_schedule()
-    # print(json.dumps(sched, indent=2, ensure_ascii=False))
-    schedule_data = load_schedule_json("schedule.json")
-    schedule_json_to_excel(schedule_data, "schedule_report.xlsx")
-    
-    create_hospital_style_schedule(
-            schedule_data,
-            "hospital_style_schedule.xlsx",
-            staff_names=None,  # or provide {0: "Alice", 1: "Bob", ...}
-            start_date="2025-07-01"  # adjust this to your month start date
-        )
-
+    # Solve once and write every output from the solved schedule
+    run = run_pipeline(
+        default_problem(),
+        outputs={
+            "json": "schedule.json",
+            "excel": "schedule_report.xlsx",
+            "roster": "hospital_style_schedule.xlsx",
+            "stats": "shift_counts.csv",
+        },
+        start_date="1404-04-01",  # Jalali date of day 1 (Tir 1404)
+        history=RunHistory(),
+    )
+    print(f"{run.result.status}: objective {run.result.objective}, gap {run.result.gap}")
+    print(format_timings(run.timings))
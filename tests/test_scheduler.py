@@ -0,0 +1,809 @@
+import asyncio
+import dataclasses
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model
+
+from app.core.batch import plan_workers, solve_batch
+from app.core.constraints import ENCODINGS, SHIFT_TYPES
+from app.core.diagnosis import explain_infeasibility
+from app.core.hints import NO_HINT, map_prior_schedule
+from app.core.precheck import InfeasibleProblemError, find_infeasibilities
+from app.core.problem import default_problem
+from app.core.reduction import FREE, fixed_cells
+from app.core.registry import DEFAULT_GROUPS, format_profile, select_groups
+from app.core.repair import _repair_model, free_cell_mask, repair_schedule
+from app.core.scheduler import build_model, generate_schedule, solve_model
+from app.core.solution import OFF, Schedule, matrix_changes, shift_matrix, matrix_to_schedule_json
+from app.core.solver_config import PRESETS, SolverConfig, get_solver_config
+from app.core.symmetry import symmetric_classes
+from app.core.telemetry import RunHistory, summarize
+from app.core.streaming import SolutionStream, iter_solutions
+from app.core.variables import ShiftVars, fix
+from app.models.shift_models import ProblemConfig, ShiftMatrix, SolveRequest
+from app.services.jobs import JobManager
+
+
+def test_shift_vars_slices_match_tuple_indexing():
+    model = cp_model.CpModel()
+    shifts = ShiftVars(model, num_staff=4, num_days=5, num_shifts=6)
+
+    assert len(shifts) == 4 * 5 * 6
+    assert shifts.person_day(2, 3) == [shifts[2, 3, s] for s in range(6)]
+    assert shifts.day_shift(3, 4) == [shifts[p, 3, 4] for p in range(4)]
+    assert shifts.day_shift(3, 4, [1, 3]) == [shifts[1, 3, 4], shifts[3, 3, 4]]
+    assert shifts.person_shift(1, 5) == [shifts[1, d, 5] for d in range(5)]
+    assert shifts.person(3) == [shifts[3, d, s] for d in range(5) for s in range(6)]
+    assert shifts.day(0) == [shifts[p, 0, s] for p in range(4) for s in range(6)]
+    assert shifts.shift(2) == [shifts[p, d, 2] for p in range(4) for d in range(5)]
+    assert shifts[1, 2, 3].Name() == "sh_p1_d2_s3"
+
+
+def test_shift_matrix_matches_per_variable_values():
+    model = cp_model.CpModel()
+    model.NewBoolVar("before")  # the store does not have to start at index 0
+    shifts = ShiftVars(model, num_staff=5, num_days=4, num_shifts=6)
+    for p in range(5):
+        for d in range(4):
+            model.AddAtMostOne(shifts.person_day(p, d))
+    # person p works shift (p + d) % 6 on day d, except person 4 is always off
+    for p in range(4):
+        for d in range(4):
+            model.Add(shifts[p, d, (p + d) % 6] == 1)
+    model.Add(sum(shifts.person(4)) == 0)
+
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+
+    matrix = shift_matrix(solver.ResponseProto().solution, shifts)
+    assert matrix.shape == (5, 4)
+    assert matrix.dtype == np.int8
+    assert (matrix[4] == OFF).all()
+    for p in range(4):
+        for d in range(4):
+            assert matrix[p, d] == (p + d) % 6
+
+    shift_types = ["M", "A", "D", "E", "N", "DE"]
+    expected = [
+        {st: [p for p in range(5) if solver.Value(shifts[p, d, s])] for s, st in enumerate(shift_types)}
+        for d in range(4)
+    ]
+    assert matrix_to_schedule_json(matrix, shift_types) == expected
+
+
+def test_default_problem_index_sets():
+    problem = default_problem()
+
+    assert problem.num_staff == 31
+    assert problem.holiday_days == (5, 12, 13, 14, 19, 26)
+    assert problem.is_holiday(5) and not problem.is_holiday(6)
+    assert len(problem.normal_days) == 25
+    assert problem.supervisor("HEAD_NURSE") == 0
+    assert problem.supervisor("EVEN_NIGHT_SUPERVISOR") == 4
+    assert problem.supervisor("NO_SUCH_TYPE") is None
+    assert problem.professionals == tuple(range(17))
+    assert problem.helpers == tuple(range(17, 31))
+    assert sorted(problem.females + problem.males) == list(range(31))
+    assert problem.coverage(5) is problem.holiday_coverage
+    assert problem.coverage(6) is problem.normal_coverage
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        problem.num_days = 30
+
+
+def test_problems_are_independent():
+    short = dataclasses.replace(default_problem(), num_days=7, holidays=frozenset({5}), unavailable={})
+
+    assert short.num_days == 7
+    assert short.holiday_days == (5,)
+    assert len(short.holiday_mask) == 7
+    assert default_problem().num_days == 31
+
+    with pytest.raises(ValueError):
+        dataclasses.replace(default_problem(), num_days=7)  # holidays past day 7
+    with pytest.raises(ValueError, match="unavailable person 99 is not on the roster"):
+        dataclasses.replace(default_problem(), unavailable={99: frozenset({0})})
+    with pytest.raises(ValueError, match=r"unavailable days \[31\] of person 3"):
+        dataclasses.replace(default_problem(), unavailable={3: frozenset({31})})
+
+
+def test_problem_is_hashable_and_read_only():
+    problem = default_problem()
+    absent = dataclasses.replace(problem, unavailable={3: {1, 2}})
+
+    assert hash(absent) == hash(dataclasses.replace(problem, unavailable={3: frozenset({1, 2})}))
+    assert len({problem, absent, dataclasses.replace(absent)}) == 2
+
+    with pytest.raises(AttributeError):
+        problem.professionals.append(99)
+    with pytest.raises(TypeError):
+        absent.unavailable[7] = frozenset({0})
+    with pytest.raises(TypeError):
+        problem.supervisor_ids["HEAD_NURSE"] = 1
+
+
+def week_problem(**changes):
+    """A one-week version of the default problem that solves in well under a second."""
+    values = dict(
+        num_days=7,
+        holidays=frozenset({5}),
+        leave_total=9,
+        training_total=2,
+        unavailable={5: frozenset({2, 3})},
+        name="week",
+    )
+    values.update(changes)
+    return dataclasses.replace(default_problem(), **values)
+
+
+def satisfies_model(matrix, problem, encoding="linear"):
+    """True if `matrix` meets every constraint of the unreduced model of `problem`."""
+    model, shifts = build_model(problem, reduce=False, encoding=encoding, symmetry=None)
+    for p, d in np.ndindex(matrix.shape):
+        for s, var in enumerate(shifts.person_day(p, d)):
+            fix(model, var, int(matrix[p, d] == s))
+    return solve_model(model, shifts, SolverConfig(time_limit=5)).found
+
+
+def test_plan_workers_never_oversubscribes():
+    assert plan_workers(20, cpu_count=8) == (8, 1)
+    assert plan_workers(2, cpu_count=8) == (2, 4)
+    assert plan_workers(3, max_processes=2, cpu_count=8) == (2, 4)
+    assert plan_workers(5, cpu_count=1) == (1, 1)
+
+
+def test_schedule_views_counters_and_json_round_trip():
+    problem = week_problem()
+    matrix = np.full((problem.num_staff, problem.num_days), OFF, dtype=np.int8)
+    matrix[0, :5] = SHIFT_TYPES.index("D")
+    matrix[4, ::2] = SHIFT_TYPES.index("N")
+    matrix[7, 1] = SHIFT_TYPES.index("DE")
+    schedule = Schedule.from_matrix(matrix, SHIFT_TYPES, problem, start_date="1404-04-01")
+
+    assert np.shares_memory(schedule.person(0), matrix) and np.shares_memory(schedule.day(3), matrix)
+    with pytest.raises(ValueError):
+        schedule.codes[0, 0] = 1
+    assert matrix.flags.writeable
+
+    assert schedule.on_shift(2, "N").tolist() == [4]
+    assert schedule.shift("D").sum() == 5
+    assert schedule.shift_counts()[4, SHIFT_TYPES.index("N")] == 4
+    assert schedule.day_counts()[1].tolist() == [0, 0, 1, 0, 0, 1]
+    assert schedule.day_counts(problem.females)[0].sum() == sum(matrix[p, 0] != OFF for p in problem.females)
+    assert schedule.workload()[[0, 4, 7]].tolist() == [5, 8, 2]
+    assert schedule.labels()[7, 1] == "DE" and schedule.labels()[7, 0] == ""
+    assert schedule.dates()[0].day == 1 and schedule.is_holiday(5)
+
+    again = Schedule.from_json(schedule.to_json(), SHIFT_TYPES, problem=problem)
+    assert (again.codes == matrix).all()
+    assert schedule.to_json() == matrix_to_schedule_json(matrix, SHIFT_TYPES)
+
+
+def test_report_and_info_accept_a_schedule(tmp_path):
+    import pandas as pd
+    from app.services.report import create_hospital_style_schedule
+    from app.services.schedule_info import count_shifts_by_day_and_category
+
+    problem = week_problem()
+    model, shifts = build_model(problem)
+    result = solve_model(model, shifts, SolverConfig(time_limit=5))
+    schedule = result.to_schedule(problem, start_date="1404-04-01")
+
+    from_json = tmp_path / "json.xlsx"
+    from_schedule = tmp_path / "schedule.xlsx"
+    create_hospital_style_schedule(result.schedule, from_json, staff_list=problem.staff, start_date="1404-04-01")
+    create_hospital_style_schedule(schedule, from_schedule)
+    df = pd.read_excel(from_schedule).fillna("")
+    assert df.equals(pd.read_excel(from_json).fillna(""))
+
+    assert count_shifts_by_day_and_category(schedule) == count_shifts_by_day_and_category(df)
+
+
+def test_shift_count_table_counts_every_day_and_shift_by_category():
+    from app.services.schedule_info import shift_count_table
+
+    problem = week_problem()
+    codes = np.random.default_rng(1).integers(OFF, len(SHIFT_TYPES), size=(problem.num_staff, 7), dtype=np.int8)
+    schedule = Schedule.from_matrix(codes, SHIFT_TYPES, problem, start_date="1404-04-01")
+
+    table = shift_count_table(schedule, ["N", "D"])
+
+    assert list(table.columns) == ["Day", "Shift", "Total", "Female", "Male", "Professional", "Helper"]
+    assert len(table) == 14 and table["Shift"].tolist()[:3] == ["N", "D", "N"]
+    night = codes[:, 2] == SHIFT_TYPES.index("N")
+    row = table.iloc[4]
+    assert row["Day"].startswith("3 (")
+    assert row["Total"] == night.sum() == row["Female"] + row["Male"]
+    assert row["Female"] == sum(night[p] for p in problem.females)
+    assert row["Helper"] == sum(night[p] for p, m in enumerate(problem.staff) if m.role.value == "helper")
+
+
+def test_charts_render_headless_into_ward_and_month_folders(tmp_path):
+    import matplotlib.pyplot as plt
+    from app.services.charts import render_batch
+    from app.services.schedule_info import SUMMARY_FIGURES
+
+    problem = week_problem()
+    codes = np.random.default_rng(2).integers(OFF, len(SHIFT_TYPES), size=(problem.num_staff, 7), dtype=np.int8)
+    schedule = Schedule.from_matrix(codes, SHIFT_TYPES, problem, start_date="1404-04-01")
+
+    rendered = render_batch({("icu", "1404-04"): schedule}, tmp_path, formats=("png", "svg"),
+                            styled=False, max_processes=1)
+
+    paths = rendered["icu", "1404-04"]
+    assert len(paths) == 2 * len(SUMMARY_FIGURES)
+    assert {os.path.relpath(p, tmp_path) for p in paths} >= {os.path.join("icu", "1404-04", "total.png"),
+                                                               os.path.join("icu", "1404-04", "helper.svg")}
+    assert all(os.path.getsize(p) > 0 for p in paths)
+    assert plt.get_fignums() == []
+
+
+def test_pipeline_publishes_every_output_from_the_solved_schedule(tmp_path):
+    import json
+    import pandas as pd
+    from app.services.pipeline import publish, run_pipeline
+
+    outputs = {name: str(tmp_path / f"out.{ext}")
+               for name, ext in (("json", "json"), ("excel", "flat.xlsx"), ("roster", "xlsx"), ("stats", "csv"))}
+
+    run = run_pipeline(week_problem(), SolverConfig(time_limit=5), outputs, start_date="1404-04-01", wait=False)
+
+    assert run.schedule is not None and run.schedule.start_date.month == 4
+    assert run.wait() == outputs
+    with open(outputs["json"], encoding="utf-8") as f:
+        assert json.load(f) == run.schedule.to_json()
+    assert len(pd.read_csv(outputs["stats"])) == 7 * 5
+    assert pd.read_excel(outputs["roster"]).shape == (31, 4 + 7)
+    assert {"solve", "schedule", *outputs} <= set(run.timings)
+
+    assert run_pipeline(week_problem(), SolverConfig(time_limit=5)).futures == {}
+    with pytest.raises(ValueError):
+        publish(run.schedule, {"pdf": str(tmp_path / "out.pdf")})
+
+
+def test_streaming_roster_matches_the_styled_one(tmp_path):
+    import pandas as pd
+    from openpyxl import load_workbook
+    from app.services.report import create_hospital_style_schedule, write_hospital_style_schedule
+
+    problem = default_problem()
+    codes = np.random.default_rng(0).integers(OFF, len(SHIFT_TYPES), size=(problem.num_staff, 31), dtype=np.int8)
+    schedule = Schedule.from_matrix(codes, SHIFT_TYPES, problem, start_date="1404-04-01")
+    styled, streamed = tmp_path / "styled.xlsx", tmp_path / "streamed.xlsx"
+    create_hospital_style_schedule(schedule, styled, is_rtl=True)
+    write_hospital_style_schedule(schedule, streamed, is_rtl=True)
+
+    assert pd.read_excel(streamed).fillna("").equals(pd.read_excel(styled).fillna(""))
+    ws_styled, ws_streamed = load_workbook(styled).active, load_workbook(streamed).active
+    assert ws_streamed.sheet_view.rightToLeft
+    # pandas styles its own header row; everything below it must match
+    for row_styled, row_streamed in zip(ws_styled.iter_rows(min_row=2), ws_streamed.iter_rows(min_row=2)):
+        for a, b in zip(row_styled, row_streamed):
+            assert (a.fill.patternType, a.fill.fgColor.rgb) == (b.fill.patternType, b.fill.fgColor.rgb), a.coordinate
+    for letter, dimension in ws_styled.column_dimensions.items():
+        assert ws_streamed.column_dimensions[letter].width == dimension.width
+
+
+def test_archive_round_trips_and_reads_one_person(tmp_path):
+    from app.services.archive import ScheduleArchive
+
+    problem = week_problem()
+    matrix = np.full((problem.num_staff, problem.num_days), OFF, dtype=np.int8)
+    matrix[3, :4] = SHIFT_TYPES.index("E")
+    june = Schedule.from_matrix(matrix, SHIFT_TYPES, problem, start_date="1404-04-01")
+    july = Schedule.from_matrix(matrix[::-1], SHIFT_TYPES, start_date="1404-05-01")
+
+    archive = ScheduleArchive(tmp_path)
+    archive.append("icu", "1404-04", june)
+    archive.append("icu", "1404-05", july)
+    archive.append("er", "1404-04", june)
+    with pytest.raises(ValueError):
+        archive.append("icu", "1404-04", july)
+    with pytest.raises(ValueError):
+        archive.append("../icu", "1404-06", july)
+
+    assert archive.wards() == ["er", "icu"] and archive.months("icu") == ["1404-04", "1404-05"]
+    loaded = archive.load("icu", "1404-04")
+    assert (loaded.codes == matrix).all() and loaded.holidays == june.holidays
+    assert [m.name for m in loaded.staff] == [m.name for m in problem.staff]
+    assert loaded.start_date == june.start_date and loaded.to_json() == june.to_json()
+    assert archive.load("icu", "1404-05").staff is None
+
+    # july has no roster, so only the two june months know the name
+    history = archive.person_history(problem.staff[3].name)
+    assert sorted(history) == [("er", "1404-04"), ("icu", "1404-04")]
+    assert (history["icu", "1404-04"] == matrix[3]).all()
+
+
+def test_solve_batch_returns_results_in_input_order():
+    problems = [week_problem(name="a"), week_problem(name="b", holidays=frozenset({6}))]
+
+    results = solve_batch(problems, max_processes=2, config=SolverConfig(time_limit=1))
+
+    assert [r.name for r in results] == ["a", "b"]
+    for r in results:
+        assert r.status in ("OPTIMAL", "FEASIBLE")
+        assert r.matrix.shape == (31, 7)
+        assert r.objective is not None
+
+
+def test_solve_batch_reports_failed_jobs():
+    problems = [
+        week_problem(name="pinned", unavailable={0: frozenset({1})}),  # head nurse works day 2
+        week_problem(name="broken", normal_coverage=None),
+        week_problem(name="ok"),
+    ]
+
+    pinned, broken, ok = solve_batch(problems, max_processes=2, config=SolverConfig(time_limit=1))
+
+    assert pinned.status == "INFEASIBLE" and "day 2" in pinned.error
+    assert broken.status == "ERROR" and broken.error.startswith("AttributeError")
+    assert broken.matrix is None and broken.wall_time == 0.0
+    assert ok.status in ("OPTIMAL", "FEASIBLE") and ok.error is None
+
+
+def test_runs_record_solver_telemetry(tmp_path):
+    problem = week_problem()
+    history = RunHistory(tmp_path / "history.jsonl")
+
+    result = generate_schedule(problem, SolverConfig(time_limit=1), history=history)
+
+    stats = result.stats
+    assert stats.num_solutions >= 1 and stats.branches > 0
+    assert stats.model_fingerprint.startswith("0x")
+    assert stats.presolved_constraints < stats.constraints
+    assert "CpSolverResponse summary" in stats.response_stats
+
+    # without a history the search log is left off; the rest is still known
+    plain = generate_schedule(problem, SolverConfig(time_limit=1)).stats
+    assert plain.model_fingerprint is None and plain.presolved_constraints is None
+    assert (plain.variables, plain.constraints) == (stats.variables, stats.constraints)
+    assert plain.num_solutions >= 1
+
+    record, = history.load()
+    assert record["problem"] == "week" and record["model_fingerprint"] == stats.model_fingerprint
+    assert record["config"]["time_limit"] == 1
+
+    runs = [
+        {"problem": "week", "revision": "a", "wall_time": 1.0, "objective": 94},
+        {"problem": "week", "revision": "a", "wall_time": 3.0, "objective": 94},
+        {"problem": "week", "revision": "b", "wall_time": 2.9, "objective": 94},
+        {"problem": "Tir", "revision": "b", "wall_time": 80.0, "objective": 358},
+    ]
+    assert [(row["revision"], row["wall_time"], row["regression"]) for row in summarize(runs)] == [
+        ("a", 2.0, False), ("b", 2.9, True), ("b", 80.0, False),
+    ]
+
+
+def test_solver_config_presets_and_apply():
+    assert get_solver_config(None) is PRESETS["prove_optimal"]
+    assert get_solver_config("balanced").relative_gap_limit == 0.01
+    with pytest.raises(ValueError):
+        get_solver_config("no_such_preset")
+
+    solver = cp_model.CpSolver()
+    SolverConfig(time_limit=5, num_workers=2, relative_gap_limit=0.02, random_seed=7).apply(solver)
+    assert solver.parameters.max_time_in_seconds == 5
+    assert solver.parameters.num_workers == 2
+    assert solver.parameters.relative_gap_limit == 0.02
+    assert solver.parameters.random_seed == 7
+
+    solver = cp_model.CpSolver()
+    SolverConfig(time_limit=5, deterministic=True).apply(solver)
+    assert solver.parameters.interleave_search
+    assert solver.parameters.max_deterministic_time == 5
+
+
+def test_generate_schedule_reports_status_bound_and_gap():
+    result = generate_schedule(week_problem(), SolverConfig(time_limit=1))
+
+    assert result.status in ("OPTIMAL", "FEASIBLE")
+    assert result.best_bound <= result.objective
+    assert 0 <= result.gap <= 1
+    assert len(result.schedule) == 7
+    assert result.schedule == matrix_to_schedule_json(result.matrix, SHIFT_TYPES)
+
+
+def test_solution_stream_yields_improving_schedules():
+    stream = SolutionStream(week_problem(), SolverConfig(time_limit=1, num_workers=1))
+    events = list(stream)
+
+    assert events, "at least one solution within the time limit"
+    assert [e.index for e in events] == list(range(len(events)))
+    objectives = [e.objective for e in events]
+    assert objectives == sorted(objectives, reverse=True)
+    assert all(e.best_bound <= e.objective for e in events)
+    assert stream.result.objective == events[-1].objective
+    assert (stream.result.matrix == events[-1].matrix).all()
+
+
+def test_solution_stream_async_iteration_can_stop_early():
+    async def first_event():
+        async for event in SolutionStream(week_problem(), SolverConfig(time_limit=5)):
+            return event
+
+    event = asyncio.run(first_event())
+    assert event.index == 0
+    assert len(event.schedule) == 7
+
+
+def test_map_prior_schedule_shifts_days_and_follows_roster_changes():
+    prior = np.array([[0, 1, 2], [3, 4, 5], [OFF, OFF, 2]], dtype=np.int8)
+    problem = week_problem(num_days=4, holidays=frozenset())
+
+    hint = map_prior_schedule(prior, problem, day_offset=1)
+    assert hint.shape == (31, 4)
+    assert hint[0].tolist() == [1, 2, 0, 1]  # wraps past the 3-day prior horizon
+    assert hint[2].tolist() == [OFF, 2, OFF, OFF]
+    assert (hint[3:] == NO_HINT).all()
+
+    # person 0 of the new roster was person 1 before
+    hint = map_prior_schedule(prior, problem, staff_map={0: 1})
+    assert hint[0].tolist() == [3, 4, 5, 3]
+    assert (hint[1:] == NO_HINT).all()
+
+    schedule_json = matrix_to_schedule_json(prior, SHIFT_TYPES)
+    assert (map_prior_schedule(schedule_json, problem) == map_prior_schedule(prior, problem)).all()
+
+
+def test_hinted_solve_starts_from_the_prior_schedule():
+    problem = week_problem()
+    previous = generate_schedule(problem, SolverConfig(time_limit=1))
+
+    first = next(iter_solutions(problem, SolverConfig(num_workers=1), map_prior_schedule(previous, problem)))
+
+    assert first.objective == previous.objective
+
+
+def test_repair_covers_an_absence_with_local_changes_only():
+    problem = week_problem()
+    published = generate_schedule(problem, SolverConfig(time_limit=1)).matrix
+    supervisors = set(problem.supervisor_ids.values())
+    sick = next(p for p in range(problem.num_staff) if published[p, 3] == SHIFT_TYPES.index("D") and p not in supervisors)
+
+    repaired = repair_schedule(published, problem, {sick: {3}})
+
+    assert repaired.status == "OPTIMAL"
+    assert repaired.matrix[sick, 3] == OFF
+    assert repaired.changes and all(abs(c.day - 3) <= repaired.window for c in repaired.changes)
+    assert len(repaired.changes) == (repaired.matrix != published).sum()
+
+    assert satisfies_model(repaired.matrix, repaired.problem)
+    assert repaired.free_cells < problem.num_staff * problem.num_days
+    # only the neighborhood gets variables
+    free = free_cell_mask(published, {sick: {3}}, window=1)
+    _, shifts = _repair_model(repaired.problem, published, free)
+    assert 0 < shifts.num_vars <= free.sum() * len(SHIFT_TYPES)
+
+    with pytest.raises(ValueError, match="horizon"):
+        repair_schedule(published, problem, {sick: {problem.num_days}})
+
+
+def test_reduced_model_drops_fixed_cells_and_keeps_solutions_valid():
+    problem = week_problem()
+    fixed = fixed_cells(problem)
+    full, _ = build_model(problem, reduce=False, encoding="linear")
+    reduced, shifts = build_model(problem, encoding="linear")
+
+    assert shifts.num_vars == (fixed == FREE).sum()
+    assert len(reduced.Proto().variables) == len(full.Proto().variables) - (fixed != FREE).sum()
+    assert len(reduced.Proto().constraints) < len(full.Proto().constraints)
+
+    result = solve_model(reduced, shifts, SolverConfig(time_limit=1))
+    pinned = fixed != FREE
+    worked = np.eye(len(SHIFT_TYPES), dtype=np.int8)[result.matrix]
+    worked[result.matrix == OFF] = 0
+    assert (worked[pinned] == fixed[pinned]).all()
+    assert satisfies_model(result.matrix, problem)
+
+    # pins that contradict each other still make the model infeasible
+    head_nurse = problem.supervisor("HEAD_NURSE")
+    clash = week_problem(unavailable={head_nurse: frozenset({0})})
+    model, shifts = build_model(clash)
+    assert solve_model(model, shifts, SolverConfig(time_limit=5)).status == "INFEASIBLE"
+
+
+def test_fixed_cells_agree_with_an_optimal_unreduced_schedule():
+    problem = week_problem(unavailable={10: frozenset({2, 3})})
+    fixed = fixed_cells(problem)
+    model, shifts = build_model(problem, reduce=False)
+
+    result = solve_model(model, shifts, SolverConfig(time_limit=60, num_workers=8))
+
+    assert result.status == "OPTIMAL"
+    pinned = fixed != FREE
+    worked = np.eye(len(SHIFT_TYPES), dtype=np.int8)[result.matrix]
+    worked[result.matrix == OFF] = 0
+    assert (worked[pinned] == fixed[pinned]).all()
+
+
+def test_every_person_is_held_to_the_workload_cap():
+    problem = week_problem(max_monthly_workload=8)
+    model, shifts = build_model(problem)
+
+    result = solve_model(model, shifts, SolverConfig(time_limit=20, num_workers=8))
+
+    assert result.found
+    # N and DE count double
+    workload = ((result.matrix != OFF).sum(axis=1)
+                + (result.matrix == SHIFT_TYPES.index("N")).sum(axis=1)
+                + (result.matrix == SHIFT_TYPES.index("DE")).sum(axis=1))
+    assert workload.max() <= 8
+
+
+def test_constraint_registry_selects_and_profiles_groups():
+    assert select_groups() == tuple(DEFAULT_GROUPS) == (
+        "add_my_custom_shift_constraints",
+        "add_my_costum_role_constraints",
+        "add_unavailability_constraints",
+        "add_my_costum_other_constraints",
+    )
+    assert select_groups(enable=["add_basic_constraints"])[0] == "add_basic_constraints"
+    assert "add_unavailability_constraints" not in select_groups(disable=["add_unavailability_constraints"])
+    with pytest.raises(ValueError):
+        select_groups(["no_such_group"])
+
+    problem = week_problem()
+    profile = []
+    full, _ = build_model(problem, profile=profile)
+    assert [row.name for row in profile] == list(DEFAULT_GROUPS)
+    assert all(row.build_time >= 0 and row.constraints >= 0 for row in profile)
+    assert "add_my_custom_shift_constraints" in format_profile(profile)
+
+    without_other = week_problem(constraint_groups=select_groups(disable=["add_my_costum_other_constraints"]))
+    model, _ = build_model(without_other)
+    other = next(row for row in profile if row.name == "add_my_costum_other_constraints")
+    assert len(model.Proto().constraints) == len(full.Proto().constraints) - other.constraints
+
+
+def test_encodings_accept_each_others_schedules():
+    problem = week_problem()
+    for encoding in ENCODINGS:
+        model, shifts = build_model(problem, encoding=encoding)
+        result = solve_model(model, shifts, SolverConfig(time_limit=5))
+        assert result.found
+        assert all(satisfies_model(result.matrix, problem, other) for other in ENCODINGS)
+
+
+def test_symmetric_classes_and_count_ordering():
+    problem = week_problem()
+    classes = symmetric_classes(problem)
+    members = [p for ids in classes for p in ids]
+
+    assert len(members) == len(set(members))
+    assert not set(members) & set(problem.supervisor_ids.values())
+    assert 5 not in members  # unavailable on days 2 and 3
+    assert problem.num_staff - 1 in members
+    for ids in classes:
+        assert len({(problem.staff[p].role, problem.staff[p].gender) for p in ids}) == 1
+
+    model, shifts = build_model(problem, symmetry="counts")
+    result = solve_model(model, shifts, SolverConfig(time_limit=1))
+    worked = (result.matrix != OFF).sum(axis=1)
+    for ids in classes:
+        assert (np.diff(worked[ids]) <= 0).all()
+
+
+@pytest.fixture
+def api():
+    """
+    call(method, path, body=None) -> (status, json) against a local server
+    solving week_problem with one worker; call.port is the server's port.
+    """
+    import http.client
+    import json
+    import threading
+    import time
+    import uvicorn
+    from app.api.routes import create_app
+
+    server = uvicorn.Server(uvicorn.Config(create_app(1, week_problem()), host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    def call(method, path, body=None):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        connection.request(method, path, None if body is None else json.dumps(body),
+                           {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    call.port = port
+    yield call
+    server.should_exit = True
+    thread.join()
+
+
+def test_api_queues_reports_and_cancels_solve_jobs(api):
+    import time
+
+    status, first = api("POST", "/solve", {"time_limit": 3})
+    assert status == 202 and first["state"] in ("queued", "running")
+    status, second = api("POST", "/solve", {"preset": "fast_draft"})
+    assert status == 202 and second["state"] == "queued"  # one worker, busy with the first
+
+    status, cancelled = api("DELETE", f"/jobs/{second['id']}")
+    assert status == 200 and cancelled["state"] == "cancelled"
+    assert api("GET", f"/jobs/{second['id']}/schedule")[0] == 409
+    assert api("GET", "/jobs/nope")[0] == 404
+    assert api("POST", "/solve", {"preset": "nope"})[0] == 422
+    assert api("POST", "/solve", {"time_limit": -1})[0] == 422
+
+    deadline = time.time() + 30
+    while (job := api("GET", f"/jobs/{first['id']}")[1])["state"] == "running" and time.time() < deadline:
+        time.sleep(0.2)
+    assert job["state"] == "done" and job["solver_status"] in ("OPTIMAL", "FEASIBLE")
+    assert job["objective"] is not None and job["gap"] is not None
+
+    status, schedule = api("GET", f"/jobs/{first['id']}/schedule")
+    assert status == 200 and schedule["objective"] == job["objective"]
+    matrix = ShiftMatrix.model_validate(schedule["matrix"])
+    assert matrix.shift_types == SHIFT_TYPES and matrix.to_matrix().shape == (31, 7)
+
+    # a request without a preset is balanced, and no search outlives the
+    # server's limit, whatever the request asks for
+    assert SolveRequest().preset == "balanced"
+    manager = JobManager(1, week_problem(), max_time_limit=2)
+    try:
+        assert manager.submit(get_solver_config("prove_optimal")).config.time_limit == 2
+        assert manager.submit(SolverConfig(time_limit=1)).config.time_limit == 1
+    finally:
+        manager.shutdown()
+
+
+def read_events(port, path):
+    """[(event, data)] of a server-sent event stream, read to its end."""
+    import http.client
+    import json
+
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    assert response.status == 200 and response.getheader("content-type").startswith("text/event-stream")
+    events, event = [], None
+    for line in response.read().decode().splitlines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_api_streams_improving_schedules_as_diffs(api):
+    status, job = api("POST", "/solve", {"time_limit": 3})
+    assert status == 202
+
+    events = read_events(api.port, f"/jobs/{job['id']}/events")
+    (end, final), solutions = events[-1], [data for event, data in events[:-1]]
+    assert end == "end" and final["state"] == "done" and solutions
+    assert all(event == "solution" for event, _ in events[:-1])
+    assert [s["index"] for s in solutions] == sorted({s["index"] for s in solutions})
+    assert all(a["objective"] >= b["objective"] for a, b in zip(solutions, solutions[1:]))
+
+    # the first event and the diffs after it rebuild the final schedule
+    assert "changes" not in solutions[0] and all("matrix" not in s for s in solutions[1:])
+    matrix = ShiftMatrix.model_validate(solutions[0]["matrix"]).to_matrix().copy()
+    for solution in solutions[1:]:
+        for person, day, shift in solution["changes"]:
+            matrix[person, day] = OFF if shift is None else SHIFT_TYPES.index(shift)
+    schedule = api("GET", f"/jobs/{job['id']}/schedule")[1]
+    assert solutions[-1]["objective"] == final["objective"] == schedule["objective"]
+    assert np.array_equal(ShiftMatrix.model_validate(schedule["matrix"]).to_matrix(), matrix)
+
+    # a client arriving after the search gets the final schedule in one event
+    (_, late), (end, _) = read_events(api.port, f"/jobs/{job['id']}/events")
+    assert end == "end" and late["index"] == solutions[-1]["index"] and late["skipped"] == late["index"]
+    assert late["matrix"] == schedule["matrix"]
+    assert api("GET", "/jobs/nope/events")[0] == 404
+
+    previous = np.full((3, 2), OFF, dtype=np.int8)
+    matrix = previous.copy()
+    matrix[2, 1] = SHIFT_TYPES.index("N")
+    assert matrix_changes(previous, matrix, SHIFT_TYPES) == [[2, 1, "N"]]
+    assert matrix_changes(matrix, previous, SHIFT_TYPES) == [[2, 1, None]]
+
+
+def test_models_validate_problems_and_encode_schedules(api):
+    from pydantic import ValidationError
+
+    problem = week_problem()
+    config = ProblemConfig.from_problem(problem)
+    rebuilt = ProblemConfig.model_validate_json(config.model_dump_json()).to_problem()
+    assert [vars(m) for m in rebuilt.staff] == [vars(m) for m in problem.staff]
+    assert (rebuilt.holidays, rebuilt.normal_coverage, rebuilt.holiday_coverage, dict(rebuilt.unavailable)) \
+        == (problem.holidays, problem.normal_coverage, problem.holiday_coverage, dict(problem.unavailable))
+
+    payload = config.model_dump(mode="json")
+    for change, message in (
+        ({"staff": payload["staff"][1:]}, "staff[0] has id 1"),
+        ({"holidays": [7]}, "holidays [7] fall outside the 7-day horizon"),
+        ({"unavailable": {"40": [0]}}, "unavailable person 40"),
+        ({"staff": [{**payload["staff"][0], "gender": "X"}] + payload["staff"][1:]}, "gender"),
+    ):
+        with pytest.raises(ValidationError, match=re.escape(message)):
+            ProblemConfig.model_validate({**payload, **change})
+
+    matrix = np.array([[0, OFF, 5], [OFF, OFF, 2]], dtype=np.int8)
+    encoded = ShiftMatrix.from_matrix(matrix, SHIFT_TYPES)
+    assert np.array_equal(ShiftMatrix.model_validate_json(encoded.model_dump_json()).to_matrix(), matrix)
+    for change in ({"num_days": 4}, {"codes": "not base64!"}, {"shift_types": SHIFT_TYPES[:3]}):
+        with pytest.raises(ValidationError):
+            ShiftMatrix.model_validate({**encoded.model_dump(), **change})
+
+    assert api("POST", "/solve", {"problem": {**payload, "holidays": [9]}})[0] == 422
+    assert api("POST", "/solve", {"problem": {**payload, "constraint_groups": ["nope"]}})[0] == 422
+    status, job = api("POST", "/solve", {"problem": payload, "time_limit": 1})
+    assert status == 202 and api("DELETE", f"/jobs/{job['id']}")[0] == 200
+
+
+def import_profile(*args):
+    """(process, {module: cumulative import seconds}) of a fresh `python -X importtime *args`."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=root, capture_output=True, text=True)
+    rows = (line.split("|") for line in proc.stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line)
+    return proc, {name.strip(): int(cumulative) / 1e6 for _, cumulative, name in rows}
+
+
+def test_cli_starts_and_validates_without_heavy_imports():
+    from app.cli import HEAVY_MODULES
+
+    def heavy(modules):
+        return sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+
+    # the startup time itself is measured by benchmarks/bench_startup.py
+    proc = subprocess.run([sys.executable, "-c", "import sys, app.cli; print(*sys.modules)"],
+                          cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          capture_output=True, text=True, check=True)
+    assert heavy(proc.stdout.split()) == []
+
+    proc, modules = import_profile("-m", "app", "validate")
+    assert proc.returncode == 1 and "can give at most 806" in proc.stdout
+    assert heavy(modules) == []
+    assert heavy(import_profile("-m", "app", "solve", "--help")[1]) == []
+
+
+def test_precheck_rejects_impossible_problems_with_reasons():
+    assert find_infeasibilities(week_problem()) == []
+    # the ward's cap of 26 cannot staff Tir 1404
+    assert find_infeasibilities(default_problem()) == [
+        "the month needs 886 workload units (N and DE count double) but the staff, "
+        "each capped at 26, can give at most 806"
+    ]
+
+    with pytest.raises(InfeasibleProblemError) as error:
+        generate_schedule(week_problem(leave_total=100))
+    assert "100 leave shifts are required" in error.value.reasons[0]
+
+    # the week's holiday (day 6) is left with four helpers
+    helpers = week_problem().helpers
+    few_helpers = week_problem(unavailable={p: frozenset({5}) for p in helpers[:len(helpers) - 4]})
+    assert find_infeasibilities(few_helpers) == ["day 6 needs at least 5 helpers but only 4 can work"]
+
+    head_nurse_away = week_problem(unavailable={0: frozenset({1})})
+    assert find_infeasibilities(head_nurse_away) == ["Afsaneh (id 0) must work D on day 2 but is unavailable"]
+
+    # every person, not only the last, is held to the workload cap
+    assert find_infeasibilities(week_problem(max_monthly_workload=5)) == [
+        "the month needs 204 workload units (N and DE count double) but the staff, "
+        "each capped at 5, can give at most 155"
+    ]
+
+
+def test_explain_infeasibility_names_the_conflicting_groups():
+    assert explain_infeasibility(week_problem()) is None
+
+    rules = explain_infeasibility(week_problem(unavailable={0: frozenset({1})}))
+    assert [(rule.group, rule.day) for rule in rules] == [
+        ("add_my_costum_role_constraints", 1),
+        ("add_unavailability_constraints", 1),
+    ]
+    assert "day 2" in str(rules[0])